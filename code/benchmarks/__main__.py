@@ -0,0 +1,61 @@
+from .suite import run_suite, save_baseline, load_baseline, compare_with_baseline, format_report, STAGES, DEFAULT_TOLERANCE
+from sentinalysis.synthetic import LOCALES
+from typing import List
+import argparse
+import json
+import sys
+
+"""
+Builds the parser of the benchmark suite.
+
+Args:
+  None
+
+Returns:
+  argparse.ArgumentParser: The parser.
+"""
+def get_parser() -> argparse.ArgumentParser:
+  parser = argparse.ArgumentParser(prog = "python -m benchmarks", description = "Times every stage of sentinalysis on a synthetic export.")
+  parser.add_argument("-n", "--lines", type = int, default = 100000, help = "the number of lines of the synthetic export")
+  parser.add_argument("-s", "--stages", nargs = "+", choices = list(STAGES), default = None, metavar = "STAGE",
+                      help = f"the stages to run, all of them by default: {', '.join(STAGES)}")
+  parser.add_argument("--locale", choices = list(LOCALES), default = "en_US", help = "the timestamp format of the export")
+  parser.add_argument("--seed", type = int, default = 0, help = "the seed of the generator")
+  parser.add_argument("-r", "--repeat", type = int, default = 1, help = "the number of timed runs of every stage, the fastest is kept")
+  parser.add_argument("--workdir", default = "sentinalysis-benchmarks", help = "the directory of the generated files, exports in it are reused")
+  parser.add_argument("--json", default = None, help = "also write the results to this JSON file")
+  parser.add_argument("--save", default = None, metavar = "NAME", help = "save the results as a baseline")
+  parser.add_argument("--compare", default = None, metavar = "NAME", help = "compare the results with a baseline, fails on regressions")
+  parser.add_argument("--tolerance", type = float, default = DEFAULT_TOLERANCE, help = "the time or memory ratio to the baseline that counts as a regression")
+  return parser
+
+"""
+Entry point of the benchmark suite, e.g. "python -m benchmarks --lines 1000000 --compare main" from the code directory.
+
+Args:
+  argv (List[str]): The arguments, defaults to the ones of the process.
+
+Returns:
+  int: The exit code, 1 if a stage regressed.
+"""
+def main(argv: List[str] = None) -> int:
+  args = get_parser().parse_args(argv)
+  report = run_suite(args.lines, args.stages, args.workdir, args.locale, args.seed, args.repeat)
+
+  comparison = None
+  if args.compare is not None:
+    comparison = compare_with_baseline(report, load_baseline(args.compare), args.tolerance)
+    report["comparison"] = comparison
+
+  print(format_report(report, comparison))
+
+  if args.json is not None:
+    with open(args.json, "w") as f:
+      json.dump(report, f, indent = 2)
+  if args.save is not None:
+    print(f"Baseline: {save_baseline(report, args.save)}")
+
+  return 1 if comparison and any(ratios["regressed"] for ratios in comparison.values()) else 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,297 @@
+from sentinalysis.synthetic import generate_export
+from sentinalysis.instrumentation import get_peak_rss_mb
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List
+import multiprocessing
+import platform
+import time
+import json
+import os
+
+# Directory of the saved baselines, next to this file
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# A stage is slower than its baseline when it takes this many times as long, or peaks at this many times the memory
+DEFAULT_TOLERANCE = 1.25
+
+# Files prepared once by prepare_inputs() and read by the stages, relative to the working directory
+VALIDATED_FILE = "validated-synthetic.txt"
+
+# Stages of the suite. Every stage receives the prepared inputs, runs its setup untimed, and returns the function to time.
+def _validation(inputs: dict, binary: bool = False) -> Callable:
+  from sentinalysis.validation import data_validation
+  os.makedirs("validation-output", exist_ok = True)
+  return lambda: data_validation(inputs["export"], "validation-output", binary = binary)
+
+def _parser(extension: str) -> Callable:
+  def stage(inputs: dict) -> Callable:
+    from sentinalysis.readers import get_timestamp_parser
+    from sentinalysis import parsers
+    import orjson
+    filePath = inputs["formats"][extension]
+    timestamps = get_timestamp_parser(filePath)
+
+    def run():
+      with open(filePath, "r", encoding = "utf-8") as f:
+        if extension == ".txt":
+          for line in f:
+            parsers.get_txt(line, timestamps)
+        elif extension == ".csv":
+          next(f)
+          for line in f:
+            parsers.get_csv(line, timestamps)
+        else:
+          for line in f:
+            parsers.get_json(orjson.loads(line), timestamps)
+    return run
+  return stage
+
+def _converter(name: str) -> Callable:
+  def stage(inputs: dict) -> Callable:
+    from sentinalysis import converters
+    if name == "jsonl":
+      return lambda: converters.convert_txt_to_json(VALIDATED_FILE, ndjson = True)
+    return lambda: getattr(converters, f"convert_txt_to_{name}")(VALIDATED_FILE)
+  return stage
+
+def _sentiment(extension: str, freq: str = None) -> Callable:
+  def stage(inputs: dict) -> Callable:
+    from sentinalysis.sentiment import sentiment_analysis
+    from sentinalysis.sinks import BucketSink
+    filePath = inputs["formats"][extension]
+    if freq is not None:
+      return lambda: sentiment_analysis(filePath, sink = BucketSink(freq))
+    return lambda: sentiment_analysis(filePath)
+  return stage
+
+def _charts(downsample: str = None) -> Callable:
+  def stage(inputs: dict) -> Callable:
+    from sentinalysis.sentiment import sentiment_analysis
+    from sentinalysis.plotting import get_charts
+    result = sentiment_analysis(inputs["formats"][".columns"], columnar = True)
+    return lambda: get_charts(result, "chart-output", downsample = downsample)
+  return stage
+
+# Name of every stage, its setup function and whether it processes the lines of the export or the validated messages
+STAGES = {
+  "validation": (_validation, "lines"),
+  "validation-binary": (lambda inputs: _validation(inputs, binary = True), "lines"),
+  "parser-txt": (_parser(".txt"), "messages"),
+  "parser-csv": (_parser(".csv"), "messages"),
+  "parser-jsonl": (_parser(".jsonl"), "messages"),
+  "convert-json": (_converter("json"), "messages"),
+  "convert-jsonl": (_converter("jsonl"), "messages"),
+  "convert-csv": (_converter("csv"), "messages"),
+  "convert-columns": (_converter("columns"), "messages"),
+  "sentiment-txt": (_sentiment(".txt"), "messages"),
+  "sentiment-json": (_sentiment(".json"), "messages"),
+  "sentiment-jsonl": (_sentiment(".jsonl"), "messages"),
+  "sentiment-csv": (_sentiment(".csv"), "messages"),
+  "sentiment-columns": (_sentiment(".columns"), "messages"),
+  "sentiment-buckets": (_sentiment(".txt", "D"), "messages"),
+  "charts": (_charts(), "messages"),
+  "charts-minmax": (_charts("minmax"), "messages"),
+}
+
+"""
+Generates the synthetic export and every input format of the stages in the working directory.
+An export generated with the same arguments is reused, since large ones take a while to write.
+
+Args:
+  lines (int): The number of lines of the export.
+  locale (str): The timestamp format of the export (see synthetic.LOCALES).
+  seed (int): The seed of the generator.
+
+Returns:
+  dict: The path of the "export", its "counts" (see synthetic.generate_export()) and the path of every input "formats" by extension.
+"""
+def prepare_inputs(lines: int, locale: str = "en_US", seed: int = 0) -> dict:
+  from sentinalysis.validation import data_validation
+  from sentinalysis import converters
+
+  exportPath = os.path.abspath(f"synthetic-{lines}-{locale}-{seed}.txt")
+  countsPath = f"{exportPath}.counts.json"
+  if os.path.exists(exportPath) and os.path.exists(countsPath):
+    with open(countsPath, "r") as f:
+      counts = json.load(f)
+  else:
+    counts = generate_export(exportPath, lines, locale = locale, seed = seed)
+    with open(countsPath, "w") as f:
+      json.dump(counts, f)
+
+  os.replace(data_validation(exportPath, os.getcwd()), os.path.abspath(VALIDATED_FILE))
+  formats = {
+    ".txt": os.path.abspath(VALIDATED_FILE),
+    ".json": converters.convert_txt_to_json(VALIDATED_FILE),
+    ".jsonl": converters.convert_txt_to_json(VALIDATED_FILE, ndjson = True),
+    ".csv": converters.convert_txt_to_csv(VALIDATED_FILE),
+    ".columns": converters.convert_txt_to_columns(VALIDATED_FILE),
+  }
+
+  return {"export": exportPath, "counts": counts, "formats": formats}
+
+"""
+Runs a stage in the current process and measures it. Meant to run in a fresh process (see run_suite()),
+so that the peak memory belongs to the stage alone.
+
+Args:
+  name (str): The name of the stage.
+  inputs (dict): The prepared inputs.
+  repeat (int): The number of timed runs, the fastest one is kept.
+
+Returns:
+  dict: The "seconds" and "cpu_seconds" of the fastest run, and the "peak_rss_mb" of the process.
+"""
+def measure_stage(name: str, inputs: dict, repeat: int = 1) -> dict:
+  setup, _ = STAGES[name]
+  run = setup(inputs)
+
+  seconds, cpu_seconds = [], []
+  for _ in range(repeat):
+    wall, cpu = time.perf_counter(), time.process_time()
+    run()
+    seconds.append(time.perf_counter() - wall)
+    cpu_seconds.append(time.process_time() - cpu)
+
+  fastest = seconds.index(min(seconds))
+  return {"seconds": seconds[fastest], "cpu_seconds": cpu_seconds[fastest], "peak_rss_mb": round(get_peak_rss_mb(), 1)}
+
+"""
+Runs the benchmark suite on a synthetic export. Every stage runs in its own spawned process, so neither imports
+nor caches of previous stages affect its time or memory.
+
+Args:
+  lines (int): The number of lines of the export.
+  stages (List[str]): The stages to run, all of them if not provided.
+  workdir (str): The directory of the generated files. Exports in it are reused by later runs.
+  locale (str): The timestamp format of the export.
+  seed (int): The seed of the generator.
+  repeat (int): The number of timed runs of every stage, the fastest one is kept.
+
+Returns:
+  dict: The "config" of the run and the "stages", with their time, lines/sec and peak memory.
+"""
+def run_suite(lines: int, stages: List[str] = None, workdir: str = "sentinalysis-benchmarks",
+              locale: str = "en_US", seed: int = 0, repeat: int = 1) -> dict:
+  stages = list(STAGES) if stages is None else stages
+  unknown = [name for name in stages if name not in STAGES]
+  if unknown:
+    raise ValueError(f"Unknown stages: {', '.join(unknown)}")
+
+  os.makedirs(workdir, exist_ok = True)
+  cwd = os.getcwd()
+  os.chdir(workdir)
+  try:
+    inputs = prepare_inputs(lines, locale, seed)
+    results = {}
+    for name in stages:
+      with ProcessPoolExecutor(max_workers = 1, mp_context = multiprocessing.get_context("spawn")) as executor:
+        result = executor.submit(measure_stage, name, inputs, repeat).result()
+
+      count = inputs["counts"][STAGES[name][1]]
+      result["lines"] = count
+      result["lines_per_second"] = round(count / result["seconds"]) if result["seconds"] else None
+      results[name] = result
+  finally:
+    os.chdir(cwd)
+
+  config = {
+    "lines": lines,
+    "locale": locale,
+    "seed": seed,
+    "repeat": repeat,
+    "python": platform.python_version(),
+    "platform": platform.platform(),
+    "cpus": os.cpu_count(),
+  }
+  return {"config": config, "stages": results}
+
+"""
+Saves the results of run_suite() as a named baseline.
+
+Args:
+  report (dict): The results of run_suite().
+  name (str): The name of the baseline.
+  baselineDir (str): The directory of the baselines.
+
+Returns:
+  str: The path of the baseline.
+"""
+def save_baseline(report: dict, name: str, baselineDir: str = BASELINE_DIR) -> str:
+  os.makedirs(baselineDir, exist_ok = True)
+  baselinePath = os.path.join(baselineDir, f"{name}.json")
+  with open(baselinePath, "w") as f:
+    json.dump(report, f, indent = 2)
+
+  return baselinePath
+
+"""
+Loads a baseline saved by save_baseline().
+
+Args:
+  name (str): The name of the baseline, or the path of its file.
+  baselineDir (str): The directory of the baselines.
+
+Returns:
+  dict: The baseline.
+"""
+def load_baseline(name: str, baselineDir: str = BASELINE_DIR) -> dict:
+  baselinePath = name if name.endswith(".json") else os.path.join(baselineDir, f"{name}.json")
+  with open(baselinePath, "r") as f:
+    return json.load(f)
+
+"""
+Compares results with a baseline. Only stages present in both are compared, and only runs of the same size
+are comparable, since the speed of most stages changes with the size of the export.
+
+Args:
+  report (dict): The results of run_suite().
+  baseline (dict): A baseline with the same configuration.
+  tolerance (float): The ratio of time or memory to the baseline above which a stage has regressed.
+
+Returns:
+  dict[str, dict]: The "time_ratio", "memory_ratio" and "regressed" flag of every compared stage.
+"""
+def compare_with_baseline(report: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> dict[str, dict]:
+  for key in ("lines", "locale", "seed"):
+    if report["config"][key] != baseline["config"][key]:
+      raise ValueError(f"The baseline was run with {key}={baseline['config'][key]!r}, not {report['config'][key]!r}.")
+
+  comparison = {}
+  for name, result in report["stages"].items():
+    if name not in baseline["stages"]:
+      continue
+
+    reference = baseline["stages"][name]
+    time_ratio = result["seconds"] / reference["seconds"] if reference["seconds"] else 1.0
+    memory_ratio = result["peak_rss_mb"] / reference["peak_rss_mb"] if reference["peak_rss_mb"] else 1.0
+    comparison[name] = {
+      "time_ratio": round(time_ratio, 3),
+      "memory_ratio": round(memory_ratio, 3),
+      "regressed": time_ratio > tolerance or memory_ratio > tolerance,
+    }
+
+  return comparison
+
+"""
+Formats the results of run_suite() as a table, with the ratios to a baseline if compared.
+
+Args:
+  report (dict): The results of run_suite().
+  comparison (dict[str, dict]): The result of compare_with_baseline().
+
+Returns:
+  str: The table.
+"""
+def format_report(report: dict, comparison: dict[str, dict] = None) -> str:
+  rows = [f"{'stage':<20}{'seconds':>10}{'cpu':>10}{'lines/sec':>14}{'peak MB':>10}" + ("   vs baseline" if comparison else "")]
+
+  for name, result in report["stages"].items():
+    rate = f"{result['lines_per_second']:,}" if result["lines_per_second"] else "-"
+    row = f"{name:<20}{result['seconds']:>10.3f}{result['cpu_seconds']:>10.3f}{rate:>14}{result['peak_rss_mb']:>10.1f}"
+    if comparison and name in comparison:
+      ratios = comparison[name]
+      row += f"   time x{ratios['time_ratio']:.2f}, memory x{ratios['memory_ratio']:.2f}" + ("  REGRESSED" if ratios["regressed"] else "")
+    rows.append(row)
+
+  return "\n".join(rows)
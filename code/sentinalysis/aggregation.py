@@ -0,0 +1,125 @@
+from .results import ColumnarSentiment
+from datetime import date
+from typing import Tuple
+import numpy as np
+
+# Bucket sizes accepted by resample_ohlc(): days, weeks starting on Monday, and calendar months
+FREQUENCIES = ("D", "W", "M")
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+"""
+Returns the first day of the bucket every date falls in.
+
+Args:
+  dates (np.ndarray): The dates, as datetime64[D].
+  freq (str): The bucket size, one of FREQUENCIES.
+
+Returns:
+  np.ndarray: The first day of every date's bucket, as datetime64[D].
+"""
+def get_bucket_starts(dates: np.ndarray, freq: str) -> np.ndarray:
+  if freq not in FREQUENCIES:
+    raise ValueError(f"Unsupported frequency: {freq}")
+
+  dates = np.asarray(dates, dtype = "datetime64[D]")
+  if freq == "D":
+    return dates
+  if freq == "M":
+    return dates.astype("datetime64[M]").astype("datetime64[D]")
+
+  # 1970-01-01 was a Thursday, so (days + 3) % 7 is the number of days since Monday
+  days = dates.astype(np.int64)
+  return (days - (days + 3) % 7).astype("datetime64[D]")
+
+"""
+Resamples the series of a member into time buckets, without a Python loop over the messages.
+Every bucket is a candlestick of the cumulative score: open is the score before the first message of the bucket,
+close the score after its last message, and high and low the extremes in between, open included.
+The number of messages and their mean compound score are returned as well.
+
+Args:
+  dates (np.ndarray): The date of every message, in chat order.
+  scores (np.ndarray): The raw compound score of every message.
+  freq (str): The bucket size, one of FREQUENCIES.
+  baseline (float): The cumulative score before the first message, e.g. the running total of a checkpoint.
+
+Returns:
+  dict[str, np.ndarray]: The arrays "date" (first day of every bucket, as datetime64[D]), "open", "high", "low", "close", "count" and "mean",
+  with one entry per bucket that has messages, in chronological order.
+"""
+def resample_ohlc(dates: np.ndarray, scores: np.ndarray, freq: str = "D", baseline: float = 0.0) -> dict[str, np.ndarray]:
+  buckets = get_bucket_starts(dates, freq)
+  scores = np.asarray(scores, dtype = np.float64)
+
+  if not len(buckets):
+    empty = np.empty(0, dtype = np.float64)
+    return {"date": buckets, "open": empty, "high": empty, "low": empty, "close": empty, "count": np.empty(0, dtype = np.int64), "mean": empty}
+
+  # Exports are sorted by time, except for the rare message whose phone clock was off
+  if np.any(buckets[1:] < buckets[:-1]):
+    order = np.argsort(buckets, kind = "stable")
+    buckets, scores = buckets[order], scores[order]
+
+  cumulative = baseline + np.cumsum(scores)
+  keys = np.unique(buckets)
+  starts = np.searchsorted(buckets, keys, side = "left")
+  ends = np.r_[starts[1:], len(buckets)]
+
+  opens = cumulative[starts] - scores[starts]
+  counts = ends - starts
+
+  return {
+    "date": keys,
+    "open": opens,
+    "high": np.maximum(np.maximum.reduceat(cumulative, starts), opens),
+    "low": np.minimum(np.minimum.reduceat(cumulative, starts), opens),
+    "close": cumulative[ends - 1],
+    "count": counts,
+    "mean": np.add.reduceat(scores, starts) / counts,
+  }
+
+"""
+Returns the dates and raw compound scores of a member of a result of sentiment_analysis().
+Dictionaries only hold cumulative scores, so their raw scores are the differences between consecutive points.
+The score before their first point cannot be recovered from them: a dictionary of a run resumed from a checkpoint
+has to be passed with the running total it started from, e.g. the members_sentiment_cache of the checkpoint.
+
+Args:
+  sentiment_dictionary (dict): The result, a dictionary or a ColumnarSentiment.
+  group_member (str): The name of the member.
+  baseline (float): The cumulative score of a dictionary before its first point. Ignored for a ColumnarSentiment, which keeps its own.
+
+Returns:
+  Tuple[np.ndarray, np.ndarray, float]: The dates as datetime64[D], the raw scores, and the cumulative score before the first message.
+"""
+def get_member_series(sentiment_dictionary: dict, group_member: str, baseline: float = 0.0) -> Tuple[np.ndarray, np.ndarray, float]:
+  if isinstance(sentiment_dictionary, ColumnarSentiment):
+    return sentiment_dictionary.dates(group_member), sentiment_dictionary.scores(group_member), sentiment_dictionary.baseline.get(group_member, 0.0)
+
+  points = sentiment_dictionary[group_member]
+  cumulative = np.fromiter((score for score, _ in points), dtype = np.float64, count = len(points))
+  days = np.fromiter((timestamp.toordinal() for _, timestamp in points), dtype = np.int64, count = len(points)) - _EPOCH_ORDINAL
+
+  return days.astype("datetime64[D]"), np.diff(cumulative, prepend = baseline), baseline
+
+"""
+Resamples every member of a result of sentiment_analysis() into candlesticks (see resample_ohlc()).
+Years of messages shrink to a few hundred buckets per member.
+
+Args:
+  sentiment_dictionary (dict): The result, a dictionary or a ColumnarSentiment.
+  freq (str): The bucket size, one of FREQUENCIES.
+  baseline (dict[str, float]): The cumulative score of every member of a dictionary before its first point (see get_member_series()).
+
+Returns:
+  dict[str, dict[str, np.ndarray]]: The candlesticks of every member.
+"""
+def aggregate_sentiment(sentiment_dictionary: dict, freq: str = "D", baseline: dict[str, float] = None) -> dict[str, dict[str, np.ndarray]]:
+  baseline = baseline or {}
+  candlesticks = {}
+  for group_member in sentiment_dictionary:
+    dates, scores, baseline_score = get_member_series(sentiment_dictionary, group_member, baseline.get(group_member, 0.0))
+    candlesticks[group_member] = resample_ohlc(dates, scores, freq, baseline_score)
+
+  return candlesticks
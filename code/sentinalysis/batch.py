@@ -0,0 +1,210 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from .classifier import SystemLineClassifier
+from .validation import data_validation
+from .sentiment import analyze_records
+from .readers import iter_records
+from .results import ColumnarSentiment
+from .utils import check_vader_lexicon
+from .scorers import Scorer, get_scorer, get_scorer_class
+from .cache import MemoizedAnalyzer
+from . import parallel
+from typing import List, Union
+import multiprocessing
+import ntpath
+import orjson
+import glob
+import time
+import os
+
+MANIFEST_NAME = "manifest.json"
+
+"""
+Lists the exported chats matched by a directory or a glob pattern. Files written by data_validation() are skipped,
+so a directory can be processed again after it was used as the output directory.
+
+Args:
+  pattern (str): A directory, whose .txt files are listed, or a glob pattern such as "exports/**/*.txt".
+
+Returns:
+  List[str]: The absolute paths of the exports, largest first.
+"""
+def find_exports(pattern: str) -> List[str]:
+  if os.path.isdir(pattern):
+    pattern = os.path.join(pattern, "*.txt")
+
+  paths = [os.path.abspath(path) for path in glob.glob(pattern, recursive = True)
+           if os.path.isfile(path) and not ntpath.basename(path).startswith("validated-")]
+
+  return sorted(paths, key = lambda path: (-os.path.getsize(path), path))
+
+"""
+Validates a single export, in a thread of batch_analysis().
+
+Args:
+  filePath (str): The path to the exported .txt chat.
+  outputPath (str): The directory of the validated file.
+
+Returns:
+  dict: The path of the validated file, the number of dropped lines per category and the time it took.
+"""
+def validate_export(filePath: str, outputPath: str) -> dict:
+  start = time.perf_counter()
+  classifier = SystemLineClassifier(binary = True)
+  validatedPath = data_validation(filePath, outputPath, classifier, binary = True)
+
+  return {"validated": validatedPath, "dropped_lines": dict(classifier.counts), "validation_seconds": time.perf_counter() - start}
+
+"""
+Saves the result of a chat as JSON, with the dates and cumulative scores of every member.
+
+Args:
+  result (ColumnarSentiment): The result of the chat.
+  resultPath (str): The path of the JSON file.
+
+Returns:
+  None
+"""
+def save_result(result: ColumnarSentiment, resultPath: str) -> None:
+  members = {name: {"dates": result.dates(name).astype(str).tolist(), "cumulative": result.cumulative(name).tolist()} for name in result}
+
+  with open(resultPath, "wb") as f:
+    f.write(orjson.dumps({"members": members}))
+
+"""
+Scores a validated chat in a worker of batch_analysis() and saves its result.
+In a worker process, the analyzer is the one of the parallel module, which is either inherited from the parent process or loaded once per worker.
+In a worker thread, the scorer is shared by the threads and every chat gets its own memo.
+
+Args:
+  validatedPath (str): The path to the validated .txt file.
+  resultPath (str): The path of the JSON file the result is saved to (see save_result()).
+  scorer (Scorer): The backend shared by the worker threads, or None in a worker process.
+
+Returns:
+  dict: The number of messages and members of the chat and the time it took to score it.
+"""
+def score_chat(validatedPath: str, resultPath: str, scorer: Scorer = None) -> dict:
+  start = time.perf_counter()
+  if scorer is not None:
+    analyzer = MemoizedAnalyzer(scorer)
+  else:
+    if parallel._worker_analyzer is None:
+      parallel.init_worker()
+    analyzer = parallel._worker_analyzer
+
+  result = analyze_records(iter_records(validatedPath), analyzer = analyzer, columnar = True)
+  save_result(result, resultPath)
+
+  return {"messages": sum(len(result.scores(name)) for name in result), "members": len(result), "scoring_seconds": time.perf_counter() - start}
+
+"""
+Initializes a worker process of batch_analysis(). Workers forked from the parent share the analyzer it preloaded,
+workers started from scratch, or forked while the parent held the analyzer of another engine, create their own.
+
+Args:
+  engine (Union[str, Scorer]): The scoring backend (see sentiment_analysis()).
+
+Returns:
+  None
+"""
+def init_batch_worker(engine: Union[str, Scorer]) -> None:
+  if parallel._worker_analyzer is None or parallel._worker_engine != parallel.get_engine_key(engine):
+    parallel.init_worker(engine)
+
+"""
+Validates and analyzes a whole set of exported chats concurrently. Validation reads and writes files and runs in a thread pool,
+scoring runs in a process pool whose workers share a single preloaded VADER lexicon. A chat is scored as soon as it is validated,
+and the largest chats are started first in both pools, so the total time approaches the time of the largest chat
+rather than the sum of all of them. Backends that cannot run in worker processes score in threads instead,
+a single one if they are not thread-safe either (see scorers.Scorer).
+
+Every chat gets its validated file and a "<name>.sentiment.json" result (see save_result()) in the output directory.
+A manifest.json lists the files, timings, counts and errors of every chat and a summary of the run.
+A chat that fails is recorded with its error, the others are still processed.
+
+Args:
+  exportPaths (List[str]): The paths to the exported .txt chats. Their file names have to be unique.
+  outputPath (str): The directory of the results. It is created if it does not exist.
+  workers (int): The number of scoring processes. Defaults to the number of CPUs.
+  threads (int): The number of validation threads.
+  engine (Union[str, Scorer]): The scoring backend (see sentiment_analysis()).
+
+Returns:
+  dict: The manifest.
+"""
+def batch_analysis(exportPaths: List[str], outputPath: str, workers: int = None, threads: int = 4, engine: Union[str, Scorer] = "nltk") -> dict:
+  scorer_class = get_scorer_class(engine)
+
+  exportPaths = sorted((os.path.abspath(path) for path in exportPaths), key = lambda path: -os.path.getsize(path))
+  names = [ntpath.basename(path).removesuffix(".txt") for path in exportPaths]
+  if len(set(names)) != len(names):
+    raise ValueError("Exported chats of a batch must have unique file names.")
+
+  os.makedirs(outputPath, exist_ok = True)
+  workers = workers or os.cpu_count() or 1
+  start = time.perf_counter()
+
+  entries = {path: {"export": path, "bytes": os.path.getsize(path), "error": None} for path in exportPaths}
+  results = {path: os.path.abspath(os.path.join(outputPath, f"{name}.sentiment.json")) for path, name in zip(exportPaths, names)}
+
+  check_vader_lexicon()
+  if scorer_class.process_safe:
+    # Forked workers inherit the analyzer, so the lexicon is loaded once for the whole pool
+    if multiprocessing.get_start_method() == "fork":
+      parallel.init_worker(engine)
+    cpu_pool = ProcessPoolExecutor(max_workers = workers, initializer = init_batch_worker, initargs = (engine,))
+    scorer = None
+  else:
+    workers = workers if scorer_class.thread_safe else 1
+    cpu_pool = ThreadPoolExecutor(max_workers = workers)
+    scorer = get_scorer(engine)
+
+  try:
+    with cpu_pool, ThreadPoolExecutor(max_workers = threads) as io_pool:
+      # Forked workers are all started by the first task, which has to happen before the validation threads are running
+      cpu_pool.submit(int).result()
+      pending = {io_pool.submit(validate_export, path, outputPath): ("validation", path) for path in exportPaths}
+      validated = []
+
+      while pending:
+        done, _ = wait(pending, return_when = FIRST_COMPLETED)
+
+        for future in done:
+          stage, path = pending.pop(future)
+          try:
+            entries[path].update(future.result())
+          except Exception as error:
+            entries[path]["error"] = f"{stage} failed: {error!r}"
+            continue
+
+          if stage == "validation":
+            validated.append(path)
+          else:
+            entries[path]["result"] = results[path]
+
+        # Only as many chats as there are workers are queued, so a large chat validated later still overtakes the small ones
+        validated.sort(key = lambda path: entries[path]["bytes"])
+        scoring = sum(1 for stage, _ in pending.values() if stage == "scoring")
+        while validated and scoring < workers:
+          path = validated.pop()
+          pending[cpu_pool.submit(score_chat, entries[path]["validated"], results[path], scorer)] = ("scoring", path)
+          scoring += 1
+  finally:
+    # The analyzer was only preloaded for the forked workers, later analyses of this process create their own
+    parallel.reset_worker()
+
+  manifest = {
+    "exports": [entries[path] for path in exportPaths],
+    "summary": {
+      "chats": len(exportPaths),
+      "failed": sum(1 for entry in entries.values() if entry["error"] is not None),
+      "messages": sum(entry.get("messages", 0) for entry in entries.values()),
+      "wall_seconds": time.perf_counter() - start,
+      "largest_chat_seconds": max((entry.get("validation_seconds", 0) + entry.get("scoring_seconds", 0) for entry in entries.values()), default = 0),
+    },
+  }
+
+  with open(os.path.join(outputPath, MANIFEST_NAME), "wb") as f:
+    f.write(orjson.dumps(manifest, option = orjson.OPT_INDENT_2))
+
+  return manifest
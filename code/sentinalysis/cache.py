@@ -0,0 +1,282 @@
+from .vader_engine import get_compound_scores
+from .utils import get_lexicon_version
+from typing import Iterable, List, Tuple
+from collections import OrderedDict
+import hashlib
+import numpy as np
+import sqlite3
+import sys
+
+# Number of messages looked up in the cache with a single query
+CACHE_BATCH_SIZE = 4096
+# SQLite refuses statements with too many parameters, so large lookups are split
+_MAX_QUERY_PARAMETERS = 900
+
+# Approximate size of a memoized score plus the bookkeeping of its entry, in bytes
+_MEMO_ENTRY_OVERHEAD = sys.getsizeof(0.0) + 100
+
+"""
+Normalizes a message so that messages which differ only in whitespace share a cache entry.
+VADER tokenizes on whitespace, so this does not change the compound score.
+
+Args:
+  msg (str): The message to be normalized.
+
+Returns:
+  str: The normalized message.
+"""
+def normalize_message(msg: str) -> str:
+  return " ".join(msg.split())
+
+"""
+Hashes the normalized text of a message. The hash is used as the cache key.
+
+Args:
+  msg (str): The message to be hashed.
+
+Returns:
+  bytes: A 16 byte digest of the normalized message.
+"""
+def get_message_key(msg: str) -> bytes:
+  return hashlib.blake2b(normalize_message(msg).encode("utf-8"), digest_size = 16).digest()
+
+"""
+Persistent on-disk cache of compound scores, stored in an SQLite database.
+Entries are keyed by get_message_key() and the whole cache is invalidated when the lexicon version changes,
+or when it is opened for the scores of another backend (see scorers.Scorer.version).
+Once the cache grows over max_entries, the least recently used entries are evicted.
+
+Args:
+  cachePath (str): The path to the SQLite database. It is created if it does not exist.
+  max_entries (int): The maximum number of cached scores.
+  read_only (bool): Opens the cache without ever writing to it. Used by worker processes.
+  version (str): The version of the cached scores. Defaults to the one of the VADER lexicon.
+"""
+class ScoreCache:
+  def __init__(self, cachePath: str, max_entries: int = 5_000_000, read_only: bool = False, version: str = None):
+    self.cachePath = cachePath
+    self.max_entries = max_entries
+    self.read_only = read_only
+    self.hits = 0
+    self.misses = 0
+
+    if read_only:
+      self.connection = sqlite3.connect(f"file:{cachePath}?mode=ro", uri = True)
+      self.generation = 0
+      return
+
+    self.connection = sqlite3.connect(cachePath)
+    self.connection.execute("PRAGMA journal_mode=WAL")
+    self.connection.execute("PRAGMA synchronous=NORMAL")
+    self.connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+    self.connection.execute("CREATE TABLE IF NOT EXISTS scores (key BLOB PRIMARY KEY, score REAL NOT NULL, last_used INTEGER NOT NULL)")
+    self.connection.execute("CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)")
+
+    lexicon_version = version or get_lexicon_version()
+    if self._get_meta("lexicon_version") != lexicon_version:
+      self.connection.execute("DELETE FROM scores")
+      self._set_meta("lexicon_version", lexicon_version)
+
+    # Every run gets a new generation number, entries used by older runs are evicted first
+    self.generation = int(self._get_meta("generation") or 0) + 1
+    self._set_meta("generation", str(self.generation))
+    self.connection.commit()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+  def _get_meta(self, name: str) -> str:
+    row = self.connection.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+  def _set_meta(self, name: str, value: str) -> None:
+    self.connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+  """
+  Looks up the scores of a batch of messages.
+
+  Args:
+    keys (List[bytes]): The keys of the messages, as returned by get_message_key().
+
+  Returns:
+    dict[bytes, float]: The cached scores. Keys that are not cached are missing from the dictionary.
+  """
+  def get_many(self, keys: List[bytes]) -> dict[bytes, float]:
+    unique_keys = list(dict.fromkeys(keys))
+    found = {}
+
+    for idx in range(0, len(unique_keys), _MAX_QUERY_PARAMETERS):
+      chunk = unique_keys[idx:idx + _MAX_QUERY_PARAMETERS]
+      placeholders = ",".join("?" * len(chunk))
+      found.update(self.connection.execute(f"SELECT key, score FROM scores WHERE key IN ({placeholders})", chunk))
+
+    if found and not self.read_only:
+      self.connection.executemany("UPDATE scores SET last_used = ? WHERE key = ?", ((self.generation, key) for key in found))
+
+    self.hits += sum(1 for key in keys if key in found)
+    self.misses += sum(1 for key in keys if key not in found)
+
+    return found
+
+  """
+  Stores the scores of a batch of messages and evicts the least recently used entries if the cache is full.
+
+  Args:
+    items (Iterable[Tuple[bytes, float]]): The (key, score) pairs to be stored.
+
+  Returns:
+    None
+  """
+  def put_many(self, items: Iterable[Tuple[bytes, float]]) -> None:
+    if self.read_only:
+      raise PermissionError("The score cache was opened in read-only mode.")
+
+    self.connection.executemany("INSERT OR REPLACE INTO scores (key, score, last_used) VALUES (?, ?, ?)",
+                                ((key, score, self.generation) for key, score in items))
+
+    overflow = len(self) - self.max_entries
+    if overflow > 0:
+      self.connection.execute("DELETE FROM scores WHERE key IN (SELECT key FROM scores ORDER BY last_used LIMIT ?)", (overflow,))
+
+    self.connection.commit()
+
+  def __len__(self) -> int:
+    return self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+  def close(self) -> None:
+    if not self.read_only:
+      self.connection.commit()
+    self.connection.close()
+
+"""
+Scores a batch of messages, reading as many scores as possible from the cache and storing the new ones.
+
+Args:
+  analyzer (SentimentIntensityAnalyzer): Returns the sentiment scores for the messages that are not cached.
+  msgs (List[str]): The messages to be scored.
+  cache (ScoreCache): The score cache.
+
+Returns:
+  Tuple[List[float], List[Tuple[bytes, float]]]: The compound score of every message, and the (key, score) pairs that were missing from the cache.
+"""
+def score_with_cache(analyzer, msgs: List[str], cache: ScoreCache) -> Tuple[List[float], List[Tuple[bytes, float]]]:
+  keys = [get_message_key(msg) for msg in msgs]
+  found = cache.get_many(keys)
+  missing = {}
+  for key, msg in zip(keys, msgs):
+    if key not in found and key not in missing:
+      missing[key] = msg
+
+  new_scores = dict(zip(missing, get_compound_scores(analyzer, list(missing.values()))))
+  scores = [found[key] if key in found else new_scores[key] for key in keys]
+
+  return scores, list(new_scores.items())
+
+"""
+In-process LRU memo around an analyzer. Repeated messages such as "ok" or "lol" are answered
+with a dictionary lookup instead of a full VADER scoring pass. Only the compound scores are memoized.
+
+Args:
+  analyzer (SentimentIntensityAnalyzer): The analyzer whose results are memoized. Analyzers with a score_batch() method,
+  like VaderBatchScorer, get all the messages missing from the memo in a single call.
+  max_entries (int): The maximum number of memoized messages. 0 disables the memo.
+  max_bytes (int): The maximum approximate memory used by the memoized messages and their scores.
+"""
+class MemoizedAnalyzer:
+  def __init__(self, analyzer, max_entries: int = 100_000, max_bytes: int = 32 * 1024 * 1024):
+    self.analyzer = analyzer
+    self.max_entries = max_entries
+    self.max_bytes = max_bytes
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.nbytes = 0
+    self._memo = OrderedDict()
+
+  def _remember(self, msg: str, score: float) -> None:
+    entry_size = sys.getsizeof(msg) + _MEMO_ENTRY_OVERHEAD
+    if self.max_entries <= 0 or entry_size > self.max_bytes:
+      return
+
+    self._memo[msg] = score
+    self.nbytes += entry_size
+
+    while len(self._memo) > self.max_entries or self.nbytes > self.max_bytes:
+      evicted_msg, _ = self._memo.popitem(last = False)
+      self.nbytes -= sys.getsizeof(evicted_msg) + _MEMO_ENTRY_OVERHEAD
+      self.evictions += 1
+
+  """
+  Computes the compound scores of a batch of messages, from the memo if possible.
+
+  Args:
+    msgs (List[str]): The messages to be scored.
+
+  Returns:
+    np.ndarray: The compound score of every message.
+  """
+  def score_batch(self, msgs: List[str]) -> np.ndarray:
+    memo = self._memo
+    scores = np.empty(len(msgs), dtype = np.float64)
+    missing = {}
+
+    for idx, msg in enumerate(msgs):
+      score = memo.get(msg)
+      if score is not None:
+        memo.move_to_end(msg)
+        scores[idx] = score
+      else:
+        missing.setdefault(msg, []).append(idx)
+
+    self.misses += len(missing)
+    self.hits += len(msgs) - len(missing)
+
+    if missing:
+      missing_msgs = list(missing)
+      for msg, score in zip(missing_msgs, get_compound_scores(self.analyzer, missing_msgs)):
+        scores[missing[msg]] = score
+        self._remember(msg, score)
+
+    return scores
+
+  """
+  Returns the compound score of a message in the format of nltk's polarity_scores(), from the memo if possible.
+
+  Args:
+    msg (str): The message to be analyzed.
+
+  Returns:
+    dict: A dictionary with the "compound" score of the message.
+  """
+  def polarity_scores(self, msg: str) -> dict:
+    return {"compound": float(self.score_batch([msg])[0])}
+
+  def __len__(self) -> int:
+    return len(self._memo)
+
+  """
+  Returns the memo counters, in the spirit of functools.lru_cache's cache_info().
+
+  Args:
+    None
+
+  Returns:
+    dict: The hits, misses, evictions, current size and hit rate of the memo.
+  """
+  def cache_info(self) -> dict:
+    lookups = self.hits + self.misses
+    return {
+      "hits": self.hits,
+      "misses": self.misses,
+      "evictions": self.evictions,
+      "entries": len(self._memo),
+      "nbytes": self.nbytes,
+      "hit_rate": self.hits / lookups if lookups else 0.0,
+    }
+
+  def clear(self) -> None:
+    self._memo.clear()
+    self.nbytes = 0
@@ -0,0 +1,217 @@
+from .utils import get_lexicon_version
+import hashlib
+import orjson
+import os
+
+CHECKPOINT_VERSION = 2
+# Number of bytes before the checkpoint offset that have to be identical for a file to be considered a continuation
+FINGERPRINT_WINDOW = 64 * 1024
+
+"""
+Returns the size of a file without the newline characters at its end.
+Exports usually end without a newline, which is added as soon as another message follows.
+
+Args:
+  filePath (str): The path to the file.
+
+Returns:
+  int: The offset right after the last non-newline byte.
+"""
+def get_content_end(filePath: str) -> int:
+  end = os.path.getsize(filePath)
+
+  with open(filePath, "rb") as f:
+    while end > 0:
+      f.seek(end - 1)
+      if f.read(1) not in (b"\n", b"\r"):
+        break
+      end -= 1
+
+  return end
+
+"""
+Returns the offset of the first byte of the line that ends at an offset.
+
+Args:
+  f (BinaryIO): The file, opened in binary mode.
+  offset (int): The offset right after the line.
+
+Returns:
+  int: The offset of the first byte of the line.
+"""
+def get_line_start(f, offset: int) -> int:
+  end = max(0, offset - 1)
+  while end > 0:
+    start = max(0, end - FINGERPRINT_WINDOW)
+    f.seek(start)
+    newline = f.read(end - start).rfind(b"\n")
+    if newline != -1:
+      return start + newline + 1
+    end = start
+
+  return 0
+
+"""
+Hashes the bytes that come right before an offset: the whole last line, and at least FINGERPRINT_WINDOW bytes.
+If a later export contains the same bytes before the same offset, everything up to that offset is assumed to be unchanged.
+
+Args:
+  filePath (str): The path to the file.
+  offset (int): The offset where the hashed window ends.
+
+Returns:
+  str: The hex digest of the window.
+"""
+def get_fingerprint(filePath: str, offset: int) -> str:
+  digest = hashlib.sha256()
+
+  with open(filePath, "rb") as f:
+    start = min(max(0, offset - FINGERPRINT_WINDOW), get_line_start(f, offset))
+    f.seek(start)
+    while start < offset:
+      chunk = f.read(min(FINGERPRINT_WINDOW, offset - start))
+      if not chunk:
+        break
+      digest.update(chunk)
+      start += len(chunk)
+
+  return digest.hexdigest()
+
+"""
+State of a finished analysis, which allows a later run on a re-exported chat to only analyze the appended messages.
+It holds the running totals of every member (the members_sentiment_cache of sentiment_analysis()),
+the offset where the analyzed content ended, and a fingerprint of the last analyzed message and the content right before it.
+
+Args:
+  offset (int): The offset right after the last analyzed message.
+  fingerprint (str): The value of get_fingerprint() at the offset.
+  members_sentiment_cache (dict[str, float]): The running total of every member.
+  message_count (int): The number of messages analyzed so far.
+  lexicon_version (str): The lexicon version the totals were computed with, or the version of the scores of another backend.
+"""
+class Checkpoint:
+  def __init__(self,
+               offset: int = 0,
+               fingerprint: str = None,
+               members_sentiment_cache: dict[str, float] = None,
+               message_count: int = 0,
+               lexicon_version: str = None):
+    self.offset = offset
+    self.fingerprint = fingerprint
+    self.members_sentiment_cache = members_sentiment_cache if members_sentiment_cache is not None else {}
+    self.message_count = message_count
+    self.lexicon_version = lexicon_version
+
+  """
+  Creates the checkpoint of a file that was analyzed up to its end.
+
+  Args:
+    filePath (str): The path to the analyzed file.
+    members_sentiment_cache (dict[str, float]): The running total of every member after the analysis.
+    message_count (int): The number of messages analyzed so far.
+    version (str): The version of the scores (see scorers.Scorer.version). Defaults to the one of the VADER lexicon.
+
+  Returns:
+    Checkpoint: The checkpoint.
+  """
+  @classmethod
+  def create(cls, filePath: str, members_sentiment_cache: dict[str, float], message_count: int = 0, version: str = None) -> "Checkpoint":
+    offset = get_content_end(filePath)
+    return cls(offset, get_fingerprint(filePath, offset), dict(members_sentiment_cache), message_count, version or get_lexicon_version())
+
+  """
+  Loads a checkpoint saved with save().
+
+  Args:
+    checkpointPath (str): The path to the checkpoint file.
+
+  Returns:
+    Checkpoint: The checkpoint, or None if the file does not exist or was written by an incompatible version.
+  """
+  @classmethod
+  def load(cls, checkpointPath: str) -> "Checkpoint":
+    if not os.path.isfile(checkpointPath):
+      return None
+
+    with open(checkpointPath, "rb") as f:
+      return cls.loads(f.read())
+
+  """
+  Reads a checkpoint serialized with dumps(), e.g. one kept in a MessageStore.
+
+  Args:
+    data (bytes): The serialized checkpoint.
+
+  Returns:
+    Checkpoint: The checkpoint, or None if it was written by an incompatible version.
+  """
+  @classmethod
+  def loads(cls, data: bytes) -> "Checkpoint":
+    data = orjson.loads(data)
+    if data.get("version") != CHECKPOINT_VERSION:
+      return None
+
+    return cls(data["offset"], data["fingerprint"], data["members_sentiment_cache"], data["message_count"], data["lexicon_version"])
+
+  """
+  Serializes the checkpoint.
+
+  Args:
+    None
+
+  Returns:
+    bytes: The checkpoint as JSON.
+  """
+  def dumps(self) -> bytes:
+    return orjson.dumps({
+      "version": CHECKPOINT_VERSION,
+      "offset": self.offset,
+      "fingerprint": self.fingerprint,
+      "members_sentiment_cache": self.members_sentiment_cache,
+      "message_count": self.message_count,
+      "lexicon_version": self.lexicon_version,
+    })
+
+  """
+  Saves the checkpoint. The file is replaced atomically, so an interrupted run never leaves a broken checkpoint behind.
+
+  Args:
+    checkpointPath (str): The path to the checkpoint file.
+
+  Returns:
+    None
+  """
+  def save(self, checkpointPath: str) -> None:
+    with open(f"{checkpointPath}.tmp", "wb") as f:
+      f.write(self.dumps())
+    os.replace(f"{checkpointPath}.tmp", checkpointPath)
+
+  """
+  Checks whether a file continues the content this checkpoint was created from: the content before the offset is unchanged,
+  and the offset still ends a line, so the last analyzed message was not extended by the new export.
+
+  Args:
+    filePath (str): The path to the new file.
+    version (str): The version of the scores of the new analysis. Defaults to the one of the VADER lexicon.
+
+  Returns:
+    int: The offset of the first new line, or 0 if the whole file has to be analyzed again.
+  """
+  def get_resume_offset(self, filePath: str, version: str = None) -> int:
+    if self.lexicon_version != (version or get_lexicon_version()) or self.offset <= 0:
+      return 0
+    if os.path.getsize(filePath) < self.offset or get_fingerprint(filePath, self.offset) != self.fingerprint:
+      return 0
+
+    # The newline that ended the last analyzed message may only have been added by the new export
+    offset = self.offset
+    with open(filePath, "rb") as f:
+      f.seek(offset)
+      byte = f.read(1)
+      if byte not in (b"", b"\r", b"\n"):
+        return 0
+      while byte in (b"\r", b"\n"):
+        offset += 1
+        byte = f.read(1)
+
+    return offset
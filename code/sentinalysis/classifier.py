@@ -0,0 +1,309 @@
+from .config import header_prefix_pattern, header_prefix_bytes_pattern
+from collections import Counter
+from typing import Iterable, List, Tuple
+import re
+
+# System messages without a sender, grouped by category. They are matched word by word,
+# so "left" drops "Alice left" but not a message that mentions "cleft" or "leftovers".
+SYSTEM_TEMPLATES = {
+  "membership": [
+    "added",
+    "removed",
+    "left",
+    "was added",
+    "created group",
+    "joined using this group's invite link",
+    "joined from the community",
+  ],
+  "admin": [
+    "now an admin",
+    "no longer an admin",
+    "turned on admin approval to join this group",
+  ],
+  "settings": [
+    "changed the settings so only admins can edit the group settings",
+    "changed the settings so all members can edit the group settings",
+    "changed this group's settings to allow only admins to send messages to this group",
+    "changed this group's settings to allow all members to send messages to this group",
+    "changed this group's settings to allow only admins to add others to this group",
+    "changed this group's icon",
+    "changed the group description",
+    "changed to",
+    "changed the subject from",
+    "changed the group name from",
+    "changed their phone number to a new number. Tap to message or add the new number.",
+    "updated the message timer. New messages will disappear from this chat 7 days after they're sent, except when kept.",
+  ],
+  "pinned": [
+    "pinned a message",
+  ],
+  "call": [
+    "started a call",
+  ],
+  "notice": [
+    "Messages and calls are end-to-end encrypted. Only people in this chat can read, listen to, or share them. Learn more.",
+    "This group has over 256 members so now only admins can edit the group settings.",
+    "New members need admin approval to join this group.",
+    "As a member, you can join groups in the community and get admin updates",
+    "As a member, you can join groups in the community and get admin updatesYour profile is visible to admins",
+    "Your profile is visible to admins",
+  ],
+}
+
+# Message bodies that WhatsApp writes in place of the content of a user message
+PLACEHOLDER_BODIES = {
+  "media": [
+    "<Media omitted>",
+    "You received a view once message. For added privacy, you can only open it on your phone.",
+    "image omitted",
+    "video omitted",
+    "audio omitted",
+    "sticker omitted",
+    "GIF omitted",
+    "document omitted",
+    "Contact card omitted",
+  ],
+  "deleted": [
+    "This message was deleted",
+    "This message was deleted.",
+    "You deleted this message",
+    "You deleted this message.",
+  ],
+}
+
+# iOS exports write system messages as messages of the group, with a left-to-right mark before the text
+_IOS_SYSTEM_MARK = "\u200e"
+
+# Whitespace around a placeholder body that is still recognized, like the line's newline
+_PLACEHOLDER_WHITESPACE = 16
+
+# Maximum number of senders in the pattern of get_message_run_pattern(), the messages of later ones are classified line by line
+MAX_RUN_SENDERS = 256
+
+# Lines without a timestamp are continuations of user messages, so only templates this long are trusted to be system messages there
+_STANDALONE_TEMPLATE_WORDS = 4
+
+"""
+Word-level Aho-Corasick automaton. Every template is a sequence of words, and a text matches when
+one of the templates appears as consecutive whole words in it. All templates are found in a single pass over the words.
+
+Args:
+  templates (Iterable[Tuple[str, str]]): The (template, category) pairs.
+"""
+class WordAutomaton:
+  def __init__(self, templates: Iterable[Tuple[str, str]]):
+    self._goto = [{}]
+    self._fail = [0]
+    self._output = [None]
+
+    for template, category in templates:
+      state = 0
+      for word in template.split():
+        next_state = self._goto[state].get(word)
+        if next_state is None:
+          next_state = len(self._goto)
+          self._goto[state][word] = next_state
+          self._goto.append({})
+          self._fail.append(0)
+          self._output.append(None)
+        state = next_state
+      self._output[state] = category
+
+    # Breadth-first construction of the failure links
+    queue = list(self._goto[0].values())
+    for state in queue:
+      for word, next_state in self._goto[state].items():
+        queue.append(next_state)
+
+        fail = self._fail[state]
+        while fail and word not in self._goto[fail]:
+          fail = self._fail[fail]
+        self._fail[next_state] = self._goto[fail].get(word, 0)
+
+        if self._output[next_state] is None:
+          self._output[next_state] = self._output[self._fail[next_state]]
+
+  """
+  Finds the first template contained in a sequence of words.
+
+  Args:
+    words (List[str]): The words of the text.
+
+  Returns:
+    str: The category of the first template that ends in the text, or None if there is none.
+  """
+  def search(self, words: List[str]) -> str:
+    goto, fail, output = self._goto, self._fail, self._output
+    state = 0
+
+    for word in words:
+      while state and word not in goto[state]:
+        state = fail[state]
+      state = goto[state].get(word, 0)
+
+      if output[state] is not None:
+        return output[state]
+
+    return None
+
+"""
+Classifies the lines of an exported chat as user messages or system messages, looking only at what follows the timestamp.
+
+A line with a timestamp is a user message if it contains a "sender: " part. The sender part is checked against the system templates,
+since system messages such as group renames can contain colons, and the body only against the placeholders WhatsApp writes
+instead of media or deleted messages. A user message that merely contains "added", "left" or "removed" is therefore kept.
+A line with a timestamp and no sender is always a system message, counted as "unknown" if it matches no template.
+So is a body that starts with the left-to-right mark iOS exports put in front of system messages and placeholders.
+Lines without a timestamp are message continuations, and are only dropped when they contain one of the long, unambiguous templates.
+
+Every dropped line is counted in counts, by category.
+
+Args:
+  binary (bool): Classifies UTF-8 encoded bytes lines instead of str lines.
+"""
+class SystemLineClassifier:
+  def __init__(self, binary: bool = False):
+    encode = (lambda text: text.encode("utf-8")) if binary else (lambda text: text)
+
+    self.counts = Counter()
+    self._automaton = WordAutomaton((encode(template), category) for category, templates in SYSTEM_TEMPLATES.items() for template in templates)
+    self._standalone_automaton = WordAutomaton((encode(template), category) for category, templates in SYSTEM_TEMPLATES.items()
+                                               for template in templates if len(template.split()) >= _STANDALONE_TEMPLATE_WORDS)
+    self._placeholders = {encode(body): category for category, bodies in PLACEHOLDER_BODIES.items() for body in bodies}
+    self._max_placeholder_length = max(map(len, self._placeholders)) + _PLACEHOLDER_WHITESPACE
+    self.header_prefix_pattern = header_prefix_bytes_pattern if binary else header_prefix_pattern
+    self._separator = encode(": ")
+    self._ios_system_mark = encode(_IOS_SYSTEM_MARK)
+    # Chats have few distinct senders, so the category of every sender part is only searched for once
+    self._sender_categories = {}
+    self._run_senders = []
+    self._run_header = None
+    self._run_pattern = None
+    self._encode = encode
+
+  """
+  Returns the system category of a line, without counting it.
+
+  Args:
+    line (str): A line of the exported chat, as bytes for a binary classifier.
+
+  Returns:
+    str: The category of the system message, or None if the line is (part of) a user message.
+  """
+  def classify(self, line: str) -> str:
+    return self.classify_match(line, self.header_prefix_pattern.match(line))
+
+  """
+  Same as classify(), for a line whose timestamp was already matched with header_prefix_pattern.
+  Lets callers that need the match themselves run the pattern only once per line.
+
+  Args:
+    line (str): A line of the exported chat, as bytes for a binary classifier.
+    header (re.Match): The match of header_prefix_pattern at the start of the line, or None.
+
+  Returns:
+    str: The category of the system message, or None if the line is (part of) a user message.
+  """
+  def classify_match(self, line: str, header: re.Match) -> str:
+    if header is None:
+      return self._standalone_automaton.search(line.split())
+
+    start = header.end()
+    separator = line.find(self._separator, start)
+
+    if separator == -1:
+      return self._automaton.search(line[start:].split()) or "unknown"
+
+    sender = line[start:separator]
+    try:
+      category = self._sender_categories[sender]
+    except KeyError:
+      category = self._sender_categories[sender] = self._automaton.search(sender.split())
+      if category is None and len(self._run_senders) < MAX_RUN_SENDERS:
+        if self._run_header is None:
+          self._run_header = self._get_run_header(header.group())
+        self._run_senders.append(sender)
+        self._run_pattern = None
+    if category is not None:
+      return category
+
+    body_start = separator + len(self._separator)
+    if line.startswith(self._ios_system_mark, body_start):
+      body = line[body_start:].strip()
+      while body.startswith(self._ios_system_mark):
+        body = body[len(self._ios_system_mark):]
+      return self._placeholders.get(body) or self._automaton.search(body.split()) or "unknown"
+
+    # Only bodies as short as a placeholder have to be looked up, which spares copying long messages
+    if len(line) - body_start > self._max_placeholder_length:
+      return None
+    return self._placeholders.get(line[body_start:].strip())
+
+  """
+  Turns the timestamp of a message into a pattern for the timestamps of the same shape, e.g. "9/17/22, 18:54 - " into
+  "\\d{1,2}/\\d{1,2}/\\d{1,2}, \\d{1,2}:\\d{2} - ". The shape pattern has no optional parts, which makes it several times faster
+  than header_prefix_pattern, and every timestamp it matches is matched by header_prefix_pattern as well.
+
+  Args:
+    header (str): A timestamp matched by header_prefix_pattern.
+
+  Returns:
+    str: The pattern, or header_prefix_pattern's own pattern if the timestamp has an unexpected shape.
+  """
+  def _get_run_header(self, header: str) -> str:
+    tokens = re.split(self._encode(r"(\d+)"), header)
+    digits = tokens[1::2]
+    if len(digits) not in (5, 6):
+      return self.header_prefix_pattern.pattern
+
+    # The date fields and the hour have a variable width, minutes and seconds always have 2 digits
+    fields = [self._encode(r"\d{1,2}") if len(digit) <= 2 else self._encode(r"\d{4}") for digit in digits[:4]] + [self._encode(r"\d{2}")] * (len(digits) - 4)
+    # AM and PM share their shape
+    separators = [re.sub(self._encode("[AaPp]"), self._encode("[AaPp]"), re.escape(text)) for text in tokens[0::2]]
+
+    pattern = separators[0]
+    for field, separator in zip(fields, separators[1:]):
+      pattern += field + separator
+    return pattern
+
+  """
+  Returns a pattern that matches a run of consecutive lines which classify_match() would all keep as single-line user messages:
+  a timestamp, a sender already known to be a user, and a body that is no placeholder. Runs can be copied as they are,
+  so validating the regular parts of an export needs one pattern match instead of a classification per line.
+  The pattern only knows the senders seen so far and is rebuilt when a new one appears, lines it does not match have to be classified.
+
+  Args:
+    None
+
+  Returns:
+    re.Pattern: The pattern, or None before the first user message was classified.
+  """
+  def get_message_run_pattern(self) -> re.Pattern:
+    if self._run_pattern is None and self._run_senders:
+      join = self._encode("|").join
+      self._run_pattern = re.compile(self._encode(r"(?:%s(?:%s)%s(?!%s|\s*(?:%s))[^\n]*\n)+") % (
+        self._run_header,
+        join(map(re.escape, self._run_senders)),
+        re.escape(self._separator),
+        re.escape(self._ios_system_mark),
+        join(map(re.escape, self._placeholders)),
+      ))
+
+    return self._run_pattern
+
+  """
+  Checks whether a line is a system message and counts it if so.
+
+  Args:
+    line (str): A line of the exported chat, as bytes for a binary classifier.
+
+  Returns:
+    bool: True if the line should be dropped.
+  """
+  def is_system_line(self, line: str) -> bool:
+    category = self.classify(line)
+    if category is None:
+      return False
+
+    self.counts[category] += 1
+    return True
@@ -1,2 +1,266 @@
-from .utils import check_vader_lexicon
-check_vader_lexicon()
\ No newline at end of file
+from typing import List
+import argparse
+import sys
+import os
+
+# Only the standard library is imported here. Every command imports what it needs when it runs,
+# so "--help", validate and convert never load nltk or matplotlib (see tests/test_cli.py).
+
+"""
+Runs the validate command: writes the validated copy of an export (see validation.data_validation()).
+
+Args:
+  args (argparse.Namespace): The parsed arguments of the command.
+
+Returns:
+  int: The exit code.
+"""
+def run_validate(args: argparse.Namespace) -> int:
+  from .validation import data_validation
+
+  os.makedirs(args.output, exist_ok = True)
+  print(data_validation(args.export, args.output, binary = args.binary))
+  return 0
+
+"""
+Runs the convert command: converts a validated export to another format (see converters).
+
+Args:
+  args (argparse.Namespace): The parsed arguments of the command.
+
+Returns:
+  int: The exit code.
+"""
+def run_convert(args: argparse.Namespace) -> int:
+  from . import converters
+
+  if args.to == "json":
+    print(converters.convert_txt_to_json(args.file))
+  elif args.to == "jsonl":
+    print(converters.convert_txt_to_json(args.file, ndjson = True))
+  elif args.to == "csv":
+    print(converters.convert_txt_to_csv(args.file))
+  else:
+    print(converters.convert_txt_to_columns(args.file))
+
+  return 0
+
+"""
+Runs the analyze command: scores a validated or converted export and saves the result as JSON (see batch.save_result()).
+
+Args:
+  args (argparse.Namespace): The parsed arguments of the command.
+
+Returns:
+  int: The exit code.
+"""
+def run_analyze(args: argparse.Namespace) -> int:
+  from .sentiment import sentiment_analysis
+  from .batch import save_result
+
+  result = sentiment_analysis(args.file, args.workers, args.cache, columnar = True, engine = args.engine, checkpointPath = args.checkpoint)
+  save_result(result, args.output)
+
+  print(f"Analyzed {sum(len(result.scores(name)) for name in result)} messages of {len(result)} members.")
+  print(f"Result: {os.path.abspath(args.output)}")
+  return 0
+
+"""
+Runs the chart command: analyzes an export and renders a chart for each member (see plotting).
+
+Args:
+  args (argparse.Namespace): The parsed arguments of the command.
+
+Returns:
+  int: The exit code.
+"""
+def run_chart(args: argparse.Namespace) -> int:
+  from .sentiment import sentiment_analysis
+  from . import plotting
+
+  if args.kind == "rolling":
+    # The statistics are computed while the messages are scored, in a single pass
+    from .rolling import RollingSink
+    statistics = sentiment_analysis(args.file, engine = args.engine, sink = RollingSink(args.window, args.days, args.span))
+    plotting.get_rolling_charts(statistics, args.output, workers = args.workers)
+  else:
+    result = sentiment_analysis(args.file, columnar = True, engine = args.engine)
+    if args.kind == "candlestick":
+      plotting.get_candlestick_charts(result, args.output, args.freq, args.workers)
+    else:
+      plotting.get_charts(result, args.output, args.workers, args.downsample)
+
+  print(f"Charts: {os.path.abspath(args.output)}")
+  return 0
+
+"""
+Runs the interactions command: analyzes who replies to whom in a chat (see interactions.interaction_analysis()).
+
+Args:
+  args (argparse.Namespace): The parsed arguments of the command.
+
+Returns:
+  int: The exit code.
+"""
+def run_interactions(args: argparse.Namespace) -> int:
+  from .interactions import interaction_analysis, save_interactions
+
+  interactions = interaction_analysis(args.file, args.max_gap, args.cache, args.engine)
+  save_interactions(interactions, args.output)
+
+  print(f"Found {int(interactions['count'].sum())} replies between {len(interactions['members'])} members.")
+  print(f"Result: {os.path.abspath(args.output)}")
+
+  if args.heatmap is not None:
+    from .plotting import get_interaction_heatmap
+    for value in ("count", "mean"):
+      get_interaction_heatmap(interactions, args.heatmap, value)
+    print(f"Heatmaps: {os.path.abspath(args.heatmap)}")
+
+  return 0
+
+"""
+Runs the batch command: validates and analyzes every export matched by the pattern (see batch.batch_analysis()).
+
+Args:
+  args (argparse.Namespace): The parsed arguments of the command.
+
+Returns:
+  int: The exit code, 1 if any chat failed.
+"""
+def run_batch(args: argparse.Namespace) -> int:
+  from .batch import batch_analysis, find_exports
+
+  exportPaths = find_exports(args.exports)
+  if not exportPaths:
+    print(f"No exported chats found for {args.exports}", file = sys.stderr)
+    return 1
+
+  manifest = batch_analysis(exportPaths, args.output, args.workers, args.threads, args.engine)
+  summary = manifest["summary"]
+
+  for entry in manifest["exports"]:
+    if entry["error"] is not None:
+      print(f"{entry['export']}: {entry['error']}", file = sys.stderr)
+
+  print(f"Analyzed {summary['chats'] - summary['failed']} of {summary['chats']} chats ({summary['messages']} messages) "
+        f"in {summary['wall_seconds']:.1f}s, the largest one took {summary['largest_chat_seconds']:.1f}s.")
+  print(f"Results: {os.path.abspath(args.output)}")
+
+  return 1 if summary["failed"] else 0
+
+"""
+Runs the train-scorer command: trains a hashed linear scorer on chats and saves it (see scorers.train_linear_scorer()).
+
+Args:
+  args (argparse.Namespace): The parsed arguments of the command.
+
+Returns:
+  int: The exit code.
+"""
+def run_train_scorer(args: argparse.Namespace) -> int:
+  from .scorers import train_linear_scorer
+
+  train_linear_scorer(args.files, args.output, args.teacher, args.features, args.epochs)
+  print(f"Model: {os.path.abspath(args.output)}")
+  print(f"Use it with --engine linear:{args.output}")
+
+  return 0
+
+"""
+Builds the parser of the command line interface.
+
+Args:
+  None
+
+Returns:
+  argparse.ArgumentParser: The parser.
+"""
+def get_parser() -> argparse.ArgumentParser:
+  parser = argparse.ArgumentParser(prog = "sentinalysis", description = "Sentiment analysis of exported WhatsApp chats.")
+  parser.add_argument("--metrics", default = None, metavar = "FILE", help = "save the time, lines, cache hit rates and memory of every stage to a JSON file")
+  parser.add_argument("--progress", action = "store_true", help = "show a progress bar of every stage")
+  parser.add_argument("--profile", default = None, metavar = "DIR", help = "profile every stage with cProfile and save the statistics to this directory")
+  parser.add_argument("--trace-memory", action = "store_true", help = "record the peak Python allocations of every stage with tracemalloc, slows the run down")
+  commands = parser.add_subparsers(dest = "command", required = True)
+
+  validate = commands.add_parser("validate", help = "remove system messages from an exported chat and join multi-line messages")
+  validate.add_argument("export", help = "the exported .txt chat")
+  validate.add_argument("-o", "--output", default = ".", help = "the directory of the validated file")
+  validate.add_argument("--binary", action = "store_true", help = "validate the bytes of the export without decoding them, faster for large exports")
+  validate.set_defaults(run = run_validate)
+
+  convert = commands.add_parser("convert", help = "convert a validated chat to another format")
+  convert.add_argument("file", help = "the validated .txt chat")
+  convert.add_argument("--to", choices = ("json", "jsonl", "csv", "columns"), default = "jsonl", help = "the format of the converted file")
+  convert.set_defaults(run = run_convert)
+
+  analyze = commands.add_parser("analyze", help = "score the messages of a validated or converted chat")
+  analyze.add_argument("file", help = "the validated .txt chat, or a converted .json, .jsonl, .csv or columns file")
+  analyze.add_argument("-o", "--output", default = "sentinalysis-result.json", help = "the JSON file of the result")
+  analyze.add_argument("-w", "--workers", type = int, default = 1, help = "the number of scoring processes")
+  analyze.add_argument("--engine", default = "nltk", help = "the scoring backend: nltk, batch or linear:MODEL")
+  analyze.add_argument("--cache", default = None, help = "the path of a persistent score cache")
+  analyze.add_argument("--checkpoint", default = None, help = "the path of a checkpoint, only messages appended since it are analyzed")
+  analyze.set_defaults(run = run_analyze)
+
+  chart = commands.add_parser("chart", help = "render a sentiment chart for each member of a chat")
+  chart.add_argument("file", help = "the validated .txt chat, or a converted .json, .jsonl, .csv or columns file")
+  chart.add_argument("-o", "--output", default = ".", help = "the directory of the charts")
+  chart.add_argument("--kind", choices = ("line", "candlestick", "rolling"), default = "line", help = "the kind of chart")
+  chart.add_argument("--freq", choices = ("D", "W", "M"), default = "W", help = "the bucket size of candlestick charts")
+  chart.add_argument("--window", type = int, default = 50, help = "the messages in the rolling mean and variance of rolling charts")
+  chart.add_argument("--days", type = int, default = 7, help = "the days in the windowed mean and message rate of rolling charts")
+  chart.add_argument("--span", type = int, default = 20, help = "the span in messages of the moving average of rolling charts")
+  chart.add_argument("--downsample", choices = ("minmax", "lttb"), default = None, help = "reduce the points of line charts before plotting")
+  chart.add_argument("-w", "--workers", type = int, default = 1, help = "the number of rendering processes")
+  chart.add_argument("--engine", default = "nltk", help = "the scoring backend: nltk, batch or linear:MODEL")
+  chart.set_defaults(run = run_chart)
+
+  interactions = commands.add_parser("interactions", help = "count the replies between the members of a chat and their sentiment")
+  interactions.add_argument("file", help = "the validated .txt chat, or a converted .json, .jsonl, .csv or columns file")
+  interactions.add_argument("-o", "--output", default = "sentinalysis-interactions.csv", help = "the CSV file of the reply counts")
+  interactions.add_argument("--max-gap", type = int, default = 10, help = "the longest time in minutes between a message and the one it replies to")
+  interactions.add_argument("--heatmap", default = None, help = "the directory of the heatmaps, not rendered if not provided")
+  interactions.add_argument("--engine", default = "nltk", help = "the scoring backend: nltk, batch or linear:MODEL")
+  interactions.add_argument("--cache", default = None, help = "the path of a persistent score cache")
+  interactions.set_defaults(run = run_interactions)
+
+  batch = commands.add_parser("batch", help = "validate and analyze a directory of exported chats concurrently")
+  batch.add_argument("exports", help = "a directory of exported .txt chats, or a glob pattern such as 'exports/**/*.txt'")
+  batch.add_argument("-o", "--output", default = "sentinalysis-batch", help = "the directory of the results and the manifest")
+  batch.add_argument("-w", "--workers", type = int, default = None, help = "the number of scoring processes, defaults to the number of CPUs")
+  batch.add_argument("-t", "--threads", type = int, default = 4, help = "the number of validation threads")
+  batch.add_argument("--engine", default = "nltk", help = "the scoring backend: nltk, batch or linear:MODEL")
+  batch.set_defaults(run = run_batch)
+
+  train = commands.add_parser("train-scorer", help = "train a fast hashed linear scorer to reproduce the VADER scores of chats")
+  train.add_argument("files", nargs = "+", help = "the validated .txt chats, or converted .json, .jsonl, .csv or columns files")
+  train.add_argument("-o", "--output", default = "sentinalysis-linear.joblib", help = "the file of the model")
+  train.add_argument("--teacher", default = "batch", help = "the scoring backend whose scores are learned")
+  train.add_argument("--features", type = int, default = 1 << 18, help = "the number of weights of the model, a power of 2")
+  train.add_argument("--epochs", type = int, default = 5, help = "the number of passes over the messages")
+  train.set_defaults(run = run_train_scorer)
+
+  return parser
+
+"""
+Entry point of the command line interface, e.g. "python -m sentinalysis.cli analyze validated-chat.txt -o result.json".
+
+Args:
+  argv (List[str]): The arguments, defaults to the ones of the process.
+
+Returns:
+  int: The exit code.
+"""
+def main(argv: List[str] = None) -> int:
+  args = get_parser().parse_args(argv)
+  if args.metrics is None and not args.progress and args.profile is None and not args.trace_memory:
+    return args.run(args)
+
+  from .instrumentation import instrument
+  with instrument(jsonPath = args.metrics, profileDir = args.profile, trace_memory = args.trace_memory, progress = args.progress):
+    return args.run(args)
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,254 @@
+from .utils import get_lexicon_version
+from datetime import date
+from typing import Iterator, List, Tuple, Union
+from array import array
+import numpy as np
+import orjson
+import mmap
+import os
+
+COLUMNS_EXTENSION = ".columns"
+COLUMNS_VERSION = 1
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Number of rows whose timestamps and senders are converted to Python objects at once
+_ROW_CHUNK = 8192
+
+"""
+Writes the messages of a chat as a directory of binary columns, which ChatColumns reads back without parsing:
+  - timestamp.npy: the minute of every message, as datetime64[m]
+  - sender.npy: the index of every sender in the "senders" list of meta.json, as int32
+  - message.bin and message_offsets.npy: the UTF-8 messages back to back, and the int64 offset where each one starts
+Messages are streamed to disk as they are appended, the other columns take 12 bytes per message until close() saves them.
+
+Args:
+  columnsPath (str): The path of the directory. It is created if it does not exist.
+"""
+class ColumnsWriter:
+  def __init__(self, columnsPath: str):
+    os.makedirs(columnsPath, exist_ok = True)
+    self.columnsPath = columnsPath
+    self._timestamps = array("q")
+    self._sender_codes = array("i")
+    self._offsets = array("q", [0])
+    self._senders = {}
+    self._messages = open(os.path.join(columnsPath, "message.bin"), "wb", buffering = 1024 * 1024)
+
+  """
+  Adds a message at the end of the columns.
+
+  Args:
+    timestamp (int): The minutes since 1970-01-01 00:00 of the message (see TimestampParser.get_minutes()).
+    sender (str): The name of the person who sent the message.
+    msg (str): The message content.
+
+  Returns:
+    None
+  """
+  def append(self, timestamp: int, sender: str, msg: str) -> None:
+    code = self._senders.get(sender)
+    if code is None:
+      code = self._senders[sender] = len(self._senders)
+
+    data = msg.encode("utf-8")
+    self._messages.write(data)
+    self._offsets.append(self._offsets[-1] + len(data))
+    self._timestamps.append(timestamp)
+    self._sender_codes.append(code)
+
+  """
+  Saves the columns and the metadata.
+
+  Args:
+    None
+
+  Returns:
+    None
+  """
+  def close(self) -> None:
+    self._messages.close()
+
+    np.save(os.path.join(self.columnsPath, "timestamp.npy"), np.frombuffer(self._timestamps, dtype = np.int64).astype("datetime64[m]"))
+    np.save(os.path.join(self.columnsPath, "sender.npy"), np.frombuffer(self._sender_codes, dtype = np.int32))
+    np.save(os.path.join(self.columnsPath, "message_offsets.npy"), np.frombuffer(self._offsets, dtype = np.int64))
+
+    write_meta(self.columnsPath, {"version": COLUMNS_VERSION, "rows": len(self._timestamps), "senders": list(self._senders)})
+
+  def __enter__(self) -> "ColumnsWriter":
+    return self
+
+  def __exit__(self, *exc_info) -> None:
+    self.close()
+
+"""
+Replaces the metadata of a columns directory atomically.
+
+Args:
+  columnsPath (str): The path of the directory.
+  meta (dict): The metadata.
+
+Returns:
+  None
+"""
+def write_meta(columnsPath: str, meta: dict) -> None:
+  metaPath = os.path.join(columnsPath, "meta.json")
+
+  with open(f"{metaPath}.tmp", "wb") as f:
+    f.write(orjson.dumps(meta))
+  os.replace(f"{metaPath}.tmp", metaPath)
+
+"""
+Read-only view of a directory written by ColumnsWriter. Every column is memory-mapped,
+so opening a chat costs the same no matter its size, and only the rows that are read are loaded from disk.
+
+Args:
+  columnsPath (str): The path of the directory.
+"""
+class ChatColumns:
+  def __init__(self, columnsPath: str):
+    with open(os.path.join(columnsPath, "meta.json"), "rb") as f:
+      self.meta = orjson.loads(f.read())
+
+    if self.meta.get("version") != COLUMNS_VERSION:
+      raise ValueError(f"Unsupported columns version: {self.meta.get('version')}")
+
+    self.columnsPath = columnsPath
+    self.senders = self.meta["senders"]
+    self.timestamps = np.load(os.path.join(columnsPath, "timestamp.npy"), mmap_mode = "r")
+    self.sender_codes = np.load(os.path.join(columnsPath, "sender.npy"), mmap_mode = "r")
+    self.message_offsets = np.load(os.path.join(columnsPath, "message_offsets.npy"), mmap_mode = "r")
+
+    # Empty files cannot be memory-mapped
+    with open(os.path.join(columnsPath, "message.bin"), "rb") as f:
+      self._messages = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+  def __len__(self) -> int:
+    return self.meta["rows"]
+
+  """
+  Returns the number of days between 1970-01-01 and every message.
+
+  Args:
+    None
+
+  Returns:
+    np.ndarray: The days, as int32.
+  """
+  def days(self) -> np.ndarray:
+    return (self.timestamps.astype(np.int64) // 1440).astype(np.int32)
+
+  """
+  Returns the content of a message.
+
+  Args:
+    row (int): The index of the message.
+
+  Returns:
+    str: The message content.
+  """
+  def message(self, row: int) -> str:
+    return self._messages[int(self.message_offsets[row]):int(self.message_offsets[row + 1])].decode("utf-8")
+
+  """
+  Reads the messages of a range of rows.
+
+  Args:
+    start (int): The first row. Defaults to 0.
+    end (int): The row after the last one. Defaults to the number of rows.
+    minutes (bool): Returns the minutes since 1970-01-01 of every message instead of its date.
+
+  Returns:
+    Iterator[Tuple[date, str, str]]: The timestamp, sender, and message content of every message.
+  """
+  def iter_records(self, start: int = None, end: int = None, minutes: bool = False) -> Iterator[Tuple[Union[date, int], str, str]]:
+    start = 0 if start is None else start
+    end = len(self) if end is None else min(end, len(self))
+    senders, messages, dates = self.senders, self._messages, {}
+
+    for chunk_start in range(start, end, _ROW_CHUNK):
+      chunk_end = min(chunk_start + _ROW_CHUNK, end)
+      timestamps = self.timestamps[chunk_start:chunk_end].astype(np.int64).tolist()
+      codes = self.sender_codes[chunk_start:chunk_end].tolist()
+      offsets = self.message_offsets[chunk_start:chunk_end + 1].tolist()
+
+      for idx, (timestamp, code) in enumerate(zip(timestamps, codes)):
+        msg = messages[offsets[idx]:offsets[idx + 1]].decode("utf-8")
+
+        if not minutes:
+          day = timestamp // 1440
+          timestamp = dates.get(day)
+          if timestamp is None:
+            timestamp = dates[day] = date.fromordinal(day + _EPOCH_ORDINAL)
+
+        yield timestamp, senders[code], msg
+
+  """
+  Returns the compound scores saved with save_scores().
+
+  Args:
+    version (str): The version of the expected scores (see scorers.Scorer.version). Defaults to the one of the VADER lexicon.
+
+  Returns:
+    np.ndarray: The memory-mapped score of every message, or None if no scores were saved
+    or they were computed with a different version of the VADER lexicon or another backend.
+  """
+  def get_scores(self, version: str = None) -> np.ndarray:
+    scorePath = os.path.join(self.columnsPath, "score.npy")
+    if self.meta.get("score_lexicon_version") != (version or get_lexicon_version()) or not os.path.isfile(scorePath):
+      return None
+
+    return np.load(scorePath, mmap_mode = "r")
+
+  """
+  Saves the compound score of every message as an extra column, so later analyses and other tools can skip scoring.
+
+  Args:
+    scores (List[float]): The compound score of every message, in row order.
+    version (str): The version of the scores (see scorers.Scorer.version). Defaults to the one of the VADER lexicon.
+
+  Returns:
+    None
+  """
+  def save_scores(self, scores: List[float], version: str = None) -> None:
+    scores = np.asarray(scores, dtype = np.float64)
+    if len(scores) != len(self):
+      raise ValueError(f"Expected {len(self)} scores, got {len(scores)}")
+
+    scorePath = os.path.join(self.columnsPath, "score.npy")
+    with open(f"{scorePath}.tmp", "wb") as f:
+      np.save(f, scores)
+    os.replace(f"{scorePath}.tmp", scorePath)
+
+    self.meta["score_lexicon_version"] = version or get_lexicon_version()
+    write_meta(self.columnsPath, self.meta)
+
+  """
+  Releases the memory map of the messages.
+
+  Args:
+    None
+
+  Returns:
+    None
+  """
+  def close(self) -> None:
+    if isinstance(self._messages, mmap.mmap):
+      self._messages.close()
+
+  def __enter__(self) -> "ChatColumns":
+    return self
+
+  def __exit__(self, *exc_info) -> None:
+    self.close()
+
+"""
+Checks whether a path is a columns directory written by ColumnsWriter.
+
+Args:
+  filePath (str): The path.
+
+Returns:
+  bool: True for a path with the COLUMNS_EXTENSION.
+"""
+def is_columns_path(filePath: str) -> bool:
+  return os.path.splitext(os.path.normpath(filePath))[1].lower() == COLUMNS_EXTENSION
@@ -4,8 +4,19 @@ date_pattern = re.compile(r'\b\d{1,2}/\d{1,2}/\d{2}\b')
 time_pattern = re.compile(r'\d{2}:\d{2}')
 name_pattern = re.compile(r'(?<=- )(.*?)(?=:)')
 msg_pattern = re.compile(r'(?<=: )(.*)$')
+# Timestamp that every line starting a new message or system message begins with. Covers Android exports ("9/17/22, 18:54 - ",
+# "17.09.2022, 6:54 PM - ") and iOS exports ("[17.09.22, 18:54:12] "), the order of the date fields is resolved by timestamps.py
+_timestamp_prefix = r'\u200e?\[?(?P<date>\d{1,4}[./-]\d{1,2}[./-]\d{1,4}),? ' \
+                    r'(?P<time>\d{1,2}[:.]\d{2}(?:[:.]\d{2})?(?:\s?[AaPp]\.?\s?[Mm]\.?)?)(?:\] | - )'
+header_prefix_pattern = re.compile(_timestamp_prefix)
+# The same prefix for UTF-8 encoded lines, where the left-to-right mark and the narrow no-break space before AM/PM are multi-byte sequences
+header_prefix_bytes_pattern = re.compile(rb'(?:\xe2\x80\x8e)?\[?\d{1,4}[./-]\d{1,2}[./-]\d{1,4},? '
+                                         rb'\d{1,2}[:.]\d{2}(?:[:.]\d{2})?(?:(?:\s|\xe2\x80\xaf|\xc2\xa0)?[AaPp]\.?(?:\s|\xe2\x80\xaf|\xc2\xa0)?[Mm]\.?)?(?:\] | - )')
+# Whole message line in one match: the sender ends at the first ": ", so colons in names without a space and in messages are kept
+header_pattern = re.compile(_timestamp_prefix + r'(?P<sender>[^:\n]*(?::(?! )[^:\n]*)*): (?P<body>.*)')
 
 # Admin messages - useless for sentiment analysis
+# data_validation() matches them with classifier.SystemLineClassifier, the regex is kept for compatibility
 FILTERS = [
       "<Media omitted>",
       "changed the settings so only admins can edit the group settings",
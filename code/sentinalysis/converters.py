@@ -1,39 +1,71 @@
-from .config import date_pattern, time_pattern, name_pattern, msg_pattern
+from .parsers import parse_header, get_timestamp
+from .readers import get_timestamp_parser
+from .columns import ColumnsWriter, COLUMNS_EXTENSION
+from .instrumentation import record_stage
+from typing import List
 import ntpath
 import orjson
 import csv
 import os
 
+"""
+Extracts the fields of a validated line in the order used by both converters.
+
+Args:
+  line (str): A line of the validated chat logs file.
+
+Returns:
+  List[str]: The date, time, username and message of the line.
+"""
+def get_fields(line: str) -> List[str]:
+  return list(parse_header(line).group("date", "time", "sender", "body"))
+
+"""
+Serializes a validated line into the JSON object written by convert_txt_to_json().
+
+Args:
+  line (str): A line of the validated chat logs file.
+
+Returns:
+  str: The JSON object, without indentation or separators.
+"""
+def get_json_record(line: str) -> str:
+  date, time, name, msg = get_fields(line)
+  return orjson.dumps({"date":date, "message":msg, "time":time, "username":name}).decode("utf-8")
+
 """
 Convert an exported .txt file to .json format.
 
 Args:
   filePath (str): The path to the validated chat logs file.
+  ndjson (bool): Writes a .jsonl file with one object per line instead of a JSON array. It can be appended to,
+  and is read with a native parser one line at a time.
 
 Returns:
-  str: The path to the resulting .json file.
+  str: The path to the resulting .json or .jsonl file.
 """
-def convert_txt_to_json(filePath: str) -> str:
+def convert_txt_to_json(filePath: str, ndjson: bool = False) -> str:
   fileName = ntpath.basename(filePath).removesuffix(".txt")
 
-  with open(filePath, 'r', encoding = "utf-8") as f1, open(f"{fileName}.json", 'w', encoding = "utf-8") as f2:
+  if ndjson:
+    with record_stage("convert-jsonl") as stage, open(filePath, 'r', encoding = "utf-8") as f1, open(f"{fileName}.jsonl", 'w', encoding = "utf-8") as f2:
+      for line in stage.track(f1):
+        f2.write(f'{get_json_record(line)}\n')
+
+    return os.path.abspath(f"{fileName}.jsonl")
+
+  with record_stage("convert-json") as stage, open(filePath, 'r', encoding = "utf-8") as f1, open(f"{fileName}.json", 'w', encoding = "utf-8") as f2:
     f2.write('[\n')
 
     comma_flag = True
-    for line in f1:
-      date = date_pattern.search(line).group()
-      time = time_pattern.search(line).group()
-      name = name_pattern.search(line).group()
-      msg = msg_pattern.search(line).group()
-
+    for line in stage.track(f1):
       # Prevents commas at the start of the file / trailing commas
       if comma_flag:
         comma_flag = False
       else:
         f2.write(",\n")
 
-      json_str = orjson.dumps({"date":date, "message":msg, "time":time, "username":name}).decode("utf-8")
-      f2.write(f'\t{json_str}')
+      f2.write(f'\t{get_json_record(line)}')
 
     f2.write('\n]\n')
 
@@ -51,16 +83,33 @@ Returns:
 def convert_txt_to_csv(filePath: str) -> str:
   fileName = ntpath.basename(filePath).removesuffix(".txt")
 
-  with open(filePath, 'r', encoding = "utf-8") as f1, open(f"{fileName}.csv", 'w', encoding = "utf-8") as f2:
+  with record_stage("convert-csv") as stage, open(filePath, 'r', encoding = "utf-8") as f1, open(f"{fileName}.csv", 'w', encoding = "utf-8") as f2:
     writer = csv.writer(f2)
     writer.writerow(["Date", "Time", "Username", "Message"])
 
-    for line in f1:
-      date = date_pattern.search(line).group()
-      time = time_pattern.search(line).group()
-      name = name_pattern.search(line).group()
-      msg = msg_pattern.search(line).group()
+    for line in stage.track(f1):
+      writer.writerow(get_fields(line))
+
+  return os.path.abspath(f"{fileName}.csv")
+
+"""
+Convert an exported .txt file to a directory of binary columns (see columns.ColumnsWriter) in a single pass.
+sentiment_analysis() reads it without parsing a single line, and can save the computed scores in it as well.
+
+Args:
+  filePath (str): The path to the validated chat logs file.
+
+Returns:
+  str: The path to the resulting columns directory.
+"""
+def convert_txt_to_columns(filePath: str) -> str:
+  fileName = ntpath.basename(filePath).removesuffix(".txt")
+  columnsPath = f"{fileName}{COLUMNS_EXTENSION}"
+  timestamps = get_timestamp_parser(filePath)
 
-      writer.writerow([date, time, name, msg])
+  with record_stage("convert-columns") as stage, open(filePath, 'r', encoding = "utf-8") as f1, ColumnsWriter(columnsPath) as writer:
+    for line in stage.track(f1):
+      match = parse_header(line)
+      writer.append(get_timestamp(match["date"], match["time"], timestamps, minutes = True), match["sender"], match["body"])
 
-  return os.path.abspath(f"{fileName}.csv")
\ No newline at end of file
+  return os.path.abspath(columnsPath)
@@ -0,0 +1,96 @@
+from typing import Tuple
+import numpy as np
+
+"""
+Converts the x values of a series to float64, so that dates can be measured like numbers.
+
+Args:
+  x (np.ndarray): The x values, numbers or datetime64.
+
+Returns:
+  np.ndarray: The x values as float64.
+"""
+def _as_float(x: np.ndarray) -> np.ndarray:
+  x = np.asarray(x)
+  if np.issubdtype(x.dtype, np.datetime64):
+    return x.astype(np.int64).astype(np.float64)
+  return x.astype(np.float64)
+
+"""
+Reduces a series to the lowest and highest point of every bucket of equal width along the x axis.
+With one bucket per horizontal pixel, the drawn line covers exactly the same pixels as the full series,
+since a line inside a pixel column only ever spans from its minimum to its maximum.
+
+Args:
+  x (np.ndarray): The sorted x values, numbers or datetime64.
+  y (np.ndarray): The y values.
+  buckets (int): The number of buckets, e.g. the width of the chart in pixels.
+
+Returns:
+  Tuple[np.ndarray, np.ndarray]: The kept points, at most 2 per bucket plus the first and last point, in their original order.
+"""
+def minmax_downsample(x: np.ndarray, y: np.ndarray, buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+  x, y = np.asarray(x), np.asarray(y)
+  if len(y) <= 2 * buckets + 2:
+    return x, y
+
+  position = _as_float(x)
+  edges = np.linspace(position[0], position[-1], buckets + 1)[1:-1]
+  bucket = np.searchsorted(edges, position, side = "right")
+
+  # Runs of points in the same bucket, every point knows the index of its run
+  starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+  run = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(y)]))
+
+  keep = [[0, len(y) - 1]]
+  for extremes in (np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)):
+    # The first point of every run that reaches the extreme of the run
+    candidates = np.flatnonzero(y == extremes[run])
+    keep.append(candidates[np.r_[True, run[candidates][1:] != run[candidates][:-1]]])
+
+  keep = np.unique(np.concatenate(keep))
+  return x[keep], y[keep]
+
+"""
+Reduces a series with the Largest-Triangle-Three-Buckets algorithm. The points are split into buckets of equal size,
+and from every bucket the point that forms the largest triangle with the point kept before it and the average of the next bucket is kept.
+This keeps the visual shape of the series, peaks included, with a fixed number of points.
+
+Args:
+  x (np.ndarray): The sorted x values, numbers or datetime64.
+  y (np.ndarray): The y values.
+  threshold (int): The number of points to keep, at least 3.
+
+Returns:
+  Tuple[np.ndarray, np.ndarray]: The kept points, in their original order.
+"""
+def lttb_downsample(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+  x, y = np.asarray(x), np.asarray(y)
+  if threshold < 3:
+    raise ValueError("LTTB keeps at least 3 points.")
+  if len(y) <= threshold:
+    return x, y
+
+  position, values = _as_float(x), y.astype(np.float64)
+  # The first and last points are always kept, the others are split into threshold - 2 buckets
+  edges = np.linspace(1, len(y) - 1, threshold - 1).astype(np.int64)
+  keep = np.empty(threshold, dtype = np.int64)
+  keep[0], keep[-1] = 0, len(y) - 1
+
+  for idx in range(threshold - 2):
+    start, end = edges[idx], edges[idx + 1]
+    next_start, next_end = end, edges[idx + 2] if idx + 2 < len(edges) else len(y)
+    average_x, average_y = position[next_start:next_end].mean(), values[next_start:next_end].mean()
+
+    previous = keep[idx]
+    areas = np.abs((position[previous] - average_x) * (values[start:end] - values[previous]) -
+                   (position[previous] - position[start:end]) * (average_y - values[previous]))
+    keep[idx + 1] = start + int(np.argmax(areas))
+
+  return x[keep], y[keep]
+
+# Downsampling methods accepted by plotting.get_charts()
+DOWNSAMPLERS = {
+  "minmax": minmax_downsample,
+  "lttb": lttb_downsample,
+}
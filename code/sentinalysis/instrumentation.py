@@ -0,0 +1,384 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator
+import time
+import json
+import sys
+import os
+
+try:
+  import resource
+except ImportError:
+  # Not available on Windows, where the peak resident memory is not recorded
+  resource = None
+
+# Lines between two updates of a progress bar, so that long runs do not pay for redrawing it on every line
+PROGRESS_STEP = 16384
+
+"""
+Measurements of one stage of a run, e.g. "validation" or "scoring". A stage that runs several times, like the scoring of every batch,
+adds up the measurements of all of its runs.
+
+Args:
+  name (str): The name of the stage.
+"""
+class StageMetrics:
+  def __init__(self, name: str):
+    self.name = name
+    self.calls = 0
+    self.wall_seconds = 0.0
+    self.cpu_seconds = 0.0
+    self.lines = 0
+    self.filtered = {}
+    self.caches = {}
+    self.peak_rss_mb = 0.0
+    self.traced_peak_mb = None
+    self._bar = None
+    self._shown = 0
+
+  """
+  Adds processed lines, and advances the progress bar of the stage if it has one.
+
+  Args:
+    lines (int): The number of processed lines.
+
+  Returns:
+    None
+  """
+  def add(self, lines: int) -> None:
+    self.lines += lines
+    if self._bar is not None and self.lines - self._shown >= PROGRESS_STEP:
+      self._bar.update(self.lines - self._shown)
+      self._shown = self.lines
+
+  """
+  Adds lines dropped by the stage, by category.
+
+  Args:
+    filtered (dict[str, int]): The number of dropped lines of every category, e.g. the counts of a SystemLineClassifier.
+
+  Returns:
+    None
+  """
+  def add_filtered(self, filtered: dict[str, int]) -> None:
+    for category, count in filtered.items():
+      self.filtered[category] = self.filtered.get(category, 0) + count
+
+  """
+  Adds the lookups of a cache, e.g. the memo of a MemoizedAnalyzer or a persistent ScoreCache.
+
+  Args:
+    name (str): The name of the cache.
+    hits (int): The number of lookups that were found.
+    misses (int): The number of lookups that were not found.
+
+  Returns:
+    None
+  """
+  def add_cache(self, name: str, hits: int, misses: int) -> None:
+    cache = self.caches.setdefault(name, {"hits": 0, "misses": 0})
+    cache["hits"] += hits
+    cache["misses"] += misses
+
+  """
+  Yields the items of an iterable and counts them as processed lines.
+
+  Args:
+    iterable (Iterable): The items, e.g. the lines of a file.
+    weight (Callable): Returns the number of lines of an item, e.g. len() for batches. Every item is one line if not provided.
+
+  Returns:
+    Iterator: The items.
+  """
+  def track(self, iterable: Iterable, weight: Callable = None) -> Iterator:
+    for item in iterable:
+      yield item
+      self.add(1 if weight is None else weight(item))
+
+  """
+  Returns the measurements as a dictionary that can be saved as JSON.
+
+  Args:
+    None
+
+  Returns:
+    dict: The measurements, with the hit rate of every cache and the number of lines processed per second.
+  """
+  def to_dict(self) -> dict:
+    caches = {name: dict(cache, hit_rate = cache["hits"] / (cache["hits"] + cache["misses"]) if cache["hits"] + cache["misses"] else 0.0)
+              for name, cache in self.caches.items()}
+    return {
+      "name": self.name,
+      "calls": self.calls,
+      "wall_seconds": self.wall_seconds,
+      "cpu_seconds": self.cpu_seconds,
+      "lines": self.lines,
+      "lines_per_second": self.lines / self.wall_seconds if self.wall_seconds and self.lines else None,
+      "filtered": dict(self.filtered),
+      "caches": caches,
+      "peak_rss_mb": self.peak_rss_mb,
+      "traced_peak_mb": self.traced_peak_mb,
+    }
+
+"""
+Stage that measures nothing, used when no instrumentation is active. Its methods cost a function call at most,
+and the callers only use them per batch or per file, never per line.
+"""
+class _NullStage:
+  def add(self, lines: int) -> None:
+    pass
+
+  def add_filtered(self, filtered: dict[str, int]) -> None:
+    pass
+
+  def add_cache(self, name: str, hits: int, misses: int) -> None:
+    pass
+
+  def track(self, iterable: Iterable, weight: Callable = None) -> Iterable:
+    return iterable
+
+_NULL_STAGE = _NullStage()
+
+"""
+Returns the peak resident memory of the process, in megabytes.
+
+Args:
+  None
+
+Returns:
+  float: The peak resident memory, or 0.0 where it cannot be measured.
+"""
+def get_peak_rss_mb() -> float:
+  if resource is None:
+    return 0.0
+  # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+"""
+Returns the CPU time of the process and of its finished child processes, e.g. the workers of a pool.
+
+Args:
+  None
+
+Returns:
+  float: The CPU time, in seconds.
+"""
+def get_cpu_seconds() -> float:
+  times = os.times()
+  return times.user + times.system + times.children_user + times.children_system
+
+"""
+Collects the measurements of the stages that run while it is active (see instrument()).
+
+Args:
+  callback (Callable): Called with the measurements of a stage (see StageMetrics.to_dict()) every time a top-level stage finishes.
+  profileDir (str): Profiles every top-level stage with cProfile, and saves the statistics to "<stage>.prof" in this directory.
+  trace_memory (bool): Traces the Python allocations with tracemalloc, and records the peak of every stage.
+  Slows the run down noticeably, the peak resident memory is recorded either way.
+  progress (bool): Shows a tqdm progress bar of the processed lines of every top-level stage.
+"""
+class Instrumentation:
+  def __init__(self, callback: Callable = None, profileDir: str = None, trace_memory: bool = False, progress: bool = False):
+    self.callback = callback
+    self.profileDir = profileDir
+    self.trace_memory = trace_memory
+    self.progress = progress
+    self.stages = {}
+    self._profilers = {}
+    self._stack = []
+    self._started = time.perf_counter()
+
+  """
+  Measures a stage for as long as the context is open. Stages can be nested, e.g. the scoring of every batch within an analysis.
+  Only top-level stages are profiled, show a progress bar and are reported to the callback.
+
+  Args:
+    name (str): The name of the stage.
+
+  Returns:
+    StageMetrics: The measurements of the stage, to add processed lines and cache lookups to.
+  """
+  @contextmanager
+  def stage(self, name: str) -> Iterator[StageMetrics]:
+    metrics = self.stages.get(name)
+    if metrics is None:
+      metrics = self.stages[name] = StageMetrics(name)
+
+    top_level = not self._stack
+    profiler = None
+    if top_level:
+      if self.trace_memory:
+        import tracemalloc
+        tracemalloc.reset_peak()
+      if self.profileDir is not None:
+        import cProfile
+        profiler = self._profilers.setdefault(name, cProfile.Profile())
+        profiler.enable()
+      if self.progress:
+        from tqdm import tqdm
+        metrics._bar, metrics._shown = tqdm(desc = name, unit = " lines", initial = metrics.lines, leave = False), metrics.lines
+
+    self._stack.append(metrics)
+    wall, cpu = time.perf_counter(), get_cpu_seconds()
+    try:
+      yield metrics
+    finally:
+      metrics.wall_seconds += time.perf_counter() - wall
+      metrics.cpu_seconds += get_cpu_seconds() - cpu
+      metrics.calls += 1
+      self._stack.pop()
+
+      metrics.peak_rss_mb = max(metrics.peak_rss_mb, round(get_peak_rss_mb(), 1))
+      if self.trace_memory:
+        import tracemalloc
+        # Nested stages report the peak since their top-level stage started
+        traced_peak = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        metrics.traced_peak_mb = max(metrics.traced_peak_mb or 0.0, traced_peak)
+
+      if top_level:
+        if profiler is not None:
+          profiler.disable()
+        if metrics._bar is not None:
+          metrics._bar.close()
+          metrics._bar = None
+        if self.callback is not None:
+          self.callback(metrics.to_dict())
+
+  """
+  Returns the measurements of every stage as a dictionary that can be saved as JSON.
+
+  Args:
+    None
+
+  Returns:
+    dict: The "wall_seconds" of the whole run and the measurements of every "stages", in the order they first ran.
+  """
+  def to_dict(self) -> dict:
+    return {
+      "wall_seconds": time.perf_counter() - self._started,
+      "peak_rss_mb": round(get_peak_rss_mb(), 1),
+      "stages": {name: metrics.to_dict() for name, metrics in self.stages.items()},
+    }
+
+  """
+  Saves the statistics of the profiled stages, one "<stage>.prof" file per stage, which can be read with pstats or snakeviz.
+
+  Args:
+    None
+
+  Returns:
+    None
+  """
+  def save_profiles(self) -> None:
+    if self.profileDir is None:
+      return
+
+    os.makedirs(self.profileDir, exist_ok = True)
+    for name, profiler in self._profilers.items():
+      profiler.dump_stats(os.path.join(self.profileDir, f"{name}.prof"))
+
+_active = ContextVar("sentinalysis_instrumentation", default = None)
+
+"""
+Instruments every stage of sentinalysis that runs within the context: validation, conversion, parsing, scoring and plotting.
+Instrumentation is opt-in, outside of this context the stages measure nothing.
+
+  with instrument(jsonPath = "metrics.json", progress = True) as metrics:
+    sentiment_analysis(data_validation("chat.txt", "."))
+
+Args:
+  callback (Callable): Called with the measurements of a stage every time a top-level stage finishes, e.g. to log them.
+  jsonPath (str): Saves the measurements of all stages to this JSON file when the context closes.
+  profileDir (str): Profiles every top-level stage with cProfile, and saves the statistics to "<stage>.prof" in this directory.
+  trace_memory (bool): Traces the Python allocations with tracemalloc, and records the peak of every stage.
+  progress (bool): Shows a progress bar of the processed lines of every top-level stage.
+
+Returns:
+  Instrumentation: The collected measurements, complete once the context closes.
+"""
+@contextmanager
+def instrument(callback: Callable = None,
+               jsonPath: str = None,
+               profileDir: str = None,
+               trace_memory: bool = False,
+               progress: bool = False) -> Iterator[Instrumentation]:
+  instrumentation = Instrumentation(callback, profileDir, trace_memory, progress)
+  token = _active.set(instrumentation)
+
+  started_tracing = False
+  if trace_memory:
+    import tracemalloc
+    if not tracemalloc.is_tracing():
+      tracemalloc.start()
+      started_tracing = True
+
+  try:
+    yield instrumentation
+  finally:
+    _active.reset(token)
+    if started_tracing:
+      tracemalloc.stop()
+
+    instrumentation.save_profiles()
+    if jsonPath is not None:
+      with open(jsonPath, "w") as f:
+        json.dump(instrumentation.to_dict(), f, indent = 2)
+
+"""
+Measures a stage if an instrumentation is active (see instrument()), otherwise does nothing.
+
+Args:
+  name (str): The name of the stage.
+
+Returns:
+  StageMetrics: The measurements of the stage, or a stage that ignores everything when no instrumentation is active.
+"""
+@contextmanager
+def record_stage(name: str) -> Iterator[StageMetrics]:
+  instrumentation = _active.get()
+  if instrumentation is None:
+    yield _NULL_STAGE
+    return
+
+  with instrumentation.stage(name) as metrics:
+    yield metrics
+
+"""
+Returns the innermost stage that is currently measured, e.g. for code that counts the lines of the stage that called it.
+
+Args:
+  None
+
+Returns:
+  StageMetrics: The innermost open stage, or a stage that ignores everything when no stage is open.
+"""
+def current_stage() -> StageMetrics:
+  instrumentation = _active.get()
+  if instrumentation is None or not instrumentation._stack:
+    return _NULL_STAGE
+  return instrumentation._stack[-1]
+
+"""
+Measures the time spent producing every item of an iterable as a stage, e.g. reading and parsing the batches that are scored.
+Returns the iterable as it is when no instrumentation is active.
+
+Args:
+  iterable (Iterable): The items.
+  name (str): The name of the stage.
+
+Returns:
+  Iterable: The items.
+"""
+def iter_timed(iterable: Iterable, name: str) -> Iterable:
+  if _active.get() is None:
+    return iterable
+  return _iter_timed(iter(iterable), name)
+
+def _iter_timed(iterator: Iterator, name: str) -> Iterator:
+  done = object()
+  while True:
+    with record_stage(name):
+      item = next(iterator, done)
+    if item is done:
+      return
+    yield item
@@ -0,0 +1,166 @@
+from .sinks import Sink
+from .scorers import Scorer
+from collections import deque
+from typing import List, Tuple, Union
+import numpy as np
+import csv
+
+# Minutes after the last message of a member within which a message of someone else is a reply to it
+DEFAULT_MAX_GAP = 10
+
+"""
+Builds the reply graph of a chat while its messages are scored (see interaction_analysis()).
+A message replies to the previous different speaker if that member's last message is at most max_gap minutes older.
+Every pair of members keeps the number of replies and the sum of their compound scores, so the graph only grows with
+the pairs that actually talk to each other.
+
+The recent speakers are kept in a deque that holds the last message of every run of consecutive messages of one member,
+and drops the runs that are older than the gap. The previous different speaker is always one of its last two entries,
+so every message costs constant time and the memory is bounded by the gap, whatever the length of the chat.
+
+Receives minute timestamps, as returned by readers.iter_records(minutes = True), instead of the dates of the other sinks.
+
+Args:
+  max_gap (int): The longest time between a message and the one it replies to, in minutes.
+"""
+class InteractionSink(Sink):
+  def __init__(self, max_gap: int = DEFAULT_MAX_GAP):
+    if max_gap < 0:
+      raise ValueError("The gap of a reply cannot be negative.")
+    self.max_gap = max_gap
+
+  def open(self, baseline: dict[str, float]) -> None:
+    super().open(baseline)
+    self._members = {}
+    # (replier, replied-to) -> [count, sum of compound scores]
+    self._edges = {}
+    # [member, minute of the member's last message] of every recent run
+    self._recent = deque()
+
+  """
+  Adds a message to the graph.
+
+  Args:
+    minute (int): The timestamp of the message, in minutes since 1970-01-01. Messages are expected in chat order.
+    name (str): The name of the person who sent the message.
+    score (float): The compound score of the message.
+
+  Returns:
+    None
+  """
+  def add(self, minute: int, name: str, score: float) -> None:
+    member = self._members.get(name)
+    if member is None:
+      member = self._members[name] = len(self._members)
+
+    recent = self._recent
+    while recent and recent[0][1] < minute - self.max_gap:
+      recent.popleft()
+
+    if recent and recent[-1][0] == member:
+      recent[-1][1] = minute
+      previous = recent[-2] if len(recent) > 1 else None
+    else:
+      previous = recent[-1] if recent else None
+      recent.append([member, minute])
+
+    if previous is not None:
+      edge = self._edges.get((member, previous[0]))
+      if edge is None:
+        self._edges[(member, previous[0])] = [1, score]
+      else:
+        edge[0] += 1
+        edge[1] += score
+
+  def write(self, batch: List[Tuple[int, str, str]], scores: List[float]) -> None:
+    self._add_totals(batch, scores)
+    for (minute, name, _), score in zip(batch, scores):
+      self.add(minute, name, score)
+
+  """
+  Returns the reply graph as a sparse matrix in coordinate format.
+
+  Args:
+    None
+
+  Returns:
+    dict: The "members" in order of their first message, and one entry per pair of members in the arrays "source" (the index of the member
+    who replied), "target" (the index of the member who was replied to), "count" (the number of replies) and "mean" (their mean compound score).
+  """
+  def close(self) -> dict:
+    pairs = sorted(self._edges)
+    values = np.array([self._edges[pair] for pair in pairs], dtype = np.float64).reshape(-1, 2)
+    indices = np.array(pairs, dtype = np.int32).reshape(-1, 2)
+
+    return {
+      "members": list(self._members),
+      "source": indices[:, 0],
+      "target": indices[:, 1],
+      "count": values[:, 0].astype(np.int64),
+      "mean": values[:, 1] / np.maximum(values[:, 0], 1),
+    }
+
+"""
+Analyzes who replies to whom in a chat, in a single pass that scores every message once.
+Messages are read with their time of day, a message replies to the previous different speaker within max_gap minutes (see InteractionSink).
+
+Args:
+  filePath (str): The path to the file, in any format supported by sentiment_analysis().
+  max_gap (int): The longest time between a message and the one it replies to, in minutes.
+  cachePath (str): The path to a persistent score cache (see cache.ScoreCache), or None.
+  engine (Union[str, Scorer]): The scoring backend (see sentiment_analysis()).
+
+Returns:
+  dict: The reply graph, as a sparse matrix (see InteractionSink.close()).
+"""
+def interaction_analysis(filePath: str, max_gap: int = DEFAULT_MAX_GAP, cachePath: str = None, engine: Union[str, Scorer] = "nltk") -> dict:
+  from .readers import iter_records
+  from .sentiment import analyze_records
+  from .instrumentation import record_stage
+  from .utils import check_vader_lexicon
+  from .scorers import get_scorer
+
+  engine = get_scorer(engine)
+  check_vader_lexicon()
+  sink = InteractionSink(max_gap)
+  with record_stage("interactions"):
+    return analyze_records(iter_records(filePath, minutes = True), cachePath, engine = engine, sink = sink)
+
+"""
+Converts a reply graph to dense member x member matrices, e.g. for a heatmap.
+
+Args:
+  interactions (dict): The reply graph (see InteractionSink.close()).
+
+Returns:
+  Tuple[np.ndarray, np.ndarray]: The number of replies and their mean compound score, with a row per member who replied
+  and a column per member who was replied to. Pairs without replies have a mean of NaN.
+"""
+def to_dense(interactions: dict) -> Tuple[np.ndarray, np.ndarray]:
+  size = len(interactions["members"])
+  counts = np.zeros((size, size), dtype = np.int64)
+  means = np.full((size, size), np.nan)
+
+  counts[interactions["source"], interactions["target"]] = interactions["count"]
+  means[interactions["source"], interactions["target"]] = interactions["mean"]
+  return counts, means
+
+"""
+Saves a reply graph to a CSV file, with one row per pair of members and the columns Source, Target, Count and Mean.
+
+Args:
+  interactions (dict): The reply graph (see InteractionSink.close()).
+  outputPath (str): The path of the CSV file.
+
+Returns:
+  str: The path of the CSV file.
+"""
+def save_interactions(interactions: dict, outputPath: str) -> str:
+  members = interactions["members"]
+  with open(outputPath, "w", encoding = "utf-8", newline = "") as f:
+    writer = csv.writer(f)
+    writer.writerow(["Source", "Target", "Count", "Mean"])
+    writer.writerows((members[source], members[target], count, mean) for source, target, count, mean in
+                     zip(interactions["source"].tolist(), interactions["target"].tolist(), interactions["count"].tolist(), interactions["mean"].tolist()))
+
+  return outputPath
@@ -0,0 +1,191 @@
+from concurrent.futures import ProcessPoolExecutor
+from .cache import ScoreCache, MemoizedAnalyzer, score_with_cache, CACHE_BATCH_SIZE
+from .readers import iter_records, iter_batches, get_shards
+from .vader_engine import get_compound_scores
+from .scorers import Scorer, get_scorer, get_score_version
+from .results import ColumnarSentiment
+from .utils import check_vader_lexicon
+from .instrumentation import current_stage
+from collections import defaultdict
+from datetime import date
+from typing import Tuple, List, Union
+
+# Every worker process loads the VADER lexicon exactly once, inside init_worker()
+_worker_analyzer = None
+# The engine _worker_analyzer was created for (see get_engine_key())
+_worker_engine = None
+
+"""
+Returns a key that identifies an engine across processes, where a Scorer sent by the parent process is a copy of the original.
+
+Args:
+  engine (Union[str, Scorer]): The scoring backend.
+
+Returns:
+  Union[str, Tuple[str, str]]: The name of the engine, or the class and version of the scorer.
+"""
+def get_engine_key(engine: Union[str, Scorer]) -> Union[str, Tuple[str, str]]:
+  return engine if isinstance(engine, str) else (type(engine).__qualname__, engine.version)
+
+"""
+Initializes a worker process of the pool by loading the VADER lexicon, or creating the backend of the engine.
+
+Args:
+  engine (Union[str, Scorer]): The scoring backend, a registered name or a Scorer sent by the parent process (see sentiment_analysis()).
+  memo_entries (int): The maximum number of messages memoized by the worker.
+  memo_bytes (int): The maximum approximate memory used by the memo of the worker.
+
+Returns:
+  None
+"""
+def init_worker(engine: Union[str, Scorer] = "nltk", memo_entries: int = 100_000, memo_bytes: int = 32 * 1024 * 1024) -> None:
+  global _worker_analyzer, _worker_engine
+  check_vader_lexicon()
+  analyzer = get_scorer(engine)
+  analyzer.load()
+  _worker_analyzer = MemoizedAnalyzer(analyzer, memo_entries, memo_bytes)
+  _worker_engine = get_engine_key(engine)
+
+"""
+Forgets the analyzer of init_worker(), e.g. after a parent process preloaded it for the workers it forks.
+
+Args:
+  None
+
+Returns:
+  None
+"""
+def reset_worker() -> None:
+  global _worker_analyzer, _worker_engine
+  _worker_analyzer = None
+  _worker_engine = None
+
+"""
+Scores every message of a single shard. The scores are not accumulated,
+since the running totals depend on all the shards that come before this one.
+
+Args:
+  filePath (str): The path to the validated file.
+  start (int): The offset of the first byte of the shard.
+  end (int): The offset after the last byte of the shard.
+  cachePath (str): The path to a persistent score cache. Workers only read from it,
+  the scores that were missing are returned so that the parent process can store them.
+
+Returns:
+  Tuple[dict[str, List[Tuple[float, date]]], List[Tuple[bytes, float]], Tuple[int, int]]: The raw compound score and date of every message,
+  grouped by sender, the (key, score) pairs that were missing from the cache, and the memo hits and misses of this shard.
+"""
+def score_shard(filePath: str, start: int, end: int, cachePath: str = None) -> Tuple[dict[str, List[Tuple[float, date]]], List[Tuple[bytes, float]], Tuple[int, int]]:
+  if _worker_analyzer is None:
+    init_worker()
+
+  shard_scores = defaultdict(list)
+  new_scores = []
+  hits, misses = _worker_analyzer.hits, _worker_analyzer.misses
+
+  cache = ScoreCache(cachePath, read_only = True) if cachePath is not None else None
+
+  try:
+    for batch in iter_batches(iter_records(filePath, start, end), CACHE_BATCH_SIZE):
+      msgs = [msg for _, _, msg in batch]
+
+      if cache is not None:
+        scores, batch_new_scores = score_with_cache(_worker_analyzer, msgs, cache)
+        new_scores.extend(batch_new_scores)
+      else:
+        scores = get_compound_scores(_worker_analyzer, msgs)
+
+      for (timestamp, msg_sender, _), score in zip(batch, scores):
+        shard_scores[msg_sender].append((score, timestamp))
+  finally:
+    if cache is not None:
+      cache.close()
+
+  return shard_scores, new_scores, (_worker_analyzer.hits - hits, _worker_analyzer.misses - misses)
+
+"""
+Merges the raw shard scores into the sentiment dictionary, in file order.
+The running totals are added up one message at a time, exactly like update_user_sentiment_score() does,
+so the result is identical to the one of a serial run.
+
+Args:
+  shard_scores (dict[str, List[Tuple[float, date]]]): The result of score_shard().
+  members_sentiment (dict[str, List[Tuple]]): The dictionary that contains sentiment scores for individual group chat members.
+  members_sentiment_cache (dict[str, float]): The dictionary that acts as cache for the last sentiment score of each group chat member.
+
+Returns:
+  None
+"""
+def merge_shard_scores(shard_scores: dict[str, List[Tuple[float, date]]],
+                       members_sentiment: dict[str, List[Tuple]],
+                       members_sentiment_cache: dict[str, float]) -> None:
+  for name, scores in shard_scores.items():
+    sentiment_value = members_sentiment_cache.get(name, 0.0)
+    member_sentiment = members_sentiment[name]
+
+    for score, timestamp in scores:
+      sentiment_value += score
+      member_sentiment.append((sentiment_value, timestamp))
+
+    members_sentiment_cache[name] = sentiment_value
+
+"""
+Analyzes all messages in a file using a pool of worker processes.
+The file is split into byte ranges on message boundaries and each range is scored by a different worker.
+
+Args:
+  filePath (str): The path to the validated file.
+  workers (int): The number of worker processes.
+  cachePath (str): The path to a persistent score cache, or None.
+  analyzer (MemoizedAnalyzer): Provides the memo limits of the workers and receives their hit/miss counters, or None.
+  columnar (bool): Returns a ColumnarSentiment instead of a dictionary.
+  engine (Union[str, Scorer]): The scoring backend of the workers.
+
+Returns:
+  dict: A dictionary of all chat members and their sentiment scores.
+"""
+def parallel_sentiment_analysis(filePath: str,
+                                workers: int,
+                                cachePath: str = None,
+                                analyzer: MemoizedAnalyzer = None,
+                                columnar: bool = False,
+                                engine: Union[str, Scorer] = "nltk") -> dict:
+  members_sentiment = ColumnarSentiment() if columnar else defaultdict(list)
+  members_sentiment_cache = {}
+
+  # A few shards per worker keep the pool busy when some ranges are slower than others
+  shards = get_shards(filePath, workers * 4)
+  if not shards:
+    return members_sentiment
+
+  # Creating the cache up front invalidates stale entries before the read-only workers open it
+  cache = ScoreCache(cachePath, version = get_score_version(engine)) if cachePath is not None else None
+
+  stage = current_stage()
+  initargs = (engine, analyzer.max_entries, analyzer.max_bytes) if isinstance(analyzer, MemoizedAnalyzer) else (engine,)
+
+  try:
+    with ProcessPoolExecutor(max_workers = workers, initializer = init_worker, initargs = initargs) as executor:
+      futures = [executor.submit(score_shard, filePath, start, end, cachePath) for start, end in shards]
+
+      # Shards must be merged in file order for the running totals to match
+      for future in futures:
+        shard_scores, new_scores, (hits, misses) = future.result()
+        if columnar:
+          for name, scores in shard_scores.items():
+            members_sentiment.extend(name, [score for score, _ in scores], [timestamp for _, timestamp in scores])
+        else:
+          merge_shard_scores(shard_scores, members_sentiment, members_sentiment_cache)
+        if isinstance(analyzer, MemoizedAnalyzer):
+          analyzer.hits += hits
+          analyzer.misses += misses
+        # The workers are not instrumented, their lines and memo lookups are added to the stage of the caller
+        stage.add(sum(len(scores) for scores in shard_scores.values()))
+        stage.add_cache("memo", hits, misses)
+        if cache is not None:
+          cache.put_many(new_scores)
+  finally:
+    if cache is not None:
+      cache.close()
+
+  return members_sentiment
@@ -1,37 +1,84 @@
-from .config import date_pattern, time_pattern, name_pattern, msg_pattern
-from typing import Tuple 
+from .timestamps import TimestampParser
+from .config import header_pattern
+from typing import Tuple, Union
 from datetime import date
+import csv
+import re
+
+# Parser of the M/D/YY dates used when the format of the export is not provided
+_DEFAULT_TIMESTAMPS = TimestampParser("MDY")
+
+"""
+Matches the date, time, sender and message content of a line from a .txt file in a single pass.
+The groups "date", "time", "sender" and "body" of the match hold the values, and their spans locate them in the line.
+
+Args:
+  line (str): A line of text from the .txt file
+
+Returns:
+  re.Match: The match of the line.
+"""
+def parse_header(line: str) -> re.Match:
+  match = header_pattern.match(line)
+  if match is None:
+    raise ValueError(f"Not a message line: {line!r}")
+
+  return match
+
+"""
+Converts the date and time strings of a message to its timestamp.
+
+Args:
+  date_str (str): The date, as written in the export.
+  time_str (str): The time, as written in the export.
+  timestamps (TimestampParser): The parser of the export's timestamps. Defaults to M/D/YY dates.
+  minutes (bool): Returns the minutes since 1970-01-01 instead of the date.
+
+Returns:
+  Union[date, int]: The date or the minute of the message.
+"""
+def get_timestamp(date_str: str, time_str: str, timestamps: TimestampParser = None, minutes: bool = False) -> Union[date, int]:
+  timestamps = timestamps if timestamps is not None else _DEFAULT_TIMESTAMPS
+  return timestamps.get_minutes(date_str, time_str) if minutes else timestamps.get_date(date_str)
 
 """
 Takes a line from a .txt file and returns the timestamp, sender, and message content.
 
 Args:
   line (str): A line of text from the .txt file
+  timestamps (TimestampParser): The parser of the export's timestamps. Defaults to M/D/YY dates.
+  minutes (bool): Returns the minutes since 1970-01-01 instead of the date.
 
 Returns:
   Tuple(date, str, str): A tuple of all the values.
 """
-def get_txt(line: str) -> Tuple[date, str, str]:
-  month, day, year = map(int, date_pattern.search(line).group().split("/"))
-  timestamp = date(2000 + year, month, day)
-  msg_sender = name_pattern.search(line).group()
-  msg = msg_pattern.search(line).group()
+def get_txt(line: str, timestamps: TimestampParser = None, minutes: bool = False) -> Tuple[date, str, str]:
+  match = parse_header(line)
+  timestamp = get_timestamp(match["date"], match["time"], timestamps, minutes)
+  msg_sender = match["sender"]
+  msg = match["body"]
 
   return timestamp, msg_sender, msg
 
 """
 Takes a line from a .csv file and returns the timestamp, sender, and message content.
+Fields that csv.writer quoted, because they contain commas or quotes, are unquoted like csv.reader does.
 
 Args:
-  line (str): A line of text from the .txt file
+  line (str): A line of text from the .csv file
+  timestamps (TimestampParser): The parser of the export's timestamps. Defaults to M/D/YY dates.
+  minutes (bool): Returns the minutes since 1970-01-01 instead of the date.
 
 Returns:
   Tuple(date, str, str): A tuple of all the values.
 """
-def get_csv(line: str) -> Tuple[date, str, str]:
-  msg_date, time_value, msg_sender, msg = line.split(",", 3)
-  month, day, year = map(int, msg_date.split("/"))
-  timestamp = date(2000 + year, month, day)
+def get_csv(line: str, timestamps: TimestampParser = None, minutes: bool = False) -> Tuple[date, str, str]:
+  # Only lines with quoted fields need the csv module, the others are split directly
+  if '"' in line:
+    msg_date, time_value, msg_sender, msg = next(csv.reader([line]))
+  else:
+    msg_date, time_value, msg_sender, msg = line.rstrip("\r\n").split(",", 3)
+  timestamp = get_timestamp(msg_date, time_value, timestamps, minutes)
   
   return timestamp, msg_sender, msg
 
@@ -40,14 +87,15 @@ Takes an ijson object from a .json file and returns the timestamp, sender, and m
 
 Args:
   obj (dict): An ijson object from the .json file
+  timestamps (TimestampParser): The parser of the export's timestamps. Defaults to M/D/YY dates.
+  minutes (bool): Returns the minutes since 1970-01-01 instead of the date.
 
 Returns:
   Tuple(date, str, str): A tuple of all the values.
 """
-def get_json(obj: dict) -> Tuple[date, str, str]:
-  month, day, year = map(int, obj["date"].split("/"))
-  timestamp = date(2000 + year, month, day)
+def get_json(obj: dict, timestamps: TimestampParser = None, minutes: bool = False) -> Tuple[date, str, str]:
+  timestamp = get_timestamp(obj["date"], obj.get("time", "00:00"), timestamps, minutes)
   msg_sender = obj["username"]
   msg = obj["message"]
   
-  return timestamp, msg_sender, msg
\ No newline at end of file
+  return timestamp, msg_sender, msg
@@ -0,0 +1,149 @@
+from .converters import get_fields, get_json_record
+from .validation import iter_validated_lines
+from .sentiment import analyze_records, resume_from_checkpoint, count_records
+from .checkpoint import Checkpoint
+from .sinks import Sink
+from .readers import iter_lines, get_timestamp_parser
+from .timestamps import TimestampParser
+from .cache import MemoizedAnalyzer
+from .scorers import Scorer, get_scorer, get_score_version
+from .parsers import get_txt
+from .instrumentation import record_stage
+from .config import header_prefix_bytes_pattern
+from contextlib import ExitStack
+from datetime import date
+from typing import Iterable, Iterator, Tuple, Union
+import csv
+import os
+
+"""
+Turns the lines of a raw exported chat into parsed messages in a single streaming pass:
+multi-line messages are stitched together, admin messages are filtered out and every message is parsed.
+The intermediate formats are only written if a file object is provided for them.
+
+Args:
+  lines (Iterable[str]): The lines of the exported chat.
+  validatedFile (TextIO): Receives the validated lines, like data_validation() writes them. Optional.
+  jsonFile (TextIO): Receives the messages in the format of convert_txt_to_json(). Optional.
+  csvFile (TextIO): Receives the messages in the format of convert_txt_to_csv(). Optional.
+  timestamps (TimestampParser): The parser of the export's timestamps. Defaults to M/D/YY dates.
+  ndjson (bool): Writes one object per line to jsonFile, like convert_txt_to_json(ndjson = True), instead of an array.
+
+Returns:
+  Iterator[Tuple[date, str, str]]: The timestamp, sender, and message content of every message.
+"""
+def iter_export_records(lines: Iterable[str],
+                        validatedFile = None,
+                        jsonFile = None,
+                        csvFile = None,
+                        timestamps: TimestampParser = None,
+                        ndjson: bool = False) -> Iterator[Tuple[date, str, str]]:
+  csv_writer = None
+  if csvFile is not None:
+    csv_writer = csv.writer(csvFile)
+    csv_writer.writerow(["Date", "Time", "Username", "Message"])
+
+  array = jsonFile is not None and not ndjson
+  if array:
+    jsonFile.write('[\n')
+
+  first = True
+  for line in iter_validated_lines(lines):
+    if validatedFile is not None:
+      validatedFile.write(line)
+
+    if ndjson and jsonFile is not None:
+      jsonFile.write(f'{get_json_record(line)}\n')
+    elif array:
+      if not first:
+        jsonFile.write(",\n")
+      jsonFile.write(f'\t{get_json_record(line)}')
+
+    if csv_writer is not None:
+      csv_writer.writerow(get_fields(line))
+
+    first = False
+    yield get_txt(line, timestamps)
+
+  if array:
+    jsonFile.write('\n]\n')
+
+"""
+Checks whether a line of an exported chat starts a message, i.e. is not the continuation of a multi-line message.
+
+Args:
+  filePath (str): The path to the exported chat.
+  offset (int): The offset of the start of the line.
+
+Returns:
+  bool: True if the line starts with the timestamp of a message or system message.
+"""
+def starts_message(filePath: str, offset: int) -> bool:
+  with open(filePath, "rb") as f:
+    f.seek(offset)
+    return header_prefix_bytes_pattern.match(f.readline()) is not None
+
+"""
+Analyzes a raw exported chat without writing any intermediate files.
+Validation, parsing and scoring are fused into one pass over the export, so memory use does not depend
+on the size of the export (besides the result itself). Intermediate files are written only when their path is provided.
+
+Args:
+  filePath (str): The path to the exported .txt chat.
+  validatedPath (str): Where to write the validated .txt file, as data_validation() would. Optional.
+  jsonPath (str): Where to write the .json file, as convert_txt_to_json() would. Optional. A path ending in .jsonl gets one object per line.
+  csvPath (str): Where to write the .csv file, as convert_txt_to_csv() would. Optional.
+  cachePath (str): The path to a persistent score cache, or None.
+  analyzer (MemoizedAnalyzer): The analyzer used to score messages, or None for the default one of the engine.
+  columnar (bool): Returns a ColumnarSentiment instead of a dictionary.
+  engine (Union[str, Scorer]): The scoring backend used when no analyzer is provided (see sentiment_analysis()).
+  checkpointPath (str): The path to a checkpoint (see checkpoint.Checkpoint). If the export continues the one the checkpoint
+  was saved for, only the appended lines are validated and scored, and the result and intermediate files only contain the new messages.
+  The running totals continue from the checkpoint, which is updated afterwards. An export whose appended lines continue
+  the last checkpointed message is analyzed from the start.
+  sink (Sink): Receives the scored messages instead of the default result (see sinks). With a BucketSink or FileSink,
+  memory no longer depends on the size of the export at all.
+
+Returns:
+  dict: A dictionary of all chat members and their sentiment scores, or the result of the sink.
+"""
+def analyze_export(filePath: str,
+                   validatedPath: str = None,
+                   jsonPath: str = None,
+                   csvPath: str = None,
+                   cachePath: str = None,
+                   analyzer: MemoizedAnalyzer = None,
+                   columnar: bool = False,
+                   engine: Union[str, Scorer] = "nltk",
+                   checkpointPath: str = None,
+                   sink: Sink = None) -> dict:
+  engine = get_scorer(engine)
+
+  start, members_sentiment_cache, message_count = 0, {}, [0]
+  version = get_score_version(engine, analyzer)
+  if checkpointPath is not None:
+    start, members_sentiment_cache, message_count = resume_from_checkpoint(checkpointPath, filePath, version)
+    # Lines were appended to the last checkpointed message, whose score is stale, so the export is analyzed again
+    if start and not starts_message(filePath, start):
+      start, members_sentiment_cache, message_count = 0, {}, [0]
+
+  with ExitStack() as stack:
+    # Validation, parsing and scoring are interleaved, the nested "parsing" and "scoring" stages split the time of the pipeline
+    stack.enter_context(record_stage("pipeline"))
+    if start:
+      lines = iter_lines(filePath, start, os.path.getsize(filePath))
+    else:
+      lines = stack.enter_context(open(filePath, 'r', encoding = "utf-8"))
+
+    validatedFile = stack.enter_context(open(validatedPath, 'w', encoding = "utf-8", newline = "")) if validatedPath else None
+    jsonFile = stack.enter_context(open(jsonPath, 'w', encoding = "utf-8")) if jsonPath else None
+    csvFile = stack.enter_context(open(csvPath, 'w', encoding = "utf-8")) if csvPath else None
+
+    records = count_records(iter_export_records(lines, validatedFile, jsonFile, csvFile, get_timestamp_parser(filePath),
+                                                ndjson = bool(jsonPath) and jsonPath.lower().endswith(".jsonl")), message_count)
+    result = analyze_records(records, cachePath, analyzer, columnar, engine, members_sentiment_cache, sink = sink)
+
+  if checkpointPath is not None:
+    Checkpoint.create(filePath, members_sentiment_cache, message_count[0], version).save(checkpointPath)
+
+  return result
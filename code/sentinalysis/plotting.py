@@ -1,31 +1,321 @@
-import matplotlib.pyplot as plt
+from .results import ColumnarSentiment
+from .downsampling import DOWNSAMPLERS
+from .aggregation import aggregate_sentiment
+from .instrumentation import record_stage
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib import rcParams
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Callable, List
 import numpy as np
 import os
 
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+"""
+Renders the chart of a single member with the object-oriented Agg API. Nothing touches the global pyplot state,
+so charts can be rendered in several processes at once.
+
+Args:
+  x (np.ndarray): The dates of the points.
+  y (np.ndarray): The cumulative scores of the points.
+  group_member (str): The name of the member.
+  imagePath (str): The path of the PNG file.
+
+Returns:
+  str: The path of the PNG file.
+"""
+def render_chart(x: np.ndarray, y: np.ndarray, group_member: str, imagePath: str) -> str:
+  figure = Figure()
+  FigureCanvasAgg(figure)
+  axes = figure.add_subplot()
+
+  axes.plot(x, y)
+  axes.set_xlabel("Dates")
+  axes.set_ylabel("Positivity Score")
+  axes.set_title(f"{group_member}'s positivity score")
+  figure.autofmt_xdate(rotation = 45)
+
+  figure.savefig(imagePath, bbox_inches='tight')
+  return imagePath
+
+"""
+Renders candlesticks of the cumulative score of a single member (see aggregation.resample_ohlc()),
+with the number of messages of every bucket below them. Uses the object-oriented Agg API like render_chart().
+
+Args:
+  candlesticks (dict[str, np.ndarray]): The candlesticks of the member.
+  group_member (str): The name of the member.
+  imagePath (str): The path of the PNG file.
+
+Returns:
+  str: The path of the PNG file.
+"""
+def render_candlestick_chart(candlesticks: dict[str, np.ndarray], group_member: str, imagePath: str) -> str:
+  figure = Figure()
+  FigureCanvasAgg(figure)
+  price_axes, count_axes = figure.subplots(2, 1, sharex = True, gridspec_kw = {"height_ratios": (3, 1)})
+
+  x = candlesticks["date"]
+  # Buckets of weeks and months are drawn as wide as the shortest gap between them
+  width = np.min(np.diff(x)).astype(np.int64) * 0.8 if len(x) > 1 else 0.8
+  rising = candlesticks["close"] >= candlesticks["open"]
+  colors = np.where(rising, "tab:green", "tab:red")
+
+  price_axes.vlines(x, candlesticks["low"], candlesticks["high"], colors = colors, linewidth = 0.8)
+  price_axes.bar(x, candlesticks["close"] - candlesticks["open"], width, bottom = candlesticks["open"], color = colors)
+  price_axes.set_ylabel("Positivity Score")
+  price_axes.set_title(f"{group_member}'s positivity score")
+
+  count_axes.bar(x, candlesticks["count"], width, color = "tab:gray")
+  count_axes.set_xlabel("Dates")
+  count_axes.set_ylabel("Messages")
+  figure.autofmt_xdate(rotation = 45)
+
+  figure.savefig(imagePath, bbox_inches='tight')
+  return imagePath
+
+"""
+Renders the rolling statistics of a single member (see rolling.RollingSink) below its cumulative score,
+with the message rate at the bottom. Uses the object-oriented Agg API like render_chart().
+
+Args:
+  statistics (dict[str, np.ndarray]): The statistics of the member.
+  group_member (str): The name of the member.
+  imagePath (str): The path of the PNG file.
+  columns (List[str]): The statistics drawn in the middle axes, e.g. "mean", "window_mean" and "ewma".
+
+Returns:
+  str: The path of the PNG file.
+"""
+def render_rolling_chart(statistics: dict[str, np.ndarray], group_member: str, imagePath: str, columns: List[str]) -> str:
+  figure = Figure(figsize = (rcParams["figure.figsize"][0], rcParams["figure.figsize"][1] * 1.5))
+  FigureCanvasAgg(figure)
+  cumulative_axes, rolling_axes, rate_axes = figure.subplots(3, 1, sharex = True, gridspec_kw = {"height_ratios": (2, 2, 1)})
+
+  x = statistics["date"]
+  cumulative_axes.plot(x, statistics["cumulative"])
+  cumulative_axes.set_ylabel("Positivity Score")
+  cumulative_axes.set_title(f"{group_member}'s positivity score")
+
+  for column in columns:
+    rolling_axes.plot(x, statistics[column], label = column.replace("_", " "), linewidth = 0.8)
+  rolling_axes.axhline(0.0, color = "tab:gray", linewidth = 0.5)
+  rolling_axes.set_ylabel("Compound Score")
+  rolling_axes.legend(loc = "upper left", fontsize = "small")
+
+  rate_axes.plot(x, statistics["rate"], color = "tab:gray")
+  rate_axes.set_xlabel("Dates")
+  rate_axes.set_ylabel("Messages/Day")
+  figure.autofmt_xdate(rotation = 45)
+
+  figure.savefig(imagePath, bbox_inches='tight')
+  return imagePath
+
+"""
+Renders a set of charts, serially or in a pool of processes with one figure per task.
+
+Args:
+  render (Callable): The rendering function, e.g. render_chart() or render_candlestick_chart().
+  tasks (List[tuple]): The arguments of every call.
+  workers (int): The number of processes.
+
+Returns:
+  None
+"""
+def render_all(render: Callable, tasks: List[tuple], workers: int = 1) -> None:
+  if workers > 1 and len(tasks) > 1:
+    with ProcessPoolExecutor(max_workers = min(workers, len(tasks))) as executor:
+      # Waiting for every result surfaces the errors of the workers
+      list(executor.map(render, *zip(*tasks)))
+  else:
+    for task in tasks:
+      render(*task)
+
 """
 Takes sentiment_analysis()'s resulting dictionary and creates a sentiment chart for each member.
 Resulting directory can be downloaded.
 
 Args:
   sentiment_dictionary (dict): A dictionary of all chat members and their sentiment scores.
+  A ColumnarSentiment is plotted straight from its arrays, and a MessageStore from its indexes (see MessageStore.sentiment()).
   outputPath (str): The path of the directory where the validated .txt file will be saved.
-  
+  workers (int): The number of processes rendering charts. With more than one, every chart is rendered in a pool, one figure per task.
+  downsample (str): Reduces every series before plotting, so the cost of a chart depends on its width instead of the number of messages.
+  "minmax" keeps the lowest and highest point of every pixel column, which draws the same line as the full series.
+  "lttb" keeps max_points points with the Largest-Triangle-Three-Buckets algorithm. All points are plotted if not provided.
+  max_points (int): The number of points kept by downsampling. Defaults to twice the width of the charts in pixels (see matplotlib's rcParams).
+
 Returns:
   None
 """
-def get_charts(sentiment_dictionary: dict, outputPath: str) -> None:
+def get_charts(sentiment_dictionary: dict, outputPath: str, workers: int = 1, downsample: str = None, max_points: int = None) -> None:
+  if downsample is not None and downsample not in DOWNSAMPLERS:
+    raise ValueError(f"Unsupported downsampling method: {downsample}")
+
+  from .store import MessageStore
+  if isinstance(sentiment_dictionary, MessageStore):
+    sentiment_dictionary = sentiment_dictionary.sentiment()
+
   new_directory_path = os.path.join(outputPath, "sentiment_chart_images/")
   os.makedirs(new_directory_path, exist_ok = True)
 
-  for group_member in sentiment_dictionary:
-    y = np.array([score for score, _ in sentiment_dictionary[group_member]])
-    x = np.array([timestamp for _, timestamp in sentiment_dictionary[group_member]])
+  if max_points is None:
+    max_points = 2 * int(rcParams["figure.figsize"][0] * rcParams["figure.dpi"])
+
+  with record_stage("charts") as stage:
+    tasks = []
+    for group_member in sentiment_dictionary:
+      if isinstance(sentiment_dictionary, ColumnarSentiment):
+        y = sentiment_dictionary.cumulative(group_member)
+        x = sentiment_dictionary.dates(group_member)
+      else:
+        points = sentiment_dictionary[group_member]
+        y = np.fromiter((score for score, _ in points), dtype = np.float64, count = len(points))
+        # Days are converted to datetime64 at once, which is much faster for numpy and matplotlib than an array of date objects
+        x = (np.fromiter((timestamp.toordinal() for _, timestamp in points), dtype = np.int64, count = len(points)) - _EPOCH_ORDINAL).astype("datetime64[D]")
+
+      stage.add(len(y))
+      if downsample == "minmax":
+        x, y = DOWNSAMPLERS[downsample](x, y, max_points // 2)
+      elif downsample is not None:
+        x, y = DOWNSAMPLERS[downsample](x, y, max_points)
+
+      tasks.append((x, y, group_member, os.path.join(new_directory_path, f"{group_member}-sentiment.png")))
+
+    render_all(render_chart, tasks, workers)
+
+"""
+Takes sentiment_analysis()'s resulting dictionary and creates a candlestick chart for each member,
+with one candlestick per day, week or month (see aggregation.aggregate_sentiment()).
+
+Args:
+  sentiment_dictionary (dict): A dictionary of all chat members and their sentiment scores, a ColumnarSentiment or a MessageStore.
+  outputPath (str): The path of the directory where the charts will be saved.
+  freq (str): The bucket size, "D", "W" or "M".
+  workers (int): The number of processes rendering charts.
+  baseline (dict[str, float]): The cumulative score of every member of a dictionary before its first point, e.g. the one of a checkpoint.
+
+Returns:
+  None
+"""
+def get_candlestick_charts(sentiment_dictionary: dict, outputPath: str, freq: str = "W", workers: int = 1, baseline: dict[str, float] = None) -> None:
+  from .store import MessageStore
+  if isinstance(sentiment_dictionary, MessageStore):
+    sentiment_dictionary = sentiment_dictionary.sentiment()
+
+  render_candlesticks(aggregate_sentiment(sentiment_dictionary, freq, baseline), outputPath, workers)
+
+"""
+Creates a candlestick chart for each member from candlesticks that were already aggregated,
+e.g. the result of a sinks.BucketSink, which never holds the individual messages.
+
+Args:
+  candlesticks (dict[str, dict[str, np.ndarray]]): The candlesticks of every member (see aggregation.aggregate_sentiment()).
+  outputPath (str): The path of the directory where the charts will be saved.
+  workers (int): The number of processes rendering charts.
+
+Returns:
+  None
+"""
+def render_candlesticks(candlesticks: dict[str, dict[str, np.ndarray]], outputPath: str, workers: int = 1) -> None:
+  new_directory_path = os.path.join(outputPath, "sentiment_candlestick_images/")
+  os.makedirs(new_directory_path, exist_ok = True)
+
+  with record_stage("candlestick-charts") as stage:
+    tasks = [(member_candlesticks, group_member, os.path.join(new_directory_path, f"{group_member}-candlestick.png"))
+             for group_member, member_candlesticks in candlesticks.items()]
+    stage.add(sum(len(member_candlesticks["date"]) for member_candlesticks, _, _ in tasks))
+    render_all(render_candlestick_chart, tasks, workers)
+
+"""
+Creates a chart of the rolling statistics of each member: the cumulative score, the rolling means and the message rate.
+The statistics of a RollingSink are drawn as they are, which computes them in the same pass as the scores.
+Results that were already scored have their statistics computed from their saved scores (see rolling.rolling_statistics()).
+
+Args:
+  statistics (dict): The result of a rolling.RollingSink, or a dictionary of all chat members and their sentiment scores,
+  a ColumnarSentiment or a MessageStore.
+  outputPath (str): The path of the directory where the charts will be saved.
+  columns (List[str]): The statistics drawn below the cumulative score, any of "mean", "variance", "window_mean" and "ewma".
+  workers (int): The number of processes rendering charts.
+
+Returns:
+  None
+"""
+def get_rolling_charts(statistics: dict, outputPath: str, columns: List[str] = ("mean", "window_mean", "ewma"), workers: int = 1) -> None:
+  from .rolling import COLUMNS, rolling_statistics
+
+  unknown = [column for column in columns if column not in COLUMNS]
+  if unknown:
+    raise ValueError(f"Unsupported rolling statistics: {', '.join(unknown)}")
+
+  from .store import MessageStore
+  if isinstance(statistics, MessageStore):
+    statistics = statistics.sentiment()
+  if isinstance(statistics, ColumnarSentiment) or any(not isinstance(values, dict) for values in statistics.values()):
+    statistics = rolling_statistics(statistics)
+
+  new_directory_path = os.path.join(outputPath, "sentiment_rolling_images/")
+  os.makedirs(new_directory_path, exist_ok = True)
+
+  with record_stage("rolling-charts") as stage:
+    tasks = [(member_statistics, group_member, os.path.join(new_directory_path, f"{group_member}-rolling.png"), list(columns))
+             for group_member, member_statistics in statistics.items()]
+    stage.add(sum(len(member_statistics["date"]) for member_statistics, _, _, _ in tasks))
+    render_all(render_rolling_chart, tasks, workers)
+
+"""
+Creates a heatmap of a reply graph (see interactions.interaction_analysis()), with a row per member who replied
+and a column per member who was replied to. Cells show their value when there are few enough members to read them.
+
+Args:
+  interactions (dict): The reply graph.
+  outputPath (str): The path of the directory where the heatmap will be saved.
+  value (str): "count" colors the number of replies, "mean" their mean compound score.
+
+Returns:
+  str: The path of the PNG file.
+"""
+def get_interaction_heatmap(interactions: dict, outputPath: str, value: str = "count") -> str:
+  from .interactions import to_dense
+
+  if value not in ("count", "mean"):
+    raise ValueError(f"Unsupported heatmap value: {value}")
+
+  os.makedirs(outputPath, exist_ok = True)
+  imagePath = os.path.join(outputPath, f"interactions-{value}.png")
+
+  with record_stage("interaction-heatmap") as stage:
+    members = interactions["members"]
+    counts, means = to_dense(interactions)
+    matrix = counts if value == "count" else means
+    stage.add(len(interactions["count"]))
+
+    # Grows with the number of members, so that their names stay readable
+    size = max(rcParams["figure.figsize"][0], 0.4 * len(members))
+    figure = Figure(figsize = (size, size))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+
+    if value == "count":
+      image = axes.imshow(matrix, cmap = "viridis")
+    else:
+      image = axes.imshow(np.ma.masked_invalid(matrix), cmap = "RdYlGn", vmin = -1, vmax = 1)
+    figure.colorbar(image, ax = axes, label = "Replies" if value == "count" else "Mean Compound Score")
+
+    axes.set_xticks(range(len(members)), members, rotation = 90)
+    axes.set_yticks(range(len(members)), members)
+    axes.set_xlabel("Replied to")
+    axes.set_ylabel("Replied")
+    axes.set_title("Replies between members" if value == "count" else "Sentiment of replies between members")
+
+    if len(members) <= 20:
+      for source, target in zip(interactions["source"].tolist(), interactions["target"].tolist()):
+        label = f"{counts[source, target]}" if value == "count" else f"{means[source, target]:.2f}"
+        axes.text(target, source, label, ha = "center", va = "center", fontsize = "small", color = "white" if value == "count" else "black")
 
-    plt.plot(x, y)
-    plt.xlabel("Dates")
-    plt.ylabel("Positivity Score")
-    plt.title(f"{group_member}'s positivity score")
-    plt.gcf().autofmt_xdate(rotation = 45)
+    figure.savefig(imagePath, bbox_inches='tight')
 
-    plt.savefig(os.path.join(new_directory_path, f"{group_member}-sentiment.png"), bbox_inches='tight')
-    plt.close()
\ No newline at end of file
+  return imagePath
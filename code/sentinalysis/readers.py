@@ -0,0 +1,407 @@
+from .timestamps import TimestampParser, detect_format, detect_date_order, FORMAT_SAMPLE_SIZE
+from .parsers import get_txt, get_json
+from .columns import ChatColumns, COLUMNS_EXTENSION, is_columns_path
+from datetime import date
+from typing import Iterable, Iterator, List, Tuple
+from itertools import islice
+import orjson
+import csv
+import io
+import ijson
+import os
+
+SUPPORTED_EXTENSIONS = (".txt", ".csv", ".json", ".jsonl", COLUMNS_EXTENSION)
+# Number of bytes read at once by iter_line_chunks()
+READ_CHUNK_SIZE = 4 * 1024 * 1024
+# Number of rows parsed at once by iter_csv_batches(), and the parsers it can use
+CSV_BATCH_SIZE = 8192
+CSV_ENGINES = ("pandas", "csv")
+
+"""
+Checks whether a .json file follows the layout written by convert_txt_to_json(),
+where the opening bracket sits on its own line and every object occupies exactly one line.
+Only files with this layout can be split into byte ranges and read line by line, other arrays are read with ijson.
+.jsonl files always hold one object per line.
+
+Args:
+  filePath (str): The path to the .json file.
+
+Returns:
+  bool: True if every object is on its own line.
+"""
+def is_line_delimited_json(filePath: str) -> bool:
+  if os.path.splitext(filePath)[1].lower() == ".jsonl":
+    return True
+
+  with open(filePath, "rb") as f:
+    if f.readline().strip() != b"[":
+      return False
+    first_object = f.readline().strip().rstrip(b",")
+
+  # An indented array also starts with a lone bracket, but its objects span several lines
+  return first_object in (b"", b"]") or (first_object.startswith(b"{") and first_object.endswith(b"}"))
+
+"""
+Returns the byte offset of the first message in the file, skipping the .csv header or the opening .json bracket.
+
+Args:
+  filePath (str): The path to the file.
+
+Returns:
+  int: The offset of the first message.
+"""
+def get_data_start(filePath: str) -> int:
+  fileExtension = os.path.splitext(filePath)[1].lower()
+
+  if fileExtension in (".csv", ".json"):
+    with open(filePath, "rb") as f:
+      f.readline()
+      return f.tell()
+
+  return 0
+
+"""
+Splits a file into byte ranges of roughly equal size. Every range starts and ends on a line boundary,
+and since validated files hold exactly one message per line, no message is ever cut in half.
+Columns directories are split into ranges of rows instead.
+
+Args:
+  filePath (str): The path to the validated file.
+  count (int): The number of requested shards. Fewer are returned for small files.
+
+Returns:
+  List[Tuple[int, int]]: The (start, end) byte offsets of each shard.
+"""
+def get_shards(filePath: str, count: int) -> List[Tuple[int, int]]:
+  if is_columns_path(filePath):
+    with ChatColumns(filePath) as chat:
+      rows = len(chat)
+    boundaries = [rows * i // count for i in range(count + 1)]
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+  fileExtension = os.path.splitext(filePath)[1].lower()
+  size = os.path.getsize(filePath)
+
+  # Legacy .json arrays can only be read as a whole
+  if fileExtension == ".json" and not is_line_delimited_json(filePath):
+    return [(0, size)]
+
+  data_start = get_data_start(filePath)
+  boundaries = [data_start]
+
+  with open(filePath, "rb") as f:
+    for i in range(1, count):
+      # Seeking one byte back ensures that an offset already sitting on a line start is kept
+      f.seek(max(data_start + (size - data_start) * i // count - 1, data_start))
+      f.readline()
+      boundaries.append(max(f.tell(), boundaries[-1]))
+
+  boundaries.append(size)
+
+  return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+"""
+Reads the lines of a byte range, decoded the same way a text mode file object would decode them.
+
+Args:
+  filePath (str): The path to the file.
+  start (int): The offset of the first byte.
+  end (int): The offset after the last byte.
+
+Returns:
+  Iterator[str]: The lines of the range.
+"""
+def iter_lines(filePath: str, start: int, end: int) -> Iterator[str]:
+  with open(filePath, "rb") as f:
+    f.seek(start)
+    position = start
+
+    while position < end:
+      line = f.readline()
+      if not line:
+        break
+      position += len(line)
+
+      if line.endswith(b"\r\n"):
+        line = line[:-2] + b"\n"
+      yield line.decode("utf-8")
+
+"""
+Reads the lines of a byte range in large chunks, without decoding them. Much faster than reading line by line
+when the lines are handed to a parser that takes bytes, like orjson.
+
+Args:
+  filePath (str): The path to the file.
+  start (int): The offset of the first byte.
+  end (int): The offset after the last byte.
+  chunk_size (int): The number of bytes read at once.
+
+Returns:
+  Iterator[List[bytes]]: The lines of every chunk, without their "\n".
+"""
+def iter_line_chunks(filePath: str, start: int, end: int, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[List[bytes]]:
+  with open(filePath, "rb") as f:
+    f.seek(start)
+    remaining, rest = end - start, b""
+
+    while remaining > 0:
+      data = f.read(min(chunk_size, remaining))
+      if not data:
+        break
+      remaining -= len(data)
+
+      lines = (rest + data).split(b"\n")
+      rest = lines.pop()
+      yield lines
+
+    if rest:
+      yield [rest]
+
+"""
+Reads the objects of a byte range of a line-delimited .json or .jsonl file, parsing every line with orjson.
+
+Args:
+  filePath (str): The path to the file.
+  start (int): The offset of the first byte.
+  end (int): The offset after the last byte.
+
+Returns:
+  Iterator[dict]: The objects of the range.
+"""
+def iter_json_objects(filePath: str, start: int, end: int) -> Iterator[dict]:
+  loads = orjson.loads
+
+  for lines in iter_line_chunks(filePath, start, end):
+    for line in lines:
+      line = line.strip().rstrip(b",")
+      if line and line != b"[" and line != b"]":
+        yield loads(line)
+
+"""
+Raw file object over a byte range of a file, for readers that take a file object and read it until the end,
+like csv.reader() through io.TextIOWrapper or pandas.read_csv().
+
+Args:
+  f (BinaryIO): The file, opened in binary mode.
+  start (int): The offset of the first byte.
+  end (int): The offset after the last byte.
+"""
+class _RangeFile(io.RawIOBase):
+  def __init__(self, f, start: int, end: int):
+    f.seek(start)
+    self._f = f
+    self._remaining = end - start
+
+  def readable(self) -> bool:
+    return True
+
+  def readinto(self, buffer) -> int:
+    data = self._f.read(min(len(buffer), self._remaining))
+    buffer[:len(data)] = data
+    self._remaining -= len(data)
+    return len(data)
+
+"""
+Reads the rows of a byte range of a .csv file with csv.reader, which unquotes the fields csv.writer quoted.
+The range is read through a large buffer, fields spanning several lines are kept whole and blank lines are skipped.
+
+Args:
+  f (BinaryIO): The .csv file, opened in binary mode.
+  start (int): The offset of the first byte.
+  end (int): The offset after the last byte.
+
+Returns:
+  Iterator[List[str]]: The fields of every row.
+"""
+def iter_csv_rows(f, start: int, end: int) -> Iterator[List[str]]:
+  lines = io.TextIOWrapper(io.BufferedReader(_RangeFile(f, start, end), READ_CHUNK_SIZE), encoding = "utf-8", newline = "")
+  return filter(None, csv.reader(lines))
+
+"""
+Parses the date (or date and time) columns of a batch of messages. Since thousands of messages share a day,
+every distinct value is parsed once and the column is rebuilt from the parsed values.
+
+Args:
+  dates (Iterable[str]): The dates of the messages.
+  times (Iterable[str]): The times of the messages.
+  timestamps (TimestampParser): The parser of the file's timestamps.
+  minutes (bool): Returns the minutes since 1970-01-01 of every message instead of its date.
+
+Returns:
+  Iterator[Union[date, int]]: The timestamp of every message.
+"""
+def _parse_timestamp_column(dates: Iterable[str], times: Iterable[str], timestamps: TimestampParser, minutes: bool) -> Iterator:
+  if minutes:
+    keys = list(zip(dates, times))
+    parsed = {key: timestamps.get_minutes(*key) for key in set(keys)}
+  else:
+    keys = dates
+    parsed = {key: timestamps.get_date(key) for key in set(keys)}
+
+  return map(parsed.__getitem__, keys)
+
+"""
+Reads the messages of a byte range of a .csv file in batches, with a real CSV parser that unquotes the fields csv.writer quoted.
+Every batch is parsed into columns at once, so no Python code runs per row besides building the records.
+The "pandas" engine parses the range with the C parser of pandas.read_csv() in chunks, the "csv" engine with csv.reader,
+which is slower but needs nothing besides the standard library.
+
+Args:
+  filePath (str): The path to the .csv file.
+  start (int): The offset of the first byte. Defaults to the first message.
+  end (int): The offset after the last byte. Defaults to the end of the file.
+  timestamps (TimestampParser): The parser of the file's timestamps. Detected with get_timestamp_parser() if not provided.
+  minutes (bool): Returns the minutes since 1970-01-01 of every message instead of its date.
+  size (int): The number of messages in a batch. The last batch may be smaller.
+  engine (str): The CSV parser, one of CSV_ENGINES.
+
+Returns:
+  Iterator[List[Tuple[date, str, str]]]: The timestamp, sender, and message content of every message, in batches.
+"""
+def iter_csv_batches(filePath: str,
+                     start: int = None,
+                     end: int = None,
+                     timestamps: TimestampParser = None,
+                     minutes: bool = False,
+                     size: int = CSV_BATCH_SIZE,
+                     engine: str = "pandas") -> Iterator[List[Tuple[date, str, str]]]:
+  if engine not in CSV_ENGINES:
+    raise ValueError(f"Unsupported CSV engine: {engine}")
+
+  if timestamps is None:
+    timestamps = get_timestamp_parser(filePath)
+  if start is None:
+    start = get_data_start(filePath)
+  if end is None:
+    end = os.path.getsize(filePath)
+  if start >= end:
+    return
+
+  if engine == "csv":
+    with open(filePath, "rb") as f:
+      rows = iter_csv_rows(f, start, end)
+
+      while batch := list(islice(rows, size)):
+        try:
+          dates, times, senders, msgs = zip(*batch, strict = True)
+        except ValueError:
+          raise ValueError(f"Expected rows of 4 fields in {filePath}: Date, Time, Username and Message") from None
+
+        yield list(zip(_parse_timestamp_column(dates, times, timestamps, minutes), senders, msgs))
+    return
+
+  # pandas takes a while to import, and is only needed here
+  import pandas as pd
+
+  with open(filePath, "rb") as f:
+    chunks = pd.read_csv(io.BufferedReader(_RangeFile(f, start, end), READ_CHUNK_SIZE),
+                         header = None,
+                         names = ["Date", "Time", "Username", "Message"],
+                         dtype = str,
+                         keep_default_na = False,
+                         encoding = "utf-8",
+                         chunksize = size)
+
+    with chunks:
+      for chunk in chunks:
+        dates, times = chunk["Date"].tolist(), chunk["Time"].tolist()
+        yield list(zip(_parse_timestamp_column(dates, times, timestamps, minutes), chunk["Username"].tolist(), chunk["Message"].tolist()))
+
+"""
+Detects the timestamp format of a .txt, .csv, .json or .jsonl file from its first messages.
+Byte ranges of a file are always parsed with the parser of the whole file, so that every shard uses the same date order.
+
+Args:
+  filePath (str): The path to the file.
+  sample_size (int): The number of messages to sample.
+
+Returns:
+  TimestampParser: A parser for the timestamps of the file.
+"""
+def get_timestamp_parser(filePath: str, sample_size: int = FORMAT_SAMPLE_SIZE) -> TimestampParser:
+  fileExtension = os.path.splitext(filePath)[1].lower()
+
+  if fileExtension == ".csv":
+    with open(filePath, "rb") as f:
+      rows = list(islice(iter_csv_rows(f, get_data_start(filePath), os.path.getsize(filePath)), sample_size))
+    return TimestampParser(detect_date_order([row[0] for row in rows]))
+
+  if fileExtension in (".json", ".jsonl"):
+    if is_line_delimited_json(filePath):
+      objects = list(islice(iter_json_objects(filePath, get_data_start(filePath), os.path.getsize(filePath)), sample_size))
+    else:
+      with open(filePath, "rb") as f:
+        objects = list(islice(ijson.items(f, "item"), sample_size))
+    return TimestampParser(detect_date_order([obj["date"] for obj in objects]))
+
+  return TimestampParser(detect_format(iter_lines(filePath, 0, os.path.getsize(filePath)), sample_size))
+
+"""
+Reads every message of a validated .txt, .csv, .json or .jsonl file, or of a single byte range within it.
+Line-delimited .json and .jsonl files are parsed with orjson line by line, legacy .json arrays with ijson.
+Columns directories are read through their memory-mapped columns, and start and end are rows.
+
+Args:
+  filePath (str): The path to the file.
+  start (int): The offset of the first byte. Defaults to the first message.
+  end (int): The offset after the last byte. Defaults to the end of the file.
+  timestamps (TimestampParser): The parser of the file's timestamps. Detected with get_timestamp_parser() if not provided.
+  minutes (bool): Returns the minutes since 1970-01-01 of every message instead of its date.
+
+Returns:
+  Iterator[Tuple[date, str, str]]: The timestamp, sender, and message content of every message.
+"""
+def iter_records(filePath: str,
+                 start: int = None,
+                 end: int = None,
+                 timestamps: TimestampParser = None,
+                 minutes: bool = False) -> Iterator[Tuple[date, str, str]]:
+  if is_columns_path(filePath):
+    with ChatColumns(filePath) as chat:
+      yield from chat.iter_records(start, end, minutes)
+    return
+
+  fileExtension = os.path.splitext(filePath)[1].lower()
+
+  if fileExtension not in SUPPORTED_EXTENSIONS:
+    raise ValueError(f"Unsupported file extension: {fileExtension}")
+
+  if timestamps is None:
+    timestamps = get_timestamp_parser(filePath)
+
+  # Legacy arrays can only be read as a whole, get_shards() returns a single range for them
+  if fileExtension == ".json" and not is_line_delimited_json(filePath):
+    with open(filePath, "rb") as f:
+      for obj in ijson.items(f, "item"):
+        yield get_json(obj, timestamps, minutes)
+    return
+
+  if start is None:
+    start = get_data_start(filePath)
+  if end is None:
+    end = os.path.getsize(filePath)
+
+  if fileExtension == ".csv":
+    for batch in iter_csv_batches(filePath, start, end, timestamps, minutes):
+      yield from batch
+  elif fileExtension in (".json", ".jsonl"):
+    for obj in iter_json_objects(filePath, start, end):
+      yield get_json(obj, timestamps, minutes)
+  else:
+    for line in iter_lines(filePath, start, end):
+      yield get_txt(line, timestamps, minutes)
+
+"""
+Groups the records returned by iter_records() into lists of a fixed size.
+
+Args:
+  records (Iterable[Tuple[date, str, str]]): The records to be grouped.
+  size (int): The number of records in a batch. The last batch may be smaller.
+
+Returns:
+  Iterator[List[Tuple[date, str, str]]]: The batches of records.
+"""
+def iter_batches(records: Iterable[Tuple[date, str, str]], size: int) -> Iterator[List[Tuple[date, str, str]]]:
+  records = iter(records)
+  while batch := list(islice(records, size)):
+    yield batch
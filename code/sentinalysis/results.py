@@ -0,0 +1,186 @@
+from collections.abc import Mapping
+from datetime import date, timedelta
+from typing import Iterator, List, Tuple
+from array import array
+import numpy as np
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+"""
+Compact, array-backed result of sentiment_analysis().
+For every member, the raw compound scores are kept in a float array and the dates in an int32 array (days since 1970-01-01),
+which takes 8 to 12 bytes per message instead of a tuple, a float and a date object.
+
+Behaves like a read-only version of the dictionary returned by sentiment_analysis(): result[member] returns the list of
+(cumulative score, date) tuples. Those lists are built on demand, use scores(), cumulative() and dates() to get the numpy arrays instead.
+
+Args:
+  dtype (str): The dtype of the score arrays, "float64" or "float32". Cumulative sums are always computed in float64,
+  but only float64 scores give running totals identical to the ones of update_user_sentiment_score().
+  baseline (dict[str, float]): The running totals the cumulative scores start from, e.g. the ones of a checkpoint. Defaults to 0.
+"""
+class ColumnarSentiment(Mapping):
+  def __init__(self, dtype: str = "float64", baseline: dict[str, float] = None):
+    self.dtype = np.dtype(dtype)
+    if self.dtype not in (np.float64, np.float32):
+      raise ValueError(f"Unsupported score dtype: {dtype}")
+
+    self._typecode = "d" if self.dtype == np.float64 else "f"
+    self._scores = {}
+    self._days = {}
+    self.baseline = dict(baseline) if baseline else {}
+
+  """
+  Adds the raw compound score of a message at the end of a member's series.
+
+  Args:
+    name (str): The name of the person who sent the message.
+    score (float): The compound score of the message.
+    timestamp (date): The date of the message.
+
+  Returns:
+    None
+  """
+  def append(self, name: str, score: float, timestamp: date) -> None:
+    scores = self._scores.get(name)
+    if scores is None:
+      scores = self._scores[name] = array(self._typecode)
+      self._days[name] = array("i")
+
+    scores.append(score)
+    self._days[name].append(timestamp.toordinal() - _EPOCH_ORDINAL)
+
+  """
+  Adds the raw compound scores of several messages of a member at once.
+
+  Args:
+    name (str): The name of the person who sent the messages.
+    scores (List[float]): The compound scores of the messages.
+    timestamps (List[date]): The dates of the messages.
+
+  Returns:
+    None
+  """
+  def extend(self, name: str, scores: List[float], timestamps: List[date]) -> None:
+    if name not in self._scores:
+      self._scores[name] = array(self._typecode)
+      self._days[name] = array("i")
+
+    self._scores[name].extend(scores)
+    self._days[name].extend(timestamp.toordinal() - _EPOCH_ORDINAL for timestamp in timestamps)
+
+  """
+  Adds the raw compound scores of several messages of a member, with their dates already given as days since 1970-01-01.
+
+  Args:
+    name (str): The name of the person who sent the messages.
+    scores (np.ndarray): The compound scores of the messages.
+    days (np.ndarray): The days since 1970-01-01 of the messages.
+
+  Returns:
+    None
+  """
+  def extend_days(self, name: str, scores: np.ndarray, days: np.ndarray) -> None:
+    if name not in self._scores:
+      self._scores[name] = array(self._typecode)
+      self._days[name] = array("i")
+
+    self._scores[name].frombytes(np.ascontiguousarray(scores, dtype = self.dtype).tobytes())
+    self._days[name].frombytes(np.ascontiguousarray(days, dtype = np.int32).tobytes())
+
+  """
+  Returns the raw compound scores of a member.
+
+  Args:
+    name (str): The name of the member.
+
+  Returns:
+    np.ndarray: The compound score of every message, in the dtype of the result.
+  """
+  def scores(self, name: str) -> np.ndarray:
+    return np.frombuffer(self._scores[name], dtype = self.dtype)
+
+  """
+  Returns the running total of a member's compound scores, the same values update_user_sentiment_score() produces.
+
+  Args:
+    name (str): The name of the member.
+
+  Returns:
+    np.ndarray: The cumulative scores, as float64.
+  """
+  def cumulative(self, name: str) -> np.ndarray:
+    baseline = self.baseline.get(name)
+    if baseline is None:
+      return np.cumsum(self.scores(name), dtype = np.float64)
+
+    # Accumulating from the baseline keeps the additions in the same order as a run that never stopped
+    return np.cumsum(np.concatenate(([baseline], self.scores(name))), dtype = np.float64)[1:]
+
+  """
+  Returns the final running total of every member, including the baseline members without new messages.
+
+  Args:
+    None
+
+  Returns:
+    dict[str, float]: The last cumulative score of every member.
+  """
+  def totals(self) -> dict[str, float]:
+    totals = dict(self.baseline)
+    for name in self:
+      cumulative = self.cumulative(name)
+      if len(cumulative):
+        totals[name] = float(cumulative[-1])
+    return totals
+
+  """
+  Returns the dates of a member's messages.
+
+  Args:
+    name (str): The name of the member.
+
+  Returns:
+    np.ndarray: The dates, as datetime64[D].
+  """
+  def dates(self, name: str) -> np.ndarray:
+    return np.frombuffer(self._days[name], dtype = np.int32).astype("datetime64[D]")
+
+  def __getitem__(self, name: str) -> List[Tuple[float, date]]:
+    if name not in self._scores:
+      raise KeyError(name)
+
+    epoch = date(1970, 1, 1)
+    return [(score, epoch + timedelta(days = day)) for score, day in zip(self.cumulative(name).tolist(), self._days[name])]
+
+  def __iter__(self) -> Iterator[str]:
+    return iter(self._scores)
+
+  def __len__(self) -> int:
+    return len(self._scores)
+
+  """
+  Converts the result into the dictionary format returned by sentiment_analysis().
+
+  Args:
+    None
+
+  Returns:
+    dict[str, List[Tuple[float, date]]]: The cumulative score and date of every message, grouped by member.
+  """
+  def to_dict(self) -> dict[str, List[Tuple[float, date]]]:
+    return {name: self[name] for name in self}
+
+  """
+  Returns the total memory used by the score and date arrays.
+
+  Args:
+    None
+
+  Returns:
+    int: The size of the arrays in bytes.
+  """
+  @property
+  def nbytes(self) -> int:
+    return sum(len(scores) * scores.itemsize for scores in self._scores.values()) + \
+           sum(len(days) * days.itemsize for days in self._days.values())
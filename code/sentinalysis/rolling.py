@@ -0,0 +1,196 @@
+from .sinks import Sink
+from .aggregation import get_member_series
+from collections import deque
+from datetime import date
+from typing import List, Tuple
+from array import array
+import numpy as np
+
+# Messages in the rolling mean and variance
+DEFAULT_WINDOW = 50
+
+# Days in the time window of the windowed mean and the message rate
+DEFAULT_DAYS = 7
+
+# Span of the exponentially weighted moving average, in messages
+DEFAULT_SPAN = 20
+
+# Statistics kept for every message, besides its date
+COLUMNS = ("score", "cumulative", "mean", "variance", "window_mean", "rate", "ewma")
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+"""
+Online statistics of the scores of one member, updated in constant time per message.
+The mean and variance over the last messages slide with Welford's update, which stays accurate over millions of messages
+where subtracting running sums of squares would not. The time window drops its oldest messages as days go by,
+every message is dropped once, so its cost is constant per message as well.
+
+Args:
+  window (int): The number of messages in the rolling mean and variance.
+  days (int): The number of days in the windowed mean and the message rate, the day of the message included.
+  span (int): The span of the exponentially weighted moving average, in messages. Its weight is 2 / (span + 1).
+"""
+class RollingStatistics:
+  __slots__ = ("window", "days", "alpha", "_scores", "_mean", "_m2", "_timed", "_timed_sum", "_ewma")
+
+  def __init__(self, window: int = DEFAULT_WINDOW, days: int = DEFAULT_DAYS, span: int = DEFAULT_SPAN):
+    if window < 1 or days < 1 or span < 1:
+      raise ValueError("The window, days and span of rolling statistics must be at least 1.")
+
+    self.window = window
+    self.days = days
+    self.alpha = 2 / (span + 1)
+    self._scores = deque()
+    self._mean = 0.0
+    self._m2 = 0.0
+    self._timed = deque()
+    self._timed_sum = 0.0
+    self._ewma = None
+
+  """
+  Adds the score of the next message of the member.
+
+  Args:
+    day (int): The date of the message, in days since 1970-01-01. Messages are expected in chat order.
+    score (float): The compound score of the message.
+
+  Returns:
+    Tuple[float, float, float, float, float]: The rolling mean, rolling variance (population), windowed mean, message rate
+    (messages per day over the time window) and exponentially weighted moving average, after the message.
+  """
+  def update(self, day: int, score: float) -> Tuple[float, float, float, float, float]:
+    scores = self._scores
+    scores.append(score)
+    if len(scores) > self.window:
+      # The oldest score leaves the window as the new one enters it
+      oldest = scores.popleft()
+      mean = self._mean + (score - oldest) / self.window
+      self._m2 += (score - oldest) * (score - mean + oldest - self._mean)
+      self._mean = mean
+    else:
+      delta = score - self._mean
+      self._mean += delta / len(scores)
+      self._m2 += delta * (score - self._mean)
+
+    timed = self._timed
+    timed.append((day, score))
+    self._timed_sum += score
+    while timed[0][0] <= day - self.days:
+      self._timed_sum -= timed.popleft()[1]
+
+    self._ewma = score if self._ewma is None else self._ewma + self.alpha * (score - self._ewma)
+
+    return self._mean, max(self._m2 / len(scores), 0.0), self._timed_sum / len(timed), len(timed) / self.days, self._ewma
+
+"""
+Computes the rolling statistics of every member while the messages are scored, in the same pass as the cumulative score
+(see sentiment_analysis(sink = ...)). Every message keeps its date, score, cumulative score and statistics in compact arrays.
+
+  statistics = sentiment_analysis(validated_file, sink = RollingSink(window = 100, days = 30))
+  statistics["Alice"]["ewma"]
+
+Args:
+  window (int): The number of messages in the rolling mean and variance.
+  days (int): The number of days in the windowed mean and the message rate.
+  span (int): The span of the exponentially weighted moving average, in messages.
+"""
+class RollingSink(Sink):
+  def __init__(self, window: int = DEFAULT_WINDOW, days: int = DEFAULT_DAYS, span: int = DEFAULT_SPAN):
+    # Fails early on invalid parameters, before any message is scored
+    RollingStatistics(window, days, span)
+    self.window = window
+    self.days = days
+    self.span = span
+
+  def open(self, baseline: dict[str, float]) -> None:
+    super().open(baseline)
+    self._statistics = {}
+    self._columns = {}
+
+  """
+  Adds a message of a member.
+
+  Args:
+    name (str): The name of the member.
+    day (int): The date of the message, in days since 1970-01-01.
+    score (float): The compound score of the message.
+
+  Returns:
+    None
+  """
+  def add(self, name: str, day: int, score: float) -> None:
+    statistics = self._statistics.get(name)
+    if statistics is None:
+      statistics = self._statistics[name] = RollingStatistics(self.window, self.days, self.span)
+      self._columns[name] = {"date": array("i"), **{column: array("d") for column in COLUMNS}}
+
+    columns = self._columns[name]
+    total = self._totals[name] = self._totals.get(name, 0.0) + score
+    mean, variance, window_mean, rate, ewma = statistics.update(day, score)
+
+    columns["date"].append(day)
+    columns["score"].append(score)
+    columns["cumulative"].append(total)
+    columns["mean"].append(mean)
+    columns["variance"].append(variance)
+    columns["window_mean"].append(window_mean)
+    columns["rate"].append(rate)
+    columns["ewma"].append(ewma)
+
+  def write(self, batch: List[Tuple[date, str, str]], scores: List[float]) -> None:
+    days = {}
+    for (timestamp, name, _), score in zip(batch, scores):
+      # Messages of the same day share a date, so it is converted once per day
+      day = days.get(timestamp)
+      if day is None:
+        day = days[timestamp] = timestamp.toordinal() - _EPOCH_ORDINAL
+      self.add(name, day, score)
+
+  """
+  Returns the statistics of every member.
+
+  Args:
+    None
+
+  Returns:
+    dict[str, dict[str, np.ndarray]]: The arrays "date" (datetime64[D]), "score", "cumulative", "mean", "variance", "window_mean",
+    "rate" and "ewma" of every member, with one entry per message in chat order.
+  """
+  def close(self) -> dict[str, dict[str, np.ndarray]]:
+    statistics = {}
+    for name, columns in self._columns.items():
+      statistics[name] = {column: np.frombuffer(values, dtype = np.float64) for column, values in columns.items() if column != "date"}
+      statistics[name]["date"] = np.frombuffer(columns["date"], dtype = np.int32).astype("datetime64[D]")
+
+    return statistics
+
+"""
+Computes the rolling statistics of a result that was already scored, e.g. one loaded from a file or read from a MessageStore (see MessageStore.sentiment()),
+without scoring its messages again. Analyses that still have to run should pass a RollingSink to sentiment_analysis() instead.
+
+Args:
+  sentiment_dictionary (dict): A dictionary of all chat members and their sentiment scores, or a ColumnarSentiment.
+  window (int): The number of messages in the rolling mean and variance.
+  days (int): The number of days in the windowed mean and the message rate.
+  span (int): The span of the exponentially weighted moving average, in messages.
+  baseline (dict[str, float]): The cumulative score of every member of a dictionary before its first point (see aggregation.get_member_series()).
+
+Returns:
+  dict[str, dict[str, np.ndarray]]: The statistics of every member (see RollingSink.close()).
+"""
+def rolling_statistics(sentiment_dictionary: dict,
+                       window: int = DEFAULT_WINDOW,
+                       days: int = DEFAULT_DAYS,
+                       span: int = DEFAULT_SPAN,
+                       baseline: dict[str, float] = None) -> dict[str, dict[str, np.ndarray]]:
+  baseline = baseline or {}
+  series = {name: get_member_series(sentiment_dictionary, name, baseline.get(name, 0.0)) for name in sentiment_dictionary}
+
+  sink = RollingSink(window, days, span)
+  sink.open({name: baseline for name, (_, _, baseline) in series.items()})
+  for name, (dates, scores, _) in series.items():
+    for day, score in zip(dates.astype(np.int64).tolist(), scores.tolist()):
+      sink.add(name, day, score)
+
+  return sink.close()
@@ -1,10 +1,18 @@
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from .parsers import get_txt, get_json, get_csv
+from .vader_engine import SnapshotSentimentIntensityAnalyzer as SentimentIntensityAnalyzer
+from .readers import iter_records, iter_batches, SUPPORTED_EXTENSIONS
+from .cache import ScoreCache, MemoizedAnalyzer, score_with_cache, CACHE_BATCH_SIZE
+from .vader_engine import get_compound_scores
+from .scorers import Scorer, get_scorer, get_scorer_class, get_score_version, get_analyzer_scorer
+from .results import ColumnarSentiment
+from .columns import ChatColumns, COLUMNS_EXTENSION
+from .checkpoint import Checkpoint
+from .sinks import Sink, DictSink, ColumnarSink
 from .utils import check_vader_lexicon
+from .instrumentation import record_stage, current_stage, iter_timed
 from collections import defaultdict
 from datetime import date
-from typing import Tuple, List
-import ijson
+from typing import Iterable, Iterator, Tuple, List, Union
+import numpy as np
 import os
 
 """
@@ -30,46 +38,304 @@ def update_user_sentiment_score(analyzer: SentimentIntensityAnalyzer,
                                 timestamp: date) -> None:
   
   score = analyzer.polarity_scores(msg)["compound"]
+  append_user_sentiment_score(score, members_sentiment, members_sentiment_cache, name, timestamp)
+
+"""
+Adds an already computed compound score to the running total of a group chat member.
+
+Args:
+  score (float): The compound score of the message.
+  members_sentiment (dict[str, List[Tuple]]): The dictionary that contains sentiment scores for individual group chat members.
+  members_sentiment_cache (dict[str, int]): The dictionary that acts as cache for the last sentiment score of each group chat member.
+  name (str): The name of the person whose sentiment score is affected.
+  timestamp (date): The date of the message.
+
+Returns:
+  None
+"""
+def append_user_sentiment_score(score: float,
+                                members_sentiment: dict[str, List[Tuple]],
+                                members_sentiment_cache: dict[str, int],
+                                name: str,
+                                timestamp: date) -> None:
 
   new_sentiment_value = members_sentiment_cache.get(name, 0.0) + score
 
   members_sentiment[name].append((new_sentiment_value, timestamp))
   members_sentiment_cache[name] = new_sentiment_value
 
+"""
+Loads a checkpoint and checks whether the file continues the content it was created from.
+
+Args:
+  checkpointPath (str): The path to the checkpoint file. It does not have to exist.
+  filePath (str): The path to the file that is about to be analyzed.
+  version (str): The version of the scores of the analysis (see scorers.get_score_version()). A checkpoint of other scores is not resumed.
+
+Returns:
+  Tuple[int, dict[str, float], List[int]]: The offset to resume from (0 to start over), the running totals to continue from,
+  and a single-element list with the number of messages analyzed so far, to be updated by count_records().
+"""
+def resume_from_checkpoint(checkpointPath: str, filePath: str, version: str = None) -> Tuple[int, dict[str, float], List[int]]:
+  checkpoint = Checkpoint.load(checkpointPath)
+  start = checkpoint.get_resume_offset(filePath, version) if checkpoint is not None else 0
+
+  if start == 0:
+    return 0, {}, [0]
+
+  return start, dict(checkpoint.members_sentiment_cache), [checkpoint.message_count]
+
+"""
+Passes records through unchanged while counting them.
+
+Args:
+  records (Iterable[Tuple[date, str, str]]): The records to be counted.
+  counter (List[int]): A single-element list whose value is incremented for every record.
+
+Returns:
+  Iterator[Tuple[date, str, str]]: The records.
+"""
+def count_records(records: Iterable[Tuple[date, str, str]], counter: List[int]) -> Iterator[Tuple[date, str, str]]:
+  for record in records:
+    counter[0] += 1
+    yield record
+
+"""
+Calculates the sentiment scores of a stream of already parsed messages.
+The messages are scored in batches and handed to the sink, so only one batch is held in memory besides what the sink keeps.
+
+Args:
+  records (Iterable[Tuple[date, str, str]]): The timestamp, sender, and message content of every message, in chat order.
+  cachePath (str): The path to a persistent score cache, or None.
+  analyzer (MemoizedAnalyzer): The analyzer used to score messages, or None for the default one of the engine.
+  columnar (bool): Returns a ColumnarSentiment instead of a dictionary.
+  engine (Union[str, Scorer]): The scoring backend used when no analyzer is provided (see scorers.get_scorer()).
+  members_sentiment_cache (dict[str, float]): The running totals to start from, e.g. the ones of a checkpoint.
+  The dictionary is updated with the final running totals.
+  collected_scores (List[float]): Receives the raw compound score of every message, in chat order. Optional.
+  sink (Sink): Receives the scored messages instead of the default DictSink or ColumnarSink (see sinks), e.g. to aggregate them
+  without keeping every point. columnar is ignored if provided.
+
+Returns:
+  dict: A dictionary of all chat members and their sentiment scores, or the result of the sink.
+"""
+def analyze_records(records: Iterable[Tuple[date, str, str]],
+                    cachePath: str = None,
+                    analyzer: MemoizedAnalyzer = None,
+                    columnar: bool = False,
+                    engine: Union[str, Scorer] = "nltk",
+                    members_sentiment_cache: dict[str, float] = None,
+                    collected_scores: List[float] = None,
+                    sink: Sink = None) -> dict:
+  if analyzer is None:
+    analyzer = MemoizedAnalyzer(get_scorer(engine))
+
+  if members_sentiment_cache is None:
+    members_sentiment_cache = {}
+
+  if sink is None:
+    sink = ColumnarSink() if columnar else DictSink()
+  sink.open(members_sentiment_cache)
+
+  cache = ScoreCache(cachePath, version = get_score_version(analyzer = analyzer)) if cachePath is not None else None
+  stage = current_stage()
+
+  # Backends that prefer larger batches get them, smaller ones are split by get_compound_scores()
+  scorer = get_analyzer_scorer(analyzer)
+  batch_size = max(CACHE_BATCH_SIZE, scorer.batch_size) if scorer is not None else CACHE_BATCH_SIZE
+
+  try:
+    for batch in iter_timed(iter_batches(records, batch_size), "parsing"):
+      msgs = [msg for _, _, msg in batch]
+
+      with record_stage("scoring") as scoring:
+        hits, misses = getattr(analyzer, "hits", 0), getattr(analyzer, "misses", 0)
+        cache_hits, cache_misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+
+        if cache is not None:
+          scores, new_scores = score_with_cache(analyzer, msgs, cache)
+          cache.put_many(new_scores)
+          scoring.add_cache("score_cache", cache.hits - cache_hits, cache.misses - cache_misses)
+        else:
+          scores = get_compound_scores(analyzer, msgs)
+
+        scoring.add_cache("memo", getattr(analyzer, "hits", 0) - hits, getattr(analyzer, "misses", 0) - misses)
+        scoring.add(len(batch))
+      stage.add(len(batch))
+
+      if collected_scores is not None:
+        collected_scores.extend(scores)
+
+      sink.write(batch, scores)
+  except BaseException:
+    sink.abort()
+    raise
+  finally:
+    if cache is not None:
+      cache.close()
+
+  members_sentiment_cache.update(sink.totals())
+  return sink.close()
+
+"""
+Builds the result of sentiment_analysis() from compound scores that were saved in a columns directory, without reading a single message.
+
+Args:
+  chat (ChatColumns): The columns of the chat.
+  scores (np.ndarray): The compound score of every message, in row order.
+  columnar (bool): Returns a ColumnarSentiment instead of a dictionary.
+
+Returns:
+  dict: A dictionary of all chat members and their sentiment scores.
+"""
+def sentiment_from_scores(chat: ChatColumns, scores: np.ndarray, columnar: bool = False) -> dict:
+  current_stage().add(len(scores))
+  days = chat.days()
+  codes = np.asarray(chat.sender_codes)
+
+  if columnar:
+    result = ColumnarSentiment()
+    # Senders are numbered in order of appearance, which keeps the member order of a regular run
+    for code, name in enumerate(chat.senders):
+      rows = codes == code
+      result.extend_days(name, scores[rows], days[rows])
+    return result
+
+  result, members_sentiment_cache, dates = defaultdict(list), {}, {}
+  for score, day, code in zip(scores.tolist(), days.tolist(), codes.tolist()):
+    timestamp = dates.get(day)
+    if timestamp is None:
+      timestamp = dates[day] = date.fromordinal(day + date(1970, 1, 1).toordinal())
+    append_user_sentiment_score(score, result, members_sentiment_cache, chat.senders[code], timestamp)
+
+  return result
+
+"""
+Analyzes a columns directory written by convert_txt_to_columns(). If the directory holds scores of the current VADER lexicon,
+or of the same backend, and no analyzer is provided, they are used as they are. Otherwise the messages are scored, and with the default analyzer of a serial run
+the scores are saved in the directory for the next analysis.
+
+Args:
+  filePath (str): The path to the columns directory.
+  workers (int): The number of worker processes.
+  cachePath (str): The path to a persistent score cache, or None.
+  analyzer (MemoizedAnalyzer): The analyzer used to score messages, or None for the default one of the engine.
+  columnar (bool): Returns a ColumnarSentiment instead of a dictionary.
+  engine (Union[str, Scorer]): The scoring backend used when no analyzer is provided (see scorers.get_scorer()).
+  sink (Sink): Receives the scored messages instead of the default result (see analyze_records()).
+
+Returns:
+  dict: A dictionary of all chat members and their sentiment scores, or the result of the sink.
+"""
+def analyze_columns(filePath: str,
+                    workers: int = 1,
+                    cachePath: str = None,
+                    analyzer: MemoizedAnalyzer = None,
+                    columnar: bool = False,
+                    engine: Union[str, Scorer] = "nltk",
+                    sink: Sink = None) -> dict:
+  with ChatColumns(filePath) as chat:
+    version = get_score_version(engine, analyzer)
+    scores = chat.get_scores(version) if analyzer is None else None
+    if scores is not None and sink is None:
+      return sentiment_from_scores(chat, scores, columnar)
+
+    if scores is not None:
+      # The saved scores are streamed to the sink in the batches of a regular analysis
+      sink.open({})
+      offset = 0
+      try:
+        for batch in iter_batches(chat.iter_records(), CACHE_BATCH_SIZE):
+          sink.write(batch, scores[offset:offset + len(batch)].tolist())
+          offset += len(batch)
+      except BaseException:
+        sink.abort()
+        raise
+      current_stage().add(offset)
+      return sink.close()
+
+    if workers > 1:
+      from .parallel import parallel_sentiment_analysis
+      return parallel_sentiment_analysis(filePath, workers, cachePath, analyzer, columnar, engine)
+
+    collected_scores = []
+    result = analyze_records(chat.iter_records(), cachePath, analyzer, columnar, engine, collected_scores = collected_scores, sink = sink)
+    if analyzer is None:
+      chat.save_scores(collected_scores, version)
+
+  return result
+
 """
 Analyzes all messages in a file to calculate sentiment scores.
-Currently supports: .txt, .json, .csv
+Currently supports: .txt, .json, .jsonl, .csv and columns directories written by convert_txt_to_columns()
 
 Args:
   filePath (str): The path to the file.
+  workers (int): The number of worker processes. With more than one worker, the file is split into shards
+  that are scored in parallel. The result is identical to the one of a serial run.
+  cachePath (str): The path to a persistent score cache (see cache.ScoreCache). Messages that were scored in a previous run
+  are read from the cache instead of being scored again. The cache is not used if no path is provided.
+  analyzer (MemoizedAnalyzer): The analyzer used to score messages. Defaults to VADER wrapped in a MemoizedAnalyzer,
+  pass your own to configure the memo size or to read its hit/miss counters afterwards. In workers mode, every worker builds
+  its own memoized VADER analyzer with the same limits and the worker counters are added to this one.
+  columnar (bool): Returns a ColumnarSentiment with numpy arrays per member instead of lists of tuples.
+  It can be used everywhere the dictionary can, but needs a fraction of its memory.
+  engine (Union[str, Scorer]): The scoring backend used when no analyzer is provided, the name of a registered backend or a Scorer
+  (see scorers). "nltk" uses nltk's SentimentIntensityAnalyzer, "batch" uses VaderBatchScorer, which returns the same compound scores
+  several times faster, and "linear:<model>" a HashedLinearScorer trained to approximate VADER, faster still.
+  Backends that are not process safe are refused in workers mode.
+  checkpointPath (str): The path to a checkpoint (see checkpoint.Checkpoint), .txt, .csv and .jsonl files only. If the file continues the one
+  the checkpoint was saved for, only the appended messages are analyzed and the result only contains them, with running totals
+  that continue from the checkpoint. Otherwise the whole file is analyzed. The checkpoint is updated afterwards.
+  sink (Sink): Streams the scored messages to a sink instead of keeping every point (see sinks), e.g. a BucketSink
+  for daily aggregates in constant memory, a FileSink, a CallbackSink, or several of them in a MultiSink. Not supported in workers mode.
 
 Returns:
-  dict: A dictionary of all chat members and their sentiment scores.
+  dict: A dictionary of all chat members and their sentiment scores, or the result of the sink.
 """
-def sentiment_analysis(filePath: str) -> dict:
-  fileExtension = os.path.splitext(filePath)[1].lower()
-  members_sentiment = defaultdict(list)
-  members_sentiment_cache = {}
-  check_vader_lexicon()
-  analyzer = SentimentIntensityAnalyzer()
-
-  if fileExtension == ".csv":
-    with open(filePath, "r", encoding = "utf-8") as f:
-      next(f)
-      for line in f:
-        timestamp, msg_sender, msg = get_csv(line)
-        update_user_sentiment_score(analyzer, msg, members_sentiment, members_sentiment_cache, msg_sender, timestamp)
-  elif fileExtension == ".json":
-    with open(filePath, "rb") as f:
-      for obj in ijson.items(f, "item"):
-        timestamp, msg_sender, msg = get_json(obj)
-        update_user_sentiment_score(analyzer, msg, members_sentiment, members_sentiment_cache, msg_sender, timestamp)
-  elif fileExtension == ".txt":
-    with open(filePath, "r", encoding = "utf-8") as f:
-      for line in f:
-        timestamp, msg_sender, msg = get_txt(line)
-        update_user_sentiment_score(analyzer, msg, members_sentiment, members_sentiment_cache, msg_sender, timestamp)
-  else:
+def sentiment_analysis(filePath: str,
+                       workers: int = 1,
+                       cachePath: str = None,
+                       analyzer: MemoizedAnalyzer = None,
+                       columnar: bool = False,
+                       engine: Union[str, Scorer] = "nltk",
+                       checkpointPath: str = None,
+                       sink: Sink = None) -> dict:
+  fileExtension = os.path.splitext(os.path.normpath(filePath))[1].lower()
+  if fileExtension not in SUPPORTED_EXTENSIONS:
     raise ValueError(f"Unsupported file extension: {fileExtension}")
 
-  return members_sentiment
\ No newline at end of file
+  scorer_class = get_scorer_class(engine)
+  if workers > 1 and not scorer_class.process_safe:
+    raise ValueError(f"The {scorer_class.name} scorer cannot run in worker processes.")
+
+  if checkpointPath is not None and fileExtension not in (".txt", ".csv", ".jsonl"):
+    raise ValueError("Checkpoints are only supported for .txt, .csv and .jsonl files.")
+  if checkpointPath is not None and workers > 1:
+    raise ValueError("Checkpoints are not supported in workers mode.")
+  if sink is not None and workers > 1:
+    raise ValueError("Sinks are not supported in workers mode.")
+
+  check_vader_lexicon()
+  # The backend is created once for the whole analysis
+  engine = get_scorer(engine)
+
+  with record_stage("sentiment"):
+    if fileExtension == COLUMNS_EXTENSION:
+      return analyze_columns(filePath, workers, cachePath, analyzer, columnar, engine, sink)
+
+    if workers > 1:
+      from .parallel import parallel_sentiment_analysis
+      return parallel_sentiment_analysis(filePath, workers, cachePath, analyzer, columnar, engine)
+
+    if checkpointPath is None:
+      return analyze_records(iter_records(filePath), cachePath, analyzer, columnar, engine, sink = sink)
+
+    version = get_score_version(engine, analyzer)
+    start, members_sentiment_cache, message_count = resume_from_checkpoint(checkpointPath, filePath, version)
+    records = count_records(iter_records(filePath, start = start or None), message_count)
+    result = analyze_records(records, cachePath, analyzer, columnar, engine, members_sentiment_cache, sink = sink)
+
+    Checkpoint.create(filePath, members_sentiment_cache, message_count[0], version).save(checkpointPath)
+
+    return result
\ No newline at end of file
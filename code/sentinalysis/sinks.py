@@ -0,0 +1,294 @@
+from .results import ColumnarSentiment
+from .aggregation import FREQUENCIES
+from collections import defaultdict
+from datetime import date
+from abc import ABC, abstractmethod
+from typing import Any, Callable, List, Tuple
+import numpy as np
+import csv
+import os
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+"""
+Receives the scored messages of an analysis, batch by batch and in chat order (see sentiment.analyze_records()).
+A sink decides what is kept: every point, aggregates, or nothing at all, which bounds the memory of an analysis by the sink instead of the chat.
+Subclasses implement write(), a subclass without it cannot be created, and return their result from close(). An analysis that fails calls abort() instead of close().
+"""
+class Sink(ABC):
+  """
+  Starts a new analysis.
+
+  Args:
+    baseline (dict[str, float]): The running totals to continue from, e.g. the ones of a checkpoint.
+
+  Returns:
+    None
+  """
+  def open(self, baseline: dict[str, float]) -> None:
+    self._totals = dict(baseline)
+
+  """
+  Receives a batch of scored messages.
+
+  Args:
+    batch (List[Tuple[date, str, str]]): The timestamp, sender and content of every message.
+    scores (List[float]): The compound score of every message.
+
+  Returns:
+    None
+  """
+  @abstractmethod
+  def write(self, batch: List[Tuple[date, str, str]], scores: List[float]) -> None:
+    pass
+
+  """
+  Returns the running total of every member after the messages written so far, which checkpoints are saved with.
+
+  Args:
+    None
+
+  Returns:
+    dict[str, float]: The running totals.
+  """
+  def totals(self) -> dict[str, float]:
+    return dict(self._totals)
+
+  """
+  Ends the analysis.
+
+  Args:
+    None
+
+  Returns:
+    Any: The result of the sink, returned by sentiment_analysis().
+  """
+  def close(self) -> Any:
+    return None
+
+  """
+  Ends an analysis that failed, e.g. on a malformed line. Sinks that hold resources release them, and discard partial output.
+
+  Args:
+    None
+
+  Returns:
+    None
+  """
+  def abort(self) -> None:
+    pass
+
+  """
+  Adds the scores of a batch to the running totals.
+
+  Args:
+    batch (List[Tuple[date, str, str]]): The timestamp, sender and content of every message.
+    scores (List[float]): The compound score of every message.
+
+  Returns:
+    None
+  """
+  def _add_totals(self, batch: List[Tuple[date, str, str]], scores: List[float]) -> None:
+    totals = self._totals
+    for (_, name, _), score in zip(batch, scores):
+      totals[name] = totals.get(name, 0.0) + score
+
+"""
+Keeps every point in the dictionary that sentiment_analysis() has always returned:
+member -> list of (cumulative score, date) tuples.
+"""
+class DictSink(Sink):
+  def open(self, baseline: dict[str, float]) -> None:
+    super().open(baseline)
+    self.result = defaultdict(list)
+
+  def write(self, batch: List[Tuple[date, str, str]], scores: List[float]) -> None:
+    result, totals = self.result, self._totals
+    for (timestamp, name, _), score in zip(batch, scores):
+      total = totals[name] = totals.get(name, 0.0) + score
+      result[name].append((total, timestamp))
+
+  def close(self) -> dict:
+    return self.result
+
+"""
+Keeps every point in a ColumnarSentiment, the result of sentiment_analysis(columnar = True).
+
+Args:
+  dtype (str): The dtype of the score arrays, "float64" or "float32".
+"""
+class ColumnarSink(Sink):
+  def __init__(self, dtype: str = "float64"):
+    self.dtype = dtype
+
+  def open(self, baseline: dict[str, float]) -> None:
+    self.result = ColumnarSentiment(self.dtype, baseline)
+
+  def write(self, batch: List[Tuple[date, str, str]], scores: List[float]) -> None:
+    append = self.result.append
+    for (timestamp, name, _), score in zip(batch, scores):
+      append(name, score, timestamp)
+
+  def totals(self) -> dict[str, float]:
+    return self.result.totals()
+
+  def close(self) -> ColumnarSentiment:
+    return self.result
+
+"""
+Aggregates the messages of every member into time buckets while they are scored, and keeps nothing else.
+Memory is bounded by the number of members times the number of buckets, whatever the number of messages.
+The result has the shape of aggregation.aggregate_sentiment(): a candlestick of the cumulative score of every member per bucket,
+and can be rendered with plotting.render_candlesticks().
+Like aggregation.resample_ohlc(), a message dated before the bucket of the previous one, e.g. from a phone whose clock was off,
+counts in its own bucket and shifts the candlesticks of the later buckets.
+
+Args:
+  freq (str): The bucket size: "D" for days, "W" for weeks starting on Monday, "M" for calendar months.
+"""
+class BucketSink(Sink):
+  def __init__(self, freq: str = "D"):
+    if freq not in FREQUENCIES:
+      raise ValueError(f"Unsupported frequency: {freq}")
+    self.freq = freq
+
+  def open(self, baseline: dict[str, float]) -> None:
+    super().open(baseline)
+    self._baseline = dict(baseline)
+    # Every bucket is [high, low, count, sum], keyed by the first day of the bucket. High and low are relative to the open of the bucket,
+    # which is only known in close(), once every earlier bucket is complete
+    self._buckets = defaultdict(dict)
+    self._bucket_starts = {}
+
+  """
+  Returns the first day of the bucket of a date, in days since 1970-01-01.
+
+  Args:
+    timestamp (date): The date of a message.
+
+  Returns:
+    int: The first day of the bucket.
+  """
+  def _get_bucket_start(self, timestamp: date) -> int:
+    if self.freq == "W":
+      timestamp = date.fromordinal(timestamp.toordinal() - timestamp.weekday())
+    elif self.freq == "M":
+      timestamp = timestamp.replace(day = 1)
+    return timestamp.toordinal() - _EPOCH_ORDINAL
+
+  def write(self, batch: List[Tuple[date, str, str]], scores: List[float]) -> None:
+    totals, buckets, bucket_starts = self._totals, self._buckets, self._bucket_starts
+    for (timestamp, name, _), score in zip(batch, scores):
+      # Messages of the same day share a date, so buckets are looked up once per day
+      start = bucket_starts.get(timestamp)
+      if start is None:
+        start = bucket_starts[timestamp] = self._get_bucket_start(timestamp)
+
+      totals[name] = totals.get(name, 0.0) + score
+
+      bucket = buckets[name].get(start)
+      if bucket is None:
+        buckets[name][start] = [max(score, 0.0), min(score, 0.0), 1, score]
+      else:
+        change = bucket[3] = bucket[3] + score
+        if change > bucket[0]:
+          bucket[0] = change
+        elif change < bucket[1]:
+          bucket[1] = change
+        bucket[2] += 1
+
+  def close(self) -> dict[str, dict[str, np.ndarray]]:
+    candlesticks = {}
+    for name, buckets in self._buckets.items():
+      starts = sorted(buckets)
+      values = np.array([buckets[start] for start in starts], dtype = np.float64).reshape(-1, 4)
+      closes = self._baseline.get(name, 0.0) + np.cumsum(values[:, 3])
+      opens = closes - values[:, 3]
+      candlesticks[name] = {
+        "date": np.array(starts, dtype = np.int64).astype("datetime64[D]"),
+        "open": opens,
+        "high": opens + values[:, 0],
+        "low": opens + values[:, 1],
+        "close": closes,
+        "count": values[:, 2].astype(np.int64),
+        "mean": values[:, 3] / values[:, 2],
+      }
+
+    return candlesticks
+
+"""
+Writes every scored message to a CSV file as it is scored, with the columns Date, Username, Score and Cumulative.
+Nothing is kept in memory, the file can be read again with pandas or numpy.
+
+Args:
+  outputPath (str): The path of the CSV file.
+"""
+class FileSink(Sink):
+  def __init__(self, outputPath: str):
+    self.outputPath = outputPath
+
+  def open(self, baseline: dict[str, float]) -> None:
+    super().open(baseline)
+    self._file = open(self.outputPath, "w", encoding = "utf-8", newline = "")
+    self._writer = csv.writer(self._file)
+    self._writer.writerow(["Date", "Username", "Score", "Cumulative"])
+
+  def write(self, batch: List[Tuple[date, str, str]], scores: List[float]) -> None:
+    totals, rows = self._totals, []
+    for (timestamp, name, _), score in zip(batch, scores):
+      total = totals[name] = totals.get(name, 0.0) + score
+      rows.append((timestamp, name, score, total))
+    self._writer.writerows(rows)
+
+  def close(self) -> str:
+    self._file.close()
+    return self.outputPath
+
+  def abort(self) -> None:
+    # A truncated file would look like a complete result
+    self._file.close()
+    os.remove(self.outputPath)
+
+"""
+Calls a function with every batch of scored messages, e.g. to feed them to another system.
+
+Args:
+  callback (Callable): Called with the batch of (timestamp, sender, message) records and their compound scores.
+"""
+class CallbackSink(Sink):
+  def __init__(self, callback: Callable):
+    self.callback = callback
+
+  def write(self, batch: List[Tuple[date, str, str]], scores: List[float]) -> None:
+    self._add_totals(batch, scores)
+    self.callback(batch, scores)
+
+"""
+Sends the scored messages to several sinks at once, e.g. buckets for a chart and a file for later analysis.
+
+Args:
+  sinks (List[Sink]): The sinks.
+"""
+class MultiSink(Sink):
+  def __init__(self, sinks: List[Sink]):
+    if not sinks:
+      raise ValueError("MultiSink needs at least one sink.")
+    self.sinks = list(sinks)
+
+  def open(self, baseline: dict[str, float]) -> None:
+    for sink in self.sinks:
+      sink.open(baseline)
+
+  def write(self, batch: List[Tuple[date, str, str]], scores: List[float]) -> None:
+    for sink in self.sinks:
+      sink.write(batch, scores)
+
+  def totals(self) -> dict[str, float]:
+    return self.sinks[0].totals()
+
+  def close(self) -> List[Any]:
+    return [sink.close() for sink in self.sinks]
+
+  def abort(self) -> None:
+    for sink in self.sinks:
+      sink.abort()
@@ -0,0 +1,376 @@
+from .results import ColumnarSentiment
+from .aggregation import resample_ohlc
+from .scorers import Scorer
+from typing import Iterable, List, Tuple, Union
+from datetime import date, datetime
+import numpy as np
+import sqlite3
+import os
+
+# Messages inserted with a single executemany() call
+INSERT_BATCH_SIZE = 4096
+
+# Formats whose messages can be ingested from an offset, i.e. the ones checkpoints support
+RESUMABLE_EXTENSIONS = (".txt", ".csv", ".jsonl")
+
+# The running total of a member before a range. MAX(id) finds the last message before it in chat order without
+# sorting the messages of the member, which ORDER BY id does once ANALYZE has run on the store
+BASELINE_QUERY = "SELECT cumulative FROM messages WHERE id = (SELECT MAX(id) FROM messages WHERE sender = ? AND timestamp < ?)"
+
+"""
+Converts a bound of a time range to minutes since 1970-01-01.
+
+Args:
+  value (Union[str, date, datetime, np.datetime64]): The bound, e.g. "2023-03-01", a date or a datetime. None for an open range.
+
+Returns:
+  int: The minutes since 1970-01-01, or None.
+"""
+def to_minutes(value: Union[str, date, datetime, np.datetime64]) -> int:
+  if value is None:
+    return None
+  return int(np.datetime64(value, "m").astype(np.int64))
+
+"""
+Persistent store of the messages of a chat and their compound scores, in an SQLite database.
+Messages are indexed by (sender, timestamp) and every row keeps the running total of its sender,
+so the series or aggregates of any member over any time range are read from the index without rescanning or rescoring the export.
+The store also keeps the version of its scores and a checkpoint of the ingested export (see ingest()),
+so ingesting a re-exported chat only adds its new messages.
+
+  with MessageStore("chat.db") as store:
+    store.ingest("validated-chat.txt")
+    may = store.sentiment(start = "2023-03-01", end = "2023-06-01", members = ["Alice"])
+
+Args:
+  storePath (str): The path to the SQLite database. It is created if it does not exist.
+  read_only (bool): Opens the store without ever writing to it.
+"""
+class MessageStore:
+  def __init__(self, storePath: str, read_only: bool = False):
+    self.storePath = storePath
+    self.read_only = read_only
+
+    if read_only:
+      self.connection = sqlite3.connect(f"file:{storePath}?mode=ro", uri = True)
+      return
+
+    self.connection = sqlite3.connect(storePath)
+    self.connection.execute("PRAGMA journal_mode=WAL")
+    self.connection.execute("PRAGMA synchronous=NORMAL")
+    self.connection.execute("CREATE TABLE IF NOT EXISTS senders (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    self.connection.execute("CREATE TABLE IF NOT EXISTS messages (id INTEGER PRIMARY KEY, sender INTEGER NOT NULL, timestamp INTEGER NOT NULL, "
+                            "score REAL NOT NULL, cumulative REAL NOT NULL, message TEXT NOT NULL)")
+    # Covers the series queries, which never have to read the rows of the table
+    self.connection.execute("CREATE INDEX IF NOT EXISTS messages_sender_timestamp ON messages (sender, timestamp, id, score, cumulative)")
+    self.connection.execute("CREATE INDEX IF NOT EXISTS messages_timestamp ON messages (timestamp)")
+    # Lets the baseline of a range be the last message before it in chat order without sorting the messages of the member
+    self.connection.execute("CREATE INDEX IF NOT EXISTS messages_sender_id ON messages (sender, id, timestamp, cumulative)")
+    self.connection.execute("CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+    self.connection.commit()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+  """
+  Returns the id of every sender, in order of their first message.
+
+  Args:
+    None
+
+  Returns:
+    dict[str, int]: The id of every sender by name.
+  """
+  def get_senders(self) -> dict[str, int]:
+    return dict(self.connection.execute("SELECT name, id FROM senders ORDER BY id"))
+
+  """
+  Returns the running total of every sender after the last stored message.
+
+  Args:
+    None
+
+  Returns:
+    dict[int, float]: The running total of every sender by id.
+  """
+  def get_totals(self) -> dict[int, float]:
+    return dict(self.connection.execute(
+      "SELECT sender, cumulative FROM messages WHERE id IN (SELECT MAX(id) FROM messages GROUP BY sender)"))
+
+  """
+  Returns a value of the metadata table.
+
+  Args:
+    key (str): The key, "score_version" or "checkpoint".
+
+  Returns:
+    Union[str, bytes]: The value, or None if it was never set.
+  """
+  def get_metadata(self, key: str) -> Union[str, bytes]:
+    row = self.connection.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+  """
+  Sets a value of the metadata table, within the current transaction.
+
+  Args:
+    key (str): The key.
+    value (Union[str, bytes]): The value.
+
+  Returns:
+    None
+  """
+  def set_metadata(self, key: str, value: Union[str, bytes]) -> None:
+    self.connection.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (key, value))
+
+  """
+  Adds scored messages at the end of the store. Every sender's running total continues from the messages already stored,
+  so a chat can be added in several parts. Nothing records which messages were added, ingest() does that for exports.
+
+  Args:
+    records (Iterable[Tuple[int, str, str, float]]): The timestamp in minutes since 1970-01-01, sender, message and compound score
+    of every message, in chat order.
+
+  Returns:
+    int: The number of added messages.
+  """
+  def add_messages(self, records: Iterable[Tuple[int, str, str, float]]) -> int:
+    with self.connection:
+      return self._insert_messages(records)
+
+  """
+  Inserts scored messages within the current transaction (see add_messages()).
+
+  Args:
+    records (Iterable[Tuple[int, str, str, float]]): The timestamp, sender, message and compound score of every message, in chat order.
+
+  Returns:
+    int: The number of inserted messages.
+  """
+  def _insert_messages(self, records: Iterable[Tuple[int, str, str, float]]) -> int:
+    senders, totals = self.get_senders(), self.get_totals()
+
+    count, rows = 0, []
+    for timestamp, name, msg, score in records:
+      sender = senders.get(name)
+      if sender is None:
+        sender = senders[name] = self.connection.execute("INSERT INTO senders (name) VALUES (?)", (name,)).lastrowid
+
+      total = totals[sender] = totals.get(sender, 0.0) + score
+      rows.append((sender, timestamp, score, total, msg))
+
+      if len(rows) == INSERT_BATCH_SIZE:
+        self.connection.executemany("INSERT INTO messages (sender, timestamp, score, cumulative, message) VALUES (?, ?, ?, ?, ?)", rows)
+        count, rows = count + len(rows), []
+
+    self.connection.executemany("INSERT INTO messages (sender, timestamp, score, cumulative, message) VALUES (?, ?, ?, ?, ?)", rows)
+
+    return count + len(rows)
+
+  """
+  Scores the messages of a validated or converted export and adds them to the store (see add_messages()).
+  The store keeps a checkpoint of the export (see checkpoint.Checkpoint), so ingesting it again, or a later export of the same chat,
+  only adds the messages appended since. The messages and the checkpoint are written in a single transaction.
+  Raises a ValueError if the store holds the scores of another backend or lexicon, or messages that the file does not continue.
+
+  Args:
+    filePath (str): The path to the file, in any format supported by sentiment_analysis(). Only .txt, .csv and .jsonl files
+    can be ingested into a store that already holds messages.
+    cachePath (str): The path to a persistent score cache (see cache.ScoreCache), or None.
+    engine (Union[str, Scorer]): The scoring backend (see sentiment_analysis()).
+
+  Returns:
+    int: The number of added messages.
+  """
+  def ingest(self, filePath: str, cachePath: str = None, engine: Union[str, Scorer] = "nltk") -> int:
+    from .readers import iter_records, iter_batches
+    from .vader_engine import get_compound_scores
+    from .scorers import get_scorer, get_score_version
+    from .cache import ScoreCache, MemoizedAnalyzer, score_with_cache, CACHE_BATCH_SIZE
+    from .checkpoint import Checkpoint
+    from .utils import get_lexicon_version
+
+    analyzer = MemoizedAnalyzer(get_scorer(engine))
+    version = get_score_version(analyzer = analyzer)
+    score_version = version or get_lexicon_version()
+
+    stored_version = self.get_metadata("score_version")
+    if stored_version is not None and stored_version != score_version:
+      raise ValueError(f"The store holds scores of version {stored_version}, not {score_version}.")
+
+    resumable = os.path.splitext(filePath)[1].lower() in RESUMABLE_EXTENSIONS
+    start = 0
+    if len(self):
+      checkpoint = self.get_metadata("checkpoint")
+      checkpoint = Checkpoint.loads(checkpoint) if checkpoint is not None and resumable else None
+      start = checkpoint.get_resume_offset(filePath, score_version) if checkpoint is not None else 0
+      if start == 0:
+        raise ValueError(f"{filePath} does not continue the messages of the store.")
+
+    cache = ScoreCache(cachePath, version = version) if cachePath is not None else None
+
+    def iter_scored():
+      for batch in iter_batches(iter_records(filePath, start = start or None, minutes = True), CACHE_BATCH_SIZE):
+        msgs = [msg for _, _, msg in batch]
+        if cache is not None:
+          scores, new_scores = score_with_cache(analyzer, msgs, cache)
+          cache.put_many(new_scores)
+        else:
+          scores = get_compound_scores(analyzer, msgs)
+
+        for (timestamp, name, msg), score in zip(batch, scores):
+          yield timestamp, name, msg, score
+
+    try:
+      with self.connection:
+        count = self._insert_messages(iter_scored())
+        self.set_metadata("score_version", score_version)
+        if resumable:
+          senders = {sender: name for name, sender in self.get_senders().items()}
+          totals = {senders[sender]: total for sender, total in self.get_totals().items()}
+          self.set_metadata("checkpoint", Checkpoint.create(filePath, totals, len(self), score_version).dumps())
+      return count
+    finally:
+      if cache is not None:
+        cache.close()
+
+  """
+  Returns the names of the members, in order of their first message.
+
+  Args:
+    None
+
+  Returns:
+    List[str]: The names of the members.
+  """
+  def members(self) -> List[str]:
+    return list(self.get_senders())
+
+  """
+  Returns the messages of a member within a time range, read from the (sender, timestamp) index.
+
+  Args:
+    member (str): The name of the member.
+    start (Union[str, date, datetime]): The start of the range, included. The range is open if not provided.
+    end (Union[str, date, datetime]): The end of the range, excluded. The range is open if not provided.
+
+  Returns:
+    dict[str, np.ndarray]: The "timestamp" (datetime64[m]), "score" and "cumulative" score of every message, in chat order,
+    and the "baseline", the running total of the member before the range.
+  """
+  def series(self, member: str, start = None, end = None) -> dict[str, np.ndarray]:
+    sender = self.get_senders().get(member)
+    if sender is None:
+      raise ValueError(f"Unknown member: {member}")
+
+    start, end = to_minutes(start), to_minutes(end)
+    condition, parameters = "sender = ?", [sender]
+    if start is not None:
+      condition, parameters = condition + " AND timestamp >= ?", parameters + [start]
+    if end is not None:
+      condition, parameters = condition + " AND timestamp < ?", parameters + [end]
+
+    rows = self.connection.execute(f"SELECT timestamp, score, cumulative FROM messages WHERE {condition} ORDER BY id", parameters).fetchall()
+    series = np.array(rows, dtype = np.float64).reshape(-1, 3)
+
+    baseline = 0.0
+    if start is not None:
+      row = self.connection.execute(BASELINE_QUERY, (sender, start)).fetchone()
+      baseline = row[0] if row else 0.0
+
+    return {
+      "timestamp": series[:, 0].astype(np.int64).astype("datetime64[m]"),
+      "score": series[:, 1],
+      "cumulative": series[:, 2],
+      "baseline": baseline,
+    }
+
+  """
+  Returns the result of sentiment_analysis() for a time range, built from the store without scoring a single message.
+  The cumulative scores continue from the running totals before the range, as if the whole chat had been analyzed.
+
+  Args:
+    start (Union[str, date, datetime]): The start of the range, included. The range is open if not provided.
+    end (Union[str, date, datetime]): The end of the range, excluded. The range is open if not provided.
+    members (List[str]): The members to include, all of them if not provided.
+
+  Returns:
+    ColumnarSentiment: The scores of every member with messages in the range.
+  """
+  def sentiment(self, start = None, end = None, members: List[str] = None) -> ColumnarSentiment:
+    members = self.members() if members is None else members
+    series = {member: self.series(member, start, end) for member in members}
+
+    result = ColumnarSentiment(baseline = {member: values["baseline"] for member, values in series.items()})
+    for member, values in series.items():
+      if len(values["score"]):
+        result.extend_days(member, values["score"], values["timestamp"].astype("datetime64[D]").astype(np.int64))
+
+    return result
+
+  """
+  Aggregates the scores of every member within a time range, in a single query over the indexes.
+
+  Args:
+    start (Union[str, date, datetime]): The start of the range, included. The range is open if not provided.
+    end (Union[str, date, datetime]): The end of the range, excluded. The range is open if not provided.
+
+  Returns:
+    dict[str, dict]: The "count", "sum", "mean", "min" and "max" compound score of every member with messages in the range.
+  """
+  def aggregate(self, start = None, end = None) -> dict[str, dict]:
+    start, end = to_minutes(start), to_minutes(end)
+    condition, parameters = "1", []
+    if start is not None:
+      condition, parameters = condition + " AND timestamp >= ?", parameters + [start]
+    if end is not None:
+      condition, parameters = condition + " AND timestamp < ?", parameters + [end]
+
+    rows = self.connection.execute("SELECT senders.name, COUNT(*), SUM(score), AVG(score), MIN(score), MAX(score) "
+                                   f"FROM messages JOIN senders ON senders.id = messages.sender WHERE {condition} "
+                                   "GROUP BY messages.sender ORDER BY messages.sender", parameters)
+
+    return {name: {"count": count, "sum": total, "mean": mean, "min": low, "max": high} for name, count, total, mean, low, high in rows}
+
+  """
+  Resamples the series of a member within a time range into candlesticks (see aggregation.resample_ohlc()).
+
+  Args:
+    member (str): The name of the member.
+    freq (str): The bucket size, "D", "W" or "M".
+    start (Union[str, date, datetime]): The start of the range, included. The range is open if not provided.
+    end (Union[str, date, datetime]): The end of the range, excluded. The range is open if not provided.
+
+  Returns:
+    dict[str, np.ndarray]: The candlesticks of the member.
+  """
+  def candlesticks(self, member: str, freq: str = "D", start = None, end = None) -> dict[str, np.ndarray]:
+    values = self.series(member, start, end)
+    return resample_ohlc(values["timestamp"].astype("datetime64[D]"), values["score"], freq, values["baseline"])
+
+  """
+  Returns the number of stored messages.
+
+  Args:
+    None
+
+  Returns:
+    int: The number of messages.
+  """
+  def __len__(self) -> int:
+    return self.connection.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+  """
+  Closes the database.
+
+  Args:
+    None
+
+  Returns:
+    None
+  """
+  def close(self) -> None:
+    self.connection.close()
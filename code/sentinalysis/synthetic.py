@@ -0,0 +1,184 @@
+from datetime import date, datetime, timedelta
+from typing import List
+import numpy as np
+
+# Lines generated at once, the random draws of a chunk are vectorized
+GENERATE_CHUNK_SIZE = 65536
+
+# Timestamps of the Android and iOS exports of a few locales. Every function receives the date and the minute of the day,
+# and returns everything that precedes the sender of a line.
+def _en_us(day: date, minute: int) -> str:
+  return f"{day.month}/{day.day}/{day.year % 100:02d}, {minute // 60}:{minute % 60:02d} - "
+
+def _en_us_12h(day: date, minute: int) -> str:
+  hour = minute // 60
+  return f"{day.month}/{day.day}/{day.year % 100:02d}, {(hour - 1) % 12 + 1}:{minute % 60:02d} {'PM' if hour >= 12 else 'AM'} - "
+
+def _en_gb(day: date, minute: int) -> str:
+  return f"{day.day:02d}/{day.month:02d}/{day.year}, {minute // 60:02d}:{minute % 60:02d} - "
+
+def _de_de(day: date, minute: int) -> str:
+  return f"{day.day:02d}.{day.month:02d}.{day.year % 100:02d}, {minute // 60:02d}:{minute % 60:02d} - "
+
+def _iso(day: date, minute: int) -> str:
+  return f"{day.year}-{day.month:02d}-{day.day:02d}, {minute // 60:02d}:{minute % 60:02d} - "
+
+def _ios(day: date, minute: int) -> str:
+  return f"[{day.day:02d}.{day.month:02d}.{day.year % 100:02d}, {minute // 60:02d}:{minute % 60:02d}:00] "
+
+# Timestamp formats of the exports of generate_export(), and whether they are iOS exports
+LOCALES = {
+  "en_US": (_en_us, False),
+  "en_US_12h": (_en_us_12h, False),
+  "en_GB": (_en_gb, False),
+  "de_DE": (_de_de, False),
+  "iso": (_iso, False),
+  "ios": (_ios, True),
+}
+
+# Words of the generated messages, with enough VADER vocabulary, negations, emoji and punctuation to exercise the scorer
+_WORDS = [
+  "good", "great", "love", "nice", "happy", "awesome", "thanks", "lol", "haha", "cool", "best", "fun", "yes", "sure", "fine",
+  "bad", "hate", "sad", "terrible", "awful", "angry", "sorry", "worst", "ugh", "boring", "no", "not", "never", "hardly",
+  "very", "really", "so", "extremely", "kind", "of", "but", "the", "a", "it", "is", "was", "we", "you", "they", "this", "that",
+  "game", "phone", "work", "dinner", "tomorrow", "today", "tonight", "weekend", "movie", "song", "plan", "meeting", "coffee",
+  "going", "see", "think", "know", "want", "call", "send", "check", "come", "wait", "meet", "play", "watch", "try",
+  "😂", "😎", "💀", "❤️", "🙏", "👍", ":)", ":(", ":D", "?", "!", "!!", "...",
+]
+
+# System lines of Android exports and their iOS counterpart, "{member}" and "{other}" are replaced by the names of members
+_SYSTEM_TEMPLATES = [
+  "{member} added {other}",
+  "{member} left",
+  "{member} removed {other}",
+  "{member} changed this group's icon",
+  "{member} pinned a message",
+  "{member} changed the group description",
+  "{member} started a call",
+  "{other} joined using this group's invite link",
+  "{member} changed the subject from \"old\" to \"new\"",
+]
+
+_ANDROID_MEDIA = ["<Media omitted>", "This message was deleted", "You deleted this message"]
+_IOS_MEDIA = ["‎image omitted", "‎video omitted", "‎sticker omitted", "‎This message was deleted."]
+
+"""
+Builds a pool of distinct messages from random words.
+
+Args:
+  rng (np.random.Generator): The random generator.
+  size (int): The number of messages.
+
+Returns:
+  List[str]: The messages.
+"""
+def get_message_pool(rng: np.random.Generator, size: int) -> List[str]:
+  lengths = rng.integers(1, 16, size)
+  words = rng.integers(0, len(_WORDS), int(lengths.sum())).tolist()
+  offsets = np.r_[0, np.cumsum(lengths)].tolist()
+
+  pool = []
+  for idx in range(size):
+    message = " ".join(_WORDS[word] for word in words[offsets[idx]:offsets[idx + 1]])
+    pool.append(message[0].upper() + message[1:])
+
+  return pool
+
+"""
+Writes a deterministic synthetic WhatsApp export. The same arguments always produce the same file,
+so it can be used for benchmarks and tests at any size, from a thousand lines to tens of millions.
+
+Args:
+  filePath (str): The path of the .txt file.
+  lines (int): The number of lines of the export.
+  members (int): The number of members writing messages, named "Person 1" to "Person N".
+  multiline_ratio (float): The share of lines that continue the previous message on a new line.
+  system_ratio (float): The share of system lines, e.g. members joining or leaving, which validation removes.
+  media_ratio (float): The share of messages replaced by a placeholder, e.g. "<Media omitted>", which validation removes as well.
+  locale (str): The timestamp format, one of LOCALES.
+  seed (int): The seed of the random generator.
+  distinct_messages (int): The number of distinct message texts, which decides how often scores can be reused from a cache.
+  start (datetime): The time of the first line. The default starts after the 12th of the month, so that the order
+  of the date fields can be detected from the first lines, as in most real exports.
+
+Returns:
+  dict[str, int]: The number of "lines", "messages" (user messages, continuation lines excluded), "continuations", "system" and "media" lines written.
+"""
+def generate_export(filePath: str,
+                    lines: int,
+                    members: int = 5,
+                    multiline_ratio: float = 0.05,
+                    system_ratio: float = 0.01,
+                    media_ratio: float = 0.02,
+                    locale: str = "en_US",
+                    seed: int = 0,
+                    distinct_messages: int = 50000,
+                    start: datetime = datetime(2019, 6, 15, 8, 0)) -> dict[str, int]:
+  if locale not in LOCALES:
+    raise ValueError(f"Unsupported locale: {locale}")
+  if members < 1:
+    raise ValueError("An export needs at least one member.")
+  if multiline_ratio + system_ratio + media_ratio >= 1:
+    raise ValueError("The ratios leave no room for messages.")
+
+  format_timestamp, ios = LOCALES[locale]
+  rng = np.random.default_rng(seed)
+  pool = get_message_pool(rng, distinct_messages)
+  names = [f"Person {idx + 1}" for idx in range(members)]
+  media_bodies = _IOS_MEDIA if ios else _ANDROID_MEDIA
+
+  # Timestamps are cached per day and minute, most lines share them with their neighbours
+  prefixes = {}
+  day, minute = start.date(), start.hour * 60 + start.minute
+  counts = {"lines": lines, "messages": 0, "continuations": 0, "system": 0, "media": 0}
+  previous_kind = None
+
+  with open(filePath, "w", encoding = "utf-8") as f:
+    for chunk_start in range(0, lines, GENERATE_CHUNK_SIZE):
+      size = min(GENERATE_CHUNK_SIZE, lines - chunk_start)
+      # Drawn as arrays, and indexed as lists, which is much faster than indexing numpy arrays one element at a time
+      kinds = np.searchsorted(np.cumsum([multiline_ratio, system_ratio, media_ratio]), rng.random(size), side = "right").tolist()
+      senders = rng.integers(0, members, size).tolist()
+      others = rng.integers(0, members, size).tolist()
+      texts = rng.integers(0, len(pool), size).tolist()
+      templates = rng.integers(0, len(_SYSTEM_TEMPLATES), size).tolist()
+      # Most messages follow each other within a few minutes, with the occasional quiet hours
+      gaps = np.where(rng.random(size) < 0.02, rng.integers(60, 1440, size), rng.geometric(0.6, size) - 1).tolist()
+
+      out = []
+      for idx in range(size):
+        kind = kinds[idx]
+        if kind == 0 and previous_kind not in (0, 3):
+          kind = 3
+        previous_kind = kind
+
+        if kind == 0:
+          counts["continuations"] += 1
+          out.append(pool[texts[idx]])
+          continue
+
+        minute += gaps[idx]
+        if minute >= 1440:
+          day += timedelta(days = minute // 1440)
+          minute %= 1440
+          prefixes.clear()
+        prefix = prefixes.get(minute)
+        if prefix is None:
+          prefix = prefixes[minute] = format_timestamp(day, minute)
+
+        member = names[senders[idx]]
+        if kind == 3:
+          counts["messages"] += 1
+          out.append(f"{prefix}{member}: {pool[texts[idx]]}")
+        elif kind == 2:
+          counts["media"] += 1
+          out.append(f"{prefix}{member}: {media_bodies[texts[idx] % len(media_bodies)]}")
+        else:
+          counts["system"] += 1
+          text = _SYSTEM_TEMPLATES[templates[idx]].format(member = member, other = names[others[idx]])
+          out.append(f"‎{prefix}Synthetic Group: ‎{text}" if ios else f"{prefix}{text}")
+
+      out.append("")
+      f.write("\n".join(out))
+
+  return counts
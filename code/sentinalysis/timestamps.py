@@ -0,0 +1,233 @@
+from .config import header_pattern
+from datetime import date
+from itertools import islice
+from typing import Iterable, List, Tuple
+import numpy as np
+import re
+
+DATE_ORDERS = ("MDY", "DMY", "YMD")
+# Number of lines sampled to detect the format of an export
+FORMAT_SAMPLE_SIZE = 1000
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_DATE_SEPARATORS = re.compile(r'[./-]')
+_TIME_PATTERN = re.compile(r'(\d{1,2})[:.](\d{2})(?:[:.]\d{2})?(?:\s?([AaPp])\.?\s?[Mm]\.?)?')
+
+"""
+Splits a date of an export into its three numeric fields, in the order they are written.
+
+Args:
+  date_str (str): The date, e.g. "9/17/22", "17.09.2022" or "2022-09-17".
+
+Returns:
+  Tuple[int, int, int]: The three fields.
+"""
+def split_date(date_str: str) -> Tuple[int, int, int]:
+  first, second, third = _DATE_SEPARATORS.split(date_str)
+  return int(first), int(second), int(third)
+
+"""
+Detects the order of the date fields of an export from a sample of its dates.
+A year written first, or a field above 12, decides the order. If every field could be both a day and a month,
+the order under which the sample is chronological is used, since exports are sorted by time.
+
+Args:
+  date_strings (List[str]): The dates of the sampled messages, in the order of the export.
+  default (str): The order used when the sample gives no hint. Defaults to "DMY" for dotted dates and "MDY" otherwise.
+
+Returns:
+  str: One of DATE_ORDERS.
+"""
+def detect_date_order(date_strings: List[str], default: str = None) -> str:
+  fields = []
+  for date_str in date_strings:
+    if len(_DATE_SEPARATORS.split(date_str, 1)[0]) == 4:
+      return "YMD"
+    fields.append(split_date(date_str))
+
+  if default is None:
+    default = "DMY" if fields and "." in date_strings[0] else "MDY"
+
+  if any(first > 12 for first, _, _ in fields):
+    return "DMY"
+  if any(second > 12 for _, second, _ in fields):
+    return "MDY"
+
+  # Number of times the sample would go back in time under each order
+  def count_inversions(keys: List[Tuple[int, int, int]]) -> int:
+    return sum(1 for previous, current in zip(keys, keys[1:]) if current < previous)
+
+  mdy = count_inversions([(year, first, second) for first, second, year in fields])
+  dmy = count_inversions([(year, second, first) for first, second, year in fields])
+
+  if mdy == dmy:
+    return default
+  return "MDY" if mdy < dmy else "DMY"
+
+"""
+Format of the timestamps of an export.
+
+Args:
+  order (str): The order of the date fields, one of DATE_ORDERS.
+  style (str): "android" for "date, time - " headers, "ios" for "[date, time] " headers.
+  twelve_hour (bool): Whether times are written with AM/PM.
+  four_digit_year (bool): Whether years are written with 4 digits.
+"""
+class TimestampFormat:
+  def __init__(self, order: str = "MDY", style: str = "android", twelve_hour: bool = False, four_digit_year: bool = False):
+    if order not in DATE_ORDERS:
+      raise ValueError(f"Unsupported date order: {order}")
+
+    self.order = order
+    self.style = style
+    self.twelve_hour = twelve_hour
+    self.four_digit_year = four_digit_year
+
+  def __eq__(self, other) -> bool:
+    return isinstance(other, TimestampFormat) and vars(self) == vars(other)
+
+  def __repr__(self) -> str:
+    return f"TimestampFormat(order={self.order!r}, style={self.style!r}, twelve_hour={self.twelve_hour}, four_digit_year={self.four_digit_year})"
+
+"""
+Detects the timestamp format of an export by sampling its first lines. Lines that do not start a message are skipped.
+
+Args:
+  lines (Iterable[str]): The lines of the export, only the first sample_size are read.
+  sample_size (int): The maximum number of lines to sample.
+
+Returns:
+  TimestampFormat: The detected format. The default M/D/YY 24h Android format if no line starts a message.
+"""
+def detect_format(lines: Iterable[str], sample_size: int = FORMAT_SAMPLE_SIZE) -> TimestampFormat:
+  dates, times, ios = [], [], 0
+
+  for line in islice(lines, sample_size):
+    match = header_pattern.match(line)
+    if match is None:
+      continue
+
+    dates.append(match["date"])
+    times.append(match["time"])
+    ios += line.lstrip("\u200e").startswith("[")
+
+  if not dates:
+    return TimestampFormat()
+
+  return TimestampFormat(order = detect_date_order(dates),
+                         style = "ios" if ios * 2 > len(dates) else "android",
+                         twelve_hour = any(_TIME_PATTERN.match(time).group(3) for time in times),
+                         four_digit_year = any(len(date_str) >= 10 for date_str in dates))
+
+"""
+Parses the timestamps of an export. Since thousands of messages share a day, every distinct date and time string
+is only parsed once and then looked up. Timestamps are returned as dates or as integer minutes since 1970-01-01,
+which sort correctly and fit in an int64 (or a datetime64[m]) array.
+
+Args:
+  order (str): The order of the date fields, one of DATE_ORDERS or a TimestampFormat.
+"""
+class TimestampParser:
+  def __init__(self, order = "MDY"):
+    if isinstance(order, TimestampFormat):
+      order = order.order
+    if order not in DATE_ORDERS:
+      raise ValueError(f"Unsupported date order: {order}")
+
+    self.order = order
+    self._dates = {}
+    self._days = {}
+    self._minutes_of_day = {}
+
+  """
+  Returns the date of a date string.
+
+  Args:
+    date_str (str): The date, as written in the export.
+
+  Returns:
+    date: The date.
+  """
+  def get_date(self, date_str: str) -> date:
+    try:
+      return self._dates[date_str]
+    except KeyError:
+      pass
+
+    first, second, third = split_date(date_str)
+    if self.order == "MDY":
+      year, month, day = third, first, second
+    elif self.order == "DMY":
+      year, month, day = third, second, first
+    else:
+      year, month, day = first, second, third
+
+    timestamp = self._dates[date_str] = date(year + 2000 if year < 100 else year, month, day)
+    return timestamp
+
+  """
+  Returns the number of days between 1970-01-01 and a date string.
+
+  Args:
+    date_str (str): The date, as written in the export.
+
+  Returns:
+    int: The number of days since 1970-01-01.
+  """
+  def get_day(self, date_str: str) -> int:
+    try:
+      return self._days[date_str]
+    except KeyError:
+      day = self._days[date_str] = self.get_date(date_str).toordinal() - _EPOCH_ORDINAL
+      return day
+
+  """
+  Returns the minute of the day of a time string. Seconds are dropped.
+
+  Args:
+    time_str (str): The time, as written in the export, e.g. "18:54", "6:54 PM" or "18:54:12".
+
+  Returns:
+    int: The number of minutes since midnight.
+  """
+  def get_minute_of_day(self, time_str: str) -> int:
+    try:
+      return self._minutes_of_day[time_str]
+    except KeyError:
+      pass
+
+    match = _TIME_PATTERN.match(time_str)
+    if match is None:
+      raise ValueError(f"Unsupported time: {time_str!r}")
+
+    hour, minute, meridiem = int(match[1]), int(match[2]), match[3]
+    if meridiem is not None:
+      hour = hour % 12 + (12 if meridiem in "Pp" else 0)
+
+    minutes = self._minutes_of_day[time_str] = hour * 60 + minute
+    return minutes
+
+  """
+  Returns the timestamp of a message with minute resolution.
+
+  Args:
+    date_str (str): The date, as written in the export.
+    time_str (str): The time, as written in the export.
+
+  Returns:
+    int: The number of minutes since 1970-01-01 00:00.
+  """
+  def get_minutes(self, date_str: str, time_str: str) -> int:
+    return self.get_day(date_str) * 1440 + self.get_minute_of_day(time_str)
+
+"""
+Converts timestamps returned by TimestampParser.get_minutes() to a numpy datetime64 array.
+
+Args:
+  minutes (Iterable[int]): The number of minutes since 1970-01-01 00:00 of every timestamp.
+
+Returns:
+  np.ndarray: The timestamps as datetime64[m].
+"""
+def minutes_to_datetime64(minutes: Iterable[int]) -> np.ndarray:
+  return np.asarray(minutes, dtype = np.int64).astype("datetime64[m]")
@@ -1,6 +1,13 @@
-from nltk import data as nltk_data
 from functools import lru_cache
-import nltk
+import hashlib
+import marshal
+import os
+
+# nltk takes a while to import, so it is only imported by the functions that need it.
+# This keeps commands that never score a message, like validating or converting an export, fast to start.
+
+# Directory of the lexicon snapshot, can be changed with the SENTINALYSIS_CACHE_DIR environment variable
+SNAPSHOT_DIR = os.environ.get("SENTINALYSIS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sentinalysis"))
 
 """
 Checks to see if the VADER lexicon is present. If not, download it.
@@ -13,7 +20,87 @@ Returns:
 """
 @lru_cache(maxsize=None)
 def check_vader_lexicon() -> None:
+    from nltk import data as nltk_data
+    import nltk
+
     try:
         nltk_data.find("sentiment/vader_lexicon.zip")
     except LookupError:
-        nltk.download('vader_lexicon', quiet = True)
\ No newline at end of file
+        nltk.download('vader_lexicon', quiet = True)
+
+VADER_LEXICON_FILE = "sentiment/vader_lexicon.zip/vader_lexicon/vader_lexicon.txt"
+
+"""
+Returns a key that changes whenever the VADER lexicon or the nltk implementation of VADER changes.
+Anything derived from VADER scores and saved to disk should be invalidated when this key changes.
+
+Args:
+  None
+
+Returns:
+  str: The lexicon version key.
+"""
+@lru_cache(maxsize=None)
+def get_lexicon_version() -> str:
+    from nltk import data as nltk_data
+    import nltk
+
+    check_vader_lexicon()
+    lexicon = nltk_data.load(VADER_LEXICON_FILE, format = "raw")
+    return f"nltk-{nltk.__version__}-{hashlib.sha256(lexicon).hexdigest()[:16]}"
+
+"""
+Returns the path of the lexicon snapshot written by load_lexicon_snapshot(). The name changes with the nltk version
+and with the path, size and modification time of the lexicon archive, so that it can be found without reading the lexicon.
+
+Args:
+    None
+
+Returns:
+    str: The path of the snapshot.
+"""
+@lru_cache(maxsize=None)
+def get_snapshot_path() -> str:
+    from nltk import data as nltk_data
+    import nltk
+
+    check_vader_lexicon()
+    pointer = nltk_data.find("sentiment/vader_lexicon.zip")
+    archivePath = getattr(pointer, "path", None) or pointer.zipfile.filename
+    stat = os.stat(archivePath)
+
+    key = f"{nltk.__version__}|{os.path.abspath(archivePath)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return os.path.join(SNAPSHOT_DIR, f"vader-lexicon-{hashlib.sha256(key.encode()).hexdigest()[:16]}.marshal")
+
+"""
+Loads the VADER lexicon from a precompiled snapshot, which takes a few milliseconds instead of parsing the lexicon text.
+The snapshot is created on the first call. If it cannot be written, the lexicon is parsed every time.
+
+Args:
+    parse (Callable): Parses the lexicon text into a dictionary, called when there is no snapshot.
+
+Returns:
+    dict[str, float]: The valence of every word in the lexicon.
+"""
+def load_lexicon_snapshot(parse) -> dict[str, float]:
+    snapshotPath = get_snapshot_path()
+
+    try:
+        with open(snapshotPath, "rb") as f:
+            lexicon = marshal.load(f)
+        if isinstance(lexicon, dict):
+            return lexicon
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    lexicon = parse()
+    try:
+        os.makedirs(os.path.dirname(snapshotPath), exist_ok = True)
+        # Written under a temporary name, so that concurrent processes never read a partial snapshot
+        with open(f"{snapshotPath}.{os.getpid()}.tmp", "wb") as f:
+            marshal.dump(lexicon, f)
+        os.replace(f"{snapshotPath}.{os.getpid()}.tmp", snapshotPath)
+    except OSError:
+        pass
+
+    return lexicon
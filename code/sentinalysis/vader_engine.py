@@ -0,0 +1,326 @@
+from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+from .utils import check_vader_lexicon, load_lexicon_snapshot, VADER_LEXICON_FILE
+from nltk import data as nltk_data
+from typing import List
+import numpy as np
+import string
+import math
+
+_PUNCTUATION_CHARS = frozenset(string.punctuation)
+_REMOVE_PUNCTUATION = str.maketrans("", "", string.punctuation)
+_PUNC_SET = frozenset(VaderConstants.PUNC_LIST)
+_NEGATE = frozenset(VaderConstants.NEGATE)
+_BOOSTERS = VaderConstants.BOOSTER_DICT
+_IDIOMS = VaderConstants.SPECIAL_CASE_IDIOMS
+_B_DECR = VaderConstants.B_DECR
+_C_INCR = VaderConstants.C_INCR
+_N_SCALAR = VaderConstants.N_SCALAR
+_ALPHA = 15
+
+"""
+Reads the VADER lexicon into a dictionary, the same way nltk's SentimentIntensityAnalyzer does.
+
+Args:
+  None
+
+Returns:
+  dict[str, float]: The valence of every word in the lexicon.
+"""
+def parse_vader_lexicon() -> dict[str, float]:
+  check_vader_lexicon()
+  lexicon = {}
+
+  for line in nltk_data.load(VADER_LEXICON_FILE).split("\n"):
+    word, measure = line.strip().split("\t")[0:2]
+    lexicon[word] = float(measure)
+
+  return lexicon
+
+"""
+Returns the VADER lexicon, from the precompiled snapshot if there is one (see utils.load_lexicon_snapshot()).
+
+Args:
+  None
+
+Returns:
+  dict[str, float]: The valence of every word in the lexicon.
+"""
+def load_vader_lexicon() -> dict[str, float]:
+  return load_lexicon_snapshot(parse_vader_lexicon)
+
+"""
+nltk's SentimentIntensityAnalyzer, built from the lexicon snapshot instead of parsing the lexicon text on every construction.
+Only the loading differs, the scores are nltk's own.
+
+Args:
+  lexicon (dict[str, float]): The VADER lexicon. Loaded with load_vader_lexicon() if not provided.
+"""
+class SnapshotSentimentIntensityAnalyzer(SentimentIntensityAnalyzer):
+  def __init__(self, lexicon: dict[str, float] = None):
+    self.lexicon_file = VADER_LEXICON_FILE
+    self.lexicon = lexicon if lexicon is not None else load_vader_lexicon()
+    self.constants = VaderConstants()
+
+"""
+Splits a message into words and emoticons, following nltk's SentiText.
+Tokens of one character are dropped, and a single leading or trailing punctuation sequence from VADER's punctuation list is removed
+when what remains is a word of the message. nltk does this by building a dictionary with every punctuation/word combination
+for each message, here the candidate token is checked directly.
+
+Args:
+  text (str): The message.
+
+Returns:
+  List[str]: The words and emoticons of the message.
+"""
+def tokenize(text: str) -> List[str]:
+  tokens = [token for token in text.split() if len(token) > 1]
+  words_only = None
+
+  for idx, token in enumerate(tokens):
+    leading = token[0] in _PUNCTUATION_CHARS
+    trailing = token[-1] in _PUNCTUATION_CHARS
+    if not (leading or trailing):
+      continue
+
+    if words_only is None:
+      words_only = {word for word in text.translate(_REMOVE_PUNCTUATION).split() if len(word) > 1}
+
+    if leading:
+      start = 1
+      while start < len(token) and token[start] in _PUNCTUATION_CHARS:
+        start += 1
+      if token[:start] in _PUNC_SET and token[start:] in words_only:
+        tokens[idx] = token[start:]
+        continue
+
+    if trailing:
+      end = len(token) - 1
+      while end > 0 and token[end - 1] in _PUNCTUATION_CHARS:
+        end -= 1
+      if token[end:] in _PUNC_SET and token[:end] in words_only:
+        tokens[idx] = token[:end]
+
+  return tokens
+
+"""
+Returns True if a single word negates the words that follow it, like nltk's VaderConstants.negated() does for one word.
+
+Args:
+  word (str): The lowercase word.
+
+Returns:
+  bool: Whether the word is a negation.
+"""
+def _is_negation(word: str) -> bool:
+  return word in _NEGATE or "n't" in word
+
+"""
+Batched reimplementation of nltk's VADER compound score.
+The lexicon, booster words and negations are compiled into plain lookup tables once, the tokenization is done
+without nltk's per-message punctuation dictionaries, and the normalization of the whole batch is a single numpy expression.
+The compound scores are identical to SentimentIntensityAnalyzer.polarity_scores(msg)["compound"].
+
+Args:
+  lexicon (dict[str, float]): The VADER lexicon. Loaded with load_vader_lexicon() if not provided.
+"""
+class VaderBatchScorer:
+  def __init__(self, lexicon: dict[str, float] = None):
+    self.lexicon = lexicon if lexicon is not None else load_vader_lexicon()
+
+  """
+  Computes the sum of the valences of a message, before normalization.
+
+  Args:
+    text (str): The message.
+
+  Returns:
+    float: The punctuation-amplified valence sum, or None if the message contains no words.
+  """
+  def valence_sum(self, text: str) -> float:
+    words = tokenize(text)
+    if not words:
+      return None
+
+    lexicon = self.lexicon
+    lower = [word.lower() for word in words]
+    word_count = len(words)
+
+    allcaps = sum(1 for word in words if word.isupper())
+    is_cap_diff = 0 < word_count - allcaps < word_count
+
+    # nltk looks words up with list.index(), so repeated words use the position of their first occurrence
+    first_index = {}
+    for idx, word in enumerate(words):
+      first_index.setdefault(word, idx)
+
+    sentiments = []
+    for word in words:
+      i = first_index[word]
+      word_lower = lower[i]
+
+      if word_lower in _BOOSTERS or (i < word_count - 1 and word_lower == "kind" and lower[i + 1] == "of"):
+        sentiments.append(0)
+        continue
+
+      valence = lexicon.get(word_lower)
+      if valence is None:
+        sentiments.append(0)
+        continue
+
+      if is_cap_diff and word.isupper():
+        valence = valence + _C_INCR if valence > 0 else valence - _C_INCR
+
+      for start_i in range(3):
+        if i <= start_i:
+          break
+
+        previous_lower = lower[i - (start_i + 1)]
+        if previous_lower in lexicon:
+          continue
+
+        scalar = 0.0
+        if previous_lower in _BOOSTERS:
+          scalar = _BOOSTERS[previous_lower]
+          if valence < 0:
+            scalar *= -1
+          if is_cap_diff and words[i - (start_i + 1)].isupper():
+            scalar = scalar + _C_INCR if valence > 0 else scalar - _C_INCR
+          if start_i == 1:
+            scalar = scalar * 0.95
+          elif start_i == 2:
+            scalar = scalar * 0.9
+
+        valence = valence + scalar
+        valence = self._never_check(valence, words, lower, start_i, i)
+        if start_i == 2:
+          valence = self._idioms_check(valence, words, i)
+
+      sentiments.append(self._least_check(valence, lower, i))
+
+    if "but" in lower:
+      but_index = lower.index("but")
+      for idx, sentiment in enumerate(sentiments):
+        if idx < but_index:
+          sentiments[idx] = sentiment * 0.5
+        elif idx > but_index:
+          sentiments[idx] = sentiment * 1.5
+
+    sum_s = float(sum(sentiments))
+
+    exclamations = min(text.count("!"), 4)
+    questions = text.count("?")
+    amplifier = exclamations * 0.292
+    if questions > 1:
+      amplifier += questions * 0.18 if questions <= 3 else 0.96
+
+    if sum_s > 0:
+      sum_s += amplifier
+    elif sum_s < 0:
+      sum_s -= amplifier
+
+    return sum_s
+
+  def _never_check(self, valence: float, words: List[str], lower: List[str], start_i: int, i: int) -> float:
+    if start_i == 0:
+      if _is_negation(lower[i - 1]):
+        valence = valence * _N_SCALAR
+    elif start_i == 1:
+      if words[i - 2] == "never" and (words[i - 1] == "so" or words[i - 1] == "this"):
+        valence = valence * 1.5
+      elif _is_negation(lower[i - 2]):
+        valence = valence * _N_SCALAR
+    else:
+      if (words[i - 3] == "never" and (words[i - 2] == "so" or words[i - 2] == "this")) or (words[i - 1] == "so" or words[i - 1] == "this"):
+        valence = valence * 1.25
+      elif _is_negation(lower[i - 3]):
+        valence = valence * _N_SCALAR
+    return valence
+
+  def _idioms_check(self, valence: float, words: List[str], i: int) -> float:
+    onezero = f"{words[i - 1]} {words[i]}"
+    twoonezero = f"{words[i - 2]} {words[i - 1]} {words[i]}"
+    twoone = f"{words[i - 2]} {words[i - 1]}"
+    threetwoone = f"{words[i - 3]} {words[i - 2]} {words[i - 1]}"
+    threetwo = f"{words[i - 3]} {words[i - 2]}"
+
+    for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+      if seq in _IDIOMS:
+        valence = _IDIOMS[seq]
+        break
+
+    if len(words) - 1 > i:
+      zeroone = f"{words[i]} {words[i + 1]}"
+      if zeroone in _IDIOMS:
+        valence = _IDIOMS[zeroone]
+    if len(words) - 1 > i + 1:
+      zeroonetwo = f"{words[i]} {words[i + 1]} {words[i + 2]}"
+      if zeroonetwo in _IDIOMS:
+        valence = _IDIOMS[zeroonetwo]
+
+    if threetwo in _BOOSTERS or twoone in _BOOSTERS:
+      valence = valence + _B_DECR
+    return valence
+
+  def _least_check(self, valence: float, lower: List[str], i: int) -> float:
+    if i > 1 and lower[i - 1] == "least" and "least" not in self.lexicon:
+      if lower[i - 2] != "at" and lower[i - 2] != "very":
+        valence = valence * _N_SCALAR
+    elif i > 0 and lower[i - 1] == "least" and "least" not in self.lexicon:
+      valence = valence * _N_SCALAR
+    return valence
+
+  """
+  Computes the compound scores of a batch of messages.
+
+  Args:
+    msgs (List[str]): The messages to be scored.
+
+  Returns:
+    np.ndarray: The compound score of every message, rounded to 4 decimals like nltk does.
+  """
+  def score_batch(self, msgs: List[str]) -> np.ndarray:
+    sums = [self.valence_sum(msg) for msg in msgs]
+    has_words = np.array([value is not None for value in sums], dtype = bool)
+    sum_s = np.array([value if value is not None else 0.0 for value in sums], dtype = np.float64)
+
+    compound = np.where(has_words, sum_s / np.sqrt(sum_s * sum_s + _ALPHA), 0.0)
+
+    # Python's round() is correctly rounded while np.round() is not, and the results must match nltk exactly
+    return np.array([round(value, 4) for value in compound.tolist()], dtype = np.float64)
+
+  """
+  Returns the scores of a single message in the format of nltk's polarity_scores(). Only the compound score is computed.
+
+  Args:
+    msg (str): The message to be scored.
+
+  Returns:
+    dict: A dictionary with the "compound" score of the message.
+  """
+  def polarity_scores(self, msg: str) -> dict:
+    valence = self.valence_sum(msg)
+    compound = valence / math.sqrt(valence * valence + _ALPHA) if valence is not None else 0.0
+    return {"compound": round(compound, 4)}
+
+"""
+Computes the compound scores of a batch of messages with any analyzer.
+Analyzers that provide a score_batch() method get the whole batch at once, or batches of their batch_size if they declare one
+(see scorers.Scorer), the others are called with polarity_scores() for every message.
+
+Args:
+  analyzer (SentimentIntensityAnalyzer): The analyzer used to score the messages.
+  msgs (List[str]): The messages to be scored.
+
+Returns:
+  List[float]: The compound score of every message.
+"""
+def get_compound_scores(analyzer, msgs: List[str]) -> List[float]:
+  # Looked up on the type so that mocks, which have every attribute, are scored message by message
+  if hasattr(type(analyzer), "score_batch"):
+    batch_size = getattr(analyzer, "batch_size", None)
+    if batch_size is None or len(msgs) <= batch_size:
+      return analyzer.score_batch(msgs).tolist()
+    return [score for idx in range(0, len(msgs), batch_size) for score in analyzer.score_batch(msgs[idx:idx + batch_size]).tolist()]
+
+  return [analyzer.polarity_scores(msg)["compound"] for msg in msgs]
@@ -1,7 +1,159 @@
-from .config import FILTERS_REGEX, date_pattern
+from .classifier import SystemLineClassifier
+from .instrumentation import record_stage
+from typing import Iterable, Iterator
 import ntpath
+import mmap
 import os
 
+# Sizes of the read chunks and of the write buffer of the binary validation
+READ_CHUNK_SIZE = 8 * 1024 * 1024
+OUTPUT_BUFFER_SIZE = 8 * 1024 * 1024
+
+"""
+Stitches the lines that are not system messages into whole messages. Works on str and on bytes lines alike.
+The parts of a multi-line message are collected in a list and joined once, so pasting a long text does not make the stitching quadratic.
+
+Args:
+  lines (Iterable): The lines of the exported chat, including their newline characters.
+  classifier (SystemLineClassifier): Decides which lines are dropped, its header pattern also tells where messages start.
+  space: A space, of the type of the lines.
+  newline: A newline, of the type of the lines.
+
+Returns:
+  Iterator: The validated messages, one per line.
+"""
+def _iter_stitched_lines(lines: Iterable, classifier: SystemLineClassifier, space, newline) -> Iterator:
+  header_match, classify_match, counts = classifier.header_prefix_pattern.match, classifier.classify_match, classifier.counts
+  parts = []
+
+  for line in lines:
+    header = header_match(line)
+    category = classify_match(line, header)
+
+    if category is not None:
+      counts[category] += 1
+    else:
+      # If current line does not start with timestamp, treat it as message continuation
+      if header is None:
+        if parts:
+          parts[-1] = parts[-1].rstrip(newline)
+        parts.append(space)
+        parts.append(line)
+      else:
+        if parts:
+          yield space[:0].join(parts)
+        parts = [line]
+
+  # Since no message follows the last one, it has to be yielded at the end
+  if parts:
+    yield space[:0].join(parts)
+
+"""
+Filters admin messages out of the lines of an exported chat and stitches multi-line messages together.
+This is the streaming core of data_validation(), it only keeps the message that is currently being stitched in memory.
+
+Args:
+  lines (Iterable[str]): The lines of the exported chat, including their newline characters.
+  classifier (SystemLineClassifier): Decides which lines are admin messages and counts them by category. A new one is used if not provided.
+
+Returns:
+  Iterator[str]: The validated messages, one per line.
+"""
+def iter_validated_lines(lines: Iterable[str], classifier: SystemLineClassifier = None) -> Iterator[str]:
+  classifier = classifier if classifier is not None else SystemLineClassifier()
+  return _iter_stitched_lines(lines, classifier, " ", "\n")
+
+"""
+Bytes version of iter_validated_lines(), for UTF-8 encoded chunks of an export. Nothing is decoded, and the output is identical
+to encoding the messages of iter_validated_lines() on the decoded lines.
+Runs of regular single-line messages are found with the run pattern of the classifier and copied in one piece,
+only system messages, continuation lines and messages of new senders are handled line by line.
+
+Args:
+  chunks (Iterable[bytes]): Consecutive chunks of the exported chat that end on line boundaries, with line endings translated to "\n".
+  classifier (SystemLineClassifier): A binary classifier (see SystemLineClassifier), which counts the admin messages by category.
+  A new one is used if not provided.
+
+Returns:
+  Iterator[bytes]: Consecutive pieces of the validated file.
+"""
+def iter_validated_bytes(chunks: Iterable[bytes], classifier: SystemLineClassifier = None) -> Iterator[bytes]:
+  classifier = classifier if classifier is not None else SystemLineClassifier(binary = True)
+  header_match, classify_match, counts = classifier.header_prefix_pattern.match, classifier.classify_match, classifier.counts
+  run_pattern = classifier.get_message_run_pattern()
+  parts = []
+
+  for chunk in chunks:
+    position, size = 0, len(chunk)
+
+    while position < size:
+      run = run_pattern.match(chunk, position) if run_pattern is not None else None
+      if run is not None:
+        # The last message of the run stays open, since continuation lines may follow it
+        last_line = max(chunk.rfind(b"\n", position, run.end() - 1) + 1, position)
+        if parts:
+          yield b"".join(parts)
+        if last_line > position:
+          yield chunk[position:last_line]
+        parts = [chunk[last_line:run.end()]]
+        position = run.end()
+        continue
+
+      end = chunk.find(b"\n", position) + 1 or size
+      line = chunk[position:end]
+      position = end
+
+      header = header_match(line)
+      category = classify_match(line, header)
+
+      if category is not None:
+        counts[category] += 1
+      elif header is None:
+        if parts:
+          parts[-1] = parts[-1].rstrip(b"\n")
+        parts.append(b" ")
+        parts.append(line)
+      else:
+        if parts:
+          yield b"".join(parts)
+        parts = [line]
+        run_pattern = classifier.get_message_run_pattern()
+
+  if parts:
+    yield b"".join(parts)
+
+"""
+Reads a file through a memory map in large chunks that end on line boundaries, without decoding them.
+Line endings are translated to "\n" like a text mode file object does.
+
+Args:
+  f (BinaryIO): The file, opened in binary mode.
+  chunk_size (int): The approximate size of a chunk.
+
+Returns:
+  Iterator[bytes]: The chunks of the file.
+"""
+def iter_mmap_chunks(f, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+  size = os.fstat(f.fileno()).st_size
+  # Empty files cannot be memory-mapped
+  if size == 0:
+    return
+
+  with mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as mm:
+    start = 0
+    while start < size:
+      end = min(start + chunk_size, size)
+      if end < size:
+        newline = mm.find(b"\n", end - 1)
+        end = newline + 1 if newline != -1 else size
+
+      chunk = mm[start:end]
+      if b"\r" in chunk:
+        chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+      yield chunk
+      start = end
+
 """
 Validates the chat file line by line.
 If a line has no timestamp, it's part of a multi-line message.
@@ -10,29 +162,30 @@ Therefore, the content is modified to act as one message.
 Args:
   filePath (str): The path to the chat logs file, must be an exported .txt file.
   outputPath (str): The path of the directory where the validated .txt file will be saved.
+  classifier (SystemLineClassifier): Decides which lines are admin messages. Its counts hold the number of removed lines per category afterwards. Optional.
+  It has to be a binary classifier in binary mode.
+  binary (bool): Validates the raw bytes of a memory-mapped file instead of decoded lines (see iter_validated_bytes()),
+  and writes them through a large buffer. Much faster on large exports, with the same output.
 
 Returns:
   str: The path to the validated file.
 """
-def data_validation(filePath: str, outputPath: str) -> str:
+def data_validation(filePath: str, outputPath: str, classifier: SystemLineClassifier = None, binary: bool = False) -> str:
   fileName = ntpath.basename(filePath).removesuffix(".txt")
   outputPath = os.path.join(outputPath, f"validated-{fileName}.txt")
-  prev_line = ""
-
-  with open(filePath, 'r', encoding = "utf-8") as f1, open(outputPath, 'wb+') as f2:
-    for line in f1:
-      if not FILTERS_REGEX.search(line):
-        # If current line does not start with timestamp, treat it as message continuation
-        if not date_pattern.search(line):
-          prev_line = prev_line.rstrip('\n')
-          prev_line += ' ' + line
-        else:
-          if prev_line:
-            f2.write(prev_line.encode())
-          prev_line = line
-
-    # Since no message follows the last one, it has to be written at the end
-    if prev_line:
-      f2.write(prev_line.encode())
-
-  return os.path.abspath(outputPath)
\ No newline at end of file
+
+  classifier = classifier if classifier is not None else SystemLineClassifier(binary = binary)
+  counts_before = classifier.counts.copy()
+
+  with record_stage("validation") as stage:
+    if binary:
+      with open(filePath, 'rb') as f1, open(outputPath, 'wb', buffering = OUTPUT_BUFFER_SIZE) as f2:
+        f2.writelines(iter_validated_bytes(stage.track(iter_mmap_chunks(f1), lambda chunk: chunk.count(b"\n")), classifier))
+    else:
+      with open(filePath, 'r', encoding = "utf-8") as f1, open(outputPath, 'wb+') as f2:
+        for line in iter_validated_lines(stage.track(f1), classifier):
+          f2.write(line.encode())
+
+    stage.add_filtered(classifier.counts - counts_before)
+
+  return os.path.abspath(outputPath)
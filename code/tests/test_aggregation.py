@@ -0,0 +1,76 @@
+from sentinalysis.aggregation import resample_ohlc, aggregate_sentiment, get_bucket_starts
+from sentinalysis.plotting import get_candlestick_charts
+from sentinalysis.results import ColumnarSentiment
+from datetime import date
+import numpy as np
+import unittest
+import shutil
+import os
+
+class TestAggregation(unittest.TestCase):
+    """
+    Checks the candlesticks of a short series by hand: open is the score before the bucket, close the score after it,
+    and high and low the extremes of the cumulative score, open included.
+    """
+    def test_daily_candlesticks(self):
+        dates = np.array(["2025-08-01", "2025-08-01", "2025-08-01", "2025-08-03"], dtype = "datetime64[D]")
+        scores = np.array([0.5, -1.0, 0.25, 0.75])
+
+        candlesticks = resample_ohlc(dates, scores, "D", baseline = 1.0)
+
+        self.assertEqual(candlesticks["date"].astype(str).tolist(), ["2025-08-01", "2025-08-03"])
+        self.assertEqual(candlesticks["open"].tolist(), [1.0, 0.75])
+        self.assertEqual(candlesticks["high"].tolist(), [1.5, 1.5])
+        self.assertEqual(candlesticks["low"].tolist(), [0.5, 0.75])
+        self.assertEqual(candlesticks["close"].tolist(), [0.75, 1.5])
+        self.assertEqual(candlesticks["count"].tolist(), [3, 1])
+        self.assertEqual(candlesticks["mean"].tolist(), [-0.25 / 3, 0.75])
+
+    """
+    Checks that weeks start on Monday and months on their first day.
+    """
+    def test_week_and_month_buckets(self):
+        dates = np.array(["2025-08-03", "2025-08-04", "2025-08-10", "2025-08-31"], dtype = "datetime64[D]")
+
+        self.assertEqual(get_bucket_starts(dates, "W").astype(str).tolist(), ["2025-07-28", "2025-08-04", "2025-08-04", "2025-08-25"])
+        self.assertEqual(get_bucket_starts(dates, "M").astype(str).tolist(), ["2025-08-01"] * 4)
+
+        with self.assertRaises(ValueError):
+            get_bucket_starts(dates, "Y")
+
+    """
+    Checks that dictionaries and columnar results give the same candlesticks, and that a chart is rendered for every member.
+    """
+    def test_dictionary_and_columnar_results_match(self):
+        rng = np.random.default_rng(0)
+        result = ColumnarSentiment()
+        for member in ("Stef", "NotStef"):
+            days = np.sort(rng.integers(20000, 20100, 1000))
+            result.extend_days(member, rng.normal(0, 0.5, 1000), days)
+
+        columnar = aggregate_sentiment(result, "W")
+        dictionary = aggregate_sentiment(result.to_dict(), "W")
+
+        for member in result:
+            for field in ("open", "high", "low", "close", "mean"):
+                self.assertTrue(np.allclose(columnar[member][field], dictionary[member][field]), f"The {field} of {member} differs.")
+            self.assertEqual(columnar[member]["count"].sum(), 1000)
+
+        # A dictionary of a resumed run starts from the running totals of its checkpoint
+        resumed = ColumnarSentiment(baseline = {"Stef": 2.0, "NotStef": -1.0})
+        for member in result:
+            resumed.extend_days(member, result.scores(member), result.dates(member).astype(np.int64))
+        resumed_dictionary = aggregate_sentiment(resumed.to_dict(), "W", baseline = resumed.baseline)
+        for member, candlesticks in aggregate_sentiment(resumed, "W").items():
+            for field in ("open", "high", "low", "close", "mean"):
+                self.assertTrue(np.allclose(candlesticks[field], resumed_dictionary[member][field]), f"The resumed {field} of {member} differs.")
+
+        output_dir = "sentinalysis-candlesticks"
+        get_candlestick_charts(result, output_dir, freq = "W")
+        charts = sorted(os.listdir(os.path.join(output_dir, "sentiment_candlestick_images")))
+        shutil.rmtree(output_dir)
+
+        self.assertEqual(charts, ["NotStef-candlestick.png", "Stef-candlestick.png"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+from sentinalysis.batch import batch_analysis, find_exports, init_batch_worker, MANIFEST_NAME
+from sentinalysis.scorers import BatchVaderScorer
+from sentinalysis import parallel
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from sentinalysis.cli import main
+import unittest
+import shutil
+import json
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class TestBatch(unittest.TestCase):
+    """
+    Creates a directory with three exports of different sizes, cut from the example snippet.
+    """
+    def setUp(self):
+        self.export_dir = "sentinalysis-batch-exports"
+        self.output_dir = "sentinalysis-batch-results"
+        os.makedirs(self.export_dir, exist_ok = True)
+
+        with open(SNIPPET_PATH, "r", encoding = "utf-8") as f1:
+            lines = f1.readlines()
+
+        for idx, size in enumerate((150, 450, 300)):
+            with open(os.path.join(self.export_dir, f"chat{idx}.txt"), "w", encoding = "utf-8") as f2:
+                f2.writelines(lines[:size])
+
+    def tearDown(self):
+        shutil.rmtree(self.export_dir, ignore_errors = True)
+        shutil.rmtree(self.output_dir, ignore_errors = True)
+
+    """
+    Checks that exports are listed largest first and that validated files are skipped.
+    """
+    def test_exports_are_listed_largest_first(self):
+        with open(os.path.join(self.export_dir, "validated-chat0.txt"), "w") as f:
+            f.write("7/23/25, 16:45 - TestPerson: This is a test.\n")
+
+        exports = [os.path.basename(path) for path in find_exports(self.export_dir)]
+
+        self.assertEqual(exports, ["chat1.txt", "chat2.txt", "chat0.txt"], "The exports are not sorted by size or include validated files.")
+
+    """
+    Checks that every chat of a batch gets the same result as validating and analyzing it on its own, and that the manifest lists them.
+    """
+    def test_batch_results_match_single_chat_results(self):
+        manifest = batch_analysis(find_exports(self.export_dir), self.output_dir, workers = 2, threads = 2)
+
+        with open(os.path.join(self.output_dir, MANIFEST_NAME), "r") as f1:
+            self.assertEqual(json.load(f1), json.loads(json.dumps(manifest)), "The saved manifest differs from the returned one.")
+
+        self.assertEqual(manifest["summary"]["failed"], 0, "A chat of the batch failed.")
+        self.assertIsNone(parallel._worker_analyzer, "The analyzer preloaded for the workers was kept after the batch.")
+
+        # A worker forked while the parent held the analyzer of another engine creates its own
+        parallel.init_worker("nltk")
+        init_batch_worker("batch")
+        self.assertIsInstance(parallel._worker_analyzer.analyzer, BatchVaderScorer)
+        parallel.reset_worker()
+
+        for entry in manifest["exports"]:
+            validated_file = data_validation(entry["export"], os.getcwd())
+            expected = sentiment_analysis(validated_file, columnar = True)
+            os.remove(validated_file)
+
+            with open(entry["result"], "r") as f2:
+                members = json.load(f2)["members"]
+
+            self.assertEqual(list(members), list(expected), f"The members of {entry['export']} differ.")
+            self.assertEqual(entry["messages"], sum(len(expected.scores(name)) for name in expected))
+            for name in expected:
+                self.assertEqual(members[name]["cumulative"], expected.cumulative(name).tolist(), f"The scores of {name} differ.")
+                self.assertEqual(members[name]["dates"], expected.dates(name).astype(str).tolist(), f"The dates of {name} differ.")
+
+    """
+    Checks that a chat that cannot be processed is recorded in the manifest without stopping the others.
+    """
+    def test_failed_chat_is_recorded(self):
+        with open(os.path.join(self.export_dir, "broken.txt"), "wb") as f:
+            f.write(b"7/23/25, 16:45 - TestPerson: \xff\xfe broken\n")
+
+        exit_code = main(["batch", self.export_dir, "-o", self.output_dir, "-w", "2"])
+
+        with open(os.path.join(self.output_dir, MANIFEST_NAME), "r") as f:
+            manifest = json.load(f)
+        errors = {os.path.basename(entry["export"]): entry["error"] for entry in manifest["exports"]}
+
+        self.assertEqual(exit_code, 1, "The command did not report the failed chat.")
+        self.assertIsNotNone(errors.pop("broken.txt"), "The broken chat has no error.")
+        self.assertEqual(set(errors.values()), {None}, "A valid chat failed.")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+from sentinalysis.cache import ScoreCache, MemoizedAnalyzer, get_message_key
+from sentinalysis.sentiment import sentiment_analysis
+from unittest.mock import Mock, patch
+import unittest
+import os
+
+class TestCache(unittest.TestCase):
+    """
+    Checks that messages which only differ in whitespace share the same cache key.
+    """
+    def test_whitespace_is_normalized_in_message_keys(self):
+        self.assertEqual(get_message_key("This  is a test.\n"), get_message_key(" This is a test."))
+        self.assertNotEqual(get_message_key("This is a test."), get_message_key("THIS IS A TEST."), "Capitalization changes VADER scores and must not be normalized.")
+
+    """
+    Checks that a second run over the same file reads every score from the cache instead of calling the analyzer.
+    """
+    def test_second_run_is_served_from_the_cache(self):
+        test_file = "sentinalysis-cache-run.txt"
+        cache_file = "sentinalysis-cache-run.sqlite"
+
+        with open(test_file, "w") as f1:
+            f1.write("8/2/25, 18:32 - TestPerson1: This is a great test.\n8/2/25, 18:33 - TestPerson2: This is a bad test.\n8/3/25, 09:12 - TestPerson1: ok\n")
+
+        first_result = sentiment_analysis(test_file, cachePath = cache_file)
+
+        mocked_analyzer = Mock()
+        mocked_analyzer.polarity_scores.return_value = {"compound": 0.5}
+        with patch("sentinalysis.vader_engine.SnapshotSentimentIntensityAnalyzer", return_value = mocked_analyzer):
+            second_result = sentiment_analysis(test_file, cachePath = cache_file)
+
+        os.remove(test_file)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(cache_file + suffix):
+                os.remove(cache_file + suffix)
+
+        mocked_analyzer.polarity_scores.assert_not_called()
+        self.assertEqual(second_result, first_result, "The cached run returned different sentiment scores.")
+
+    """
+    Checks that the least recently used entries are evicted once the cache is full.
+    """
+    def test_least_recently_used_entries_are_evicted(self):
+        cache_file = "sentinalysis-cache-eviction.sqlite"
+
+        with ScoreCache(cache_file, max_entries = 2) as cache:
+            cache.put_many([(b"old", 0.1)])
+
+        with ScoreCache(cache_file, max_entries = 2) as cache:
+            cache.put_many([(b"new1", 0.2), (b"new2", 0.3)])
+            remaining = cache.get_many([b"old", b"new1", b"new2"])
+            entry_count = len(cache)
+
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(cache_file + suffix):
+                os.remove(cache_file + suffix)
+
+        self.assertEqual(entry_count, 2, "The cache grew over its size limit.")
+        self.assertEqual(remaining, {b"new1": 0.2, b"new2": 0.3}, "The wrong entry was evicted.")
+
+    """
+    Checks that the cache is emptied when the lexicon version changes.
+    """
+    def test_cache_is_invalidated_when_lexicon_changes(self):
+        cache_file = "sentinalysis-cache-invalidation.sqlite"
+
+        with ScoreCache(cache_file) as cache:
+            cache.put_many([(b"key", 0.5)])
+
+        with patch("sentinalysis.cache.get_lexicon_version", return_value = "another-lexicon"):
+            with ScoreCache(cache_file) as cache:
+                found = cache.get_many([b"key"])
+
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(cache_file + suffix):
+                os.remove(cache_file + suffix)
+
+        self.assertEqual(found, {}, "A score computed with a different lexicon was returned.")
+
+    """
+    Checks that repeated messages are answered by the memo and counted as hits.
+    """
+    def test_memo_counts_hits_and_misses(self):
+        mocked_analyzer = Mock()
+        mocked_analyzer.polarity_scores.return_value = {"compound": 0.5}
+        memo = MemoizedAnalyzer(mocked_analyzer)
+
+        for msg in ["ok", "lol", "ok", "ok", "=(", "lol"]:
+            self.assertEqual(memo.polarity_scores(msg)["compound"], 0.5)
+
+        self.assertEqual(mocked_analyzer.polarity_scores.call_count, 3, "A memoized message was scored again.")
+        self.assertEqual((memo.hits, memo.misses), (3, 3), "The hit/miss counters are different than expected.")
+        self.assertEqual(memo.cache_info()["hit_rate"], 0.5)
+
+    """
+    Checks that the memo respects both its entry limit and its byte limit, evicting the least recently used messages.
+    """
+    def test_memo_evicts_least_recently_used_messages(self):
+        mocked_analyzer = Mock()
+        mocked_analyzer.polarity_scores.return_value = {"compound": 0.5}
+
+        memo = MemoizedAnalyzer(mocked_analyzer, max_entries = 2)
+        for msg in ["ok", "lol", "ok", "Here"]:
+            memo.polarity_scores(msg)
+        self.assertEqual(len(memo), 2, "The memo grew over its entry limit.")
+        self.assertEqual(memo.evictions, 1)
+
+        memo.polarity_scores("ok")
+        self.assertEqual(memo.hits, 2, "The most recently used message was evicted instead of the least recently used one.")
+
+        memo = MemoizedAnalyzer(mocked_analyzer, max_bytes = 1)
+        memo.polarity_scores("ok")
+        self.assertEqual(len(memo), 0, "A message larger than the byte limit was memoized.")
+
+    """
+    Checks that sentiment_analysis() reports memo hits through the provided analyzer.
+    """
+    def test_sentiment_analysis_uses_provided_memo(self):
+        test_file = "sentinalysis-memo-run.txt"
+
+        with open(test_file, "w") as f1:
+            f1.write("8/2/25, 18:32 - TestPerson1: ok\n8/2/25, 18:33 - TestPerson2: ok\n8/3/25, 09:12 - TestPerson1: lol\n")
+
+        mocked_analyzer = Mock()
+        mocked_analyzer.polarity_scores.return_value = {"compound": 0.5}
+        memo = MemoizedAnalyzer(mocked_analyzer)
+        result = sentiment_analysis(test_file, analyzer = memo)
+        os.remove(test_file)
+
+        self.assertEqual((memo.hits, memo.misses), (1, 2))
+        self.assertEqual(result["TestPerson1"][-1][0], 1.0)
+
+if __name__ == "__main__":
+    unittest.main()
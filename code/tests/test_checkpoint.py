@@ -0,0 +1,121 @@
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.checkpoint import Checkpoint
+from sentinalysis.pipeline import analyze_export
+from unittest.mock import patch
+import unittest
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class TestCheckpoint(unittest.TestCase):
+    """
+    Checks that a re-exported chat only has its appended messages analyzed, and that their running totals
+    continue exactly where the previous run stopped.
+    """
+    def test_only_appended_messages_are_analyzed(self):
+        with open(SNIPPET_PATH, "r", encoding = "utf-8") as f:
+            lines = f.readlines()
+
+        old_export = "sentinalysis-checkpoint-old.txt"
+        new_export = "sentinalysis-checkpoint-new.txt"
+        checkpoint_file = "sentinalysis-checkpoint.json"
+
+        # The old export ends without a newline, like WhatsApp exports do
+        with open(old_export, "w", encoding = "utf-8") as f:
+            f.write("".join(lines[:400]).rstrip("\n"))
+        with open(new_export, "w", encoding = "utf-8") as f:
+            f.write("".join(lines))
+
+        old_result = analyze_export(old_export, checkpointPath = checkpoint_file)
+        incremental_result = analyze_export(new_export, checkpointPath = checkpoint_file)
+        full_result = analyze_export(new_export)
+        checkpoint = Checkpoint.load(checkpoint_file)
+
+        os.remove(old_export)
+        os.remove(new_export)
+        os.remove(checkpoint_file)
+
+        for member, scores in incremental_result.items():
+            self.assertEqual(scores, full_result[member][-len(scores):], f"The appended scores of {member} differ from a full run.")
+
+        old_count = sum(len(scores) for scores in old_result.values())
+        full_count = sum(len(scores) for scores in full_result.values())
+        self.assertEqual(sum(len(scores) for scores in incremental_result.values()), full_count - old_count, "Not only the appended messages were analyzed.")
+        self.assertEqual(checkpoint.message_count, full_count)
+        self.assertEqual(checkpoint.members_sentiment_cache, {member: scores[-1][0] for member, scores in full_result.items()})
+
+    """
+    Checks that a file which does not continue the checkpointed one is analyzed from the start.
+    """
+    def test_modified_history_is_analyzed_again(self):
+        test_file = "sentinalysis-checkpoint-modified.txt"
+        checkpoint_file = "sentinalysis-checkpoint-modified.json"
+
+        with open(test_file, "w") as f:
+            f.write("8/2/25, 18:32 - TestPerson: This is a great test.\n8/2/25, 18:33 - TestPerson: This is a bad test.\n")
+        sentiment_analysis(test_file, checkpointPath = checkpoint_file)
+
+        with open(test_file, "w") as f:
+            f.write("8/2/25, 18:32 - TestPerson: This is a good test.\n8/2/25, 18:33 - TestPerson: This is a bad test.\n8/3/25, 09:00 - TestPerson: ok\n")
+        result = sentiment_analysis(test_file, checkpointPath = checkpoint_file)
+        expected = sentiment_analysis(test_file)
+
+        with patch("sentinalysis.checkpoint.get_lexicon_version", return_value = "another-lexicon"):
+            relexicon_result = sentiment_analysis(test_file, checkpointPath = checkpoint_file)
+
+        os.remove(test_file)
+        os.remove(checkpoint_file)
+
+        self.assertEqual(result, expected, "A modified file was analyzed incrementally.")
+        self.assertEqual(relexicon_result, expected, "A checkpoint from another lexicon version was used.")
+
+    """
+    Checks that a re-export whose last checkpointed message was extended is analyzed from the start,
+    instead of resuming in the middle of that message.
+    """
+    def test_extended_last_message_is_analyzed_again(self):
+        test_file = "sentinalysis-checkpoint-extended.txt"
+        checkpoint_file = "sentinalysis-checkpoint-extended.json"
+
+        with open(test_file, "w") as f:
+            f.write("8/2/25, 18:32 - TestPerson: This is a great test.\n8/2/25, 18:33 - TestPerson: What a terrible day")
+        sentiment_analysis(test_file, checkpointPath = checkpoint_file)
+
+        with open(test_file, "w") as f:
+            f.write("8/2/25, 18:32 - TestPerson: This is a great test.\n8/2/25, 18:33 - TestPerson: What a terrible day but actually fine\n"
+                    "8/3/25, 09:00 - TestPerson: ok\n")
+        result = sentiment_analysis(test_file, checkpointPath = checkpoint_file)
+        expected = sentiment_analysis(test_file)
+
+        os.remove(test_file)
+        os.remove(checkpoint_file)
+
+        self.assertEqual(result, expected, "A run resumed in the middle of an extended message.")
+
+    """
+    Checks that a raw export whose appended lines continue the last checkpointed message, a multi-line message,
+    is analyzed from the start instead of failing on the continuation line.
+    """
+    def test_continued_multi_line_message_is_analyzed_again(self):
+        test_file = "sentinalysis-checkpoint-continued.txt"
+        checkpoint_file = "sentinalysis-checkpoint-continued.json"
+
+        with open(test_file, "w") as f:
+            f.write("8/2/25, 18:32 - TestPerson: This is a great test.\n8/2/25, 18:33 - TestPerson: What a terrible day\n")
+        analyze_export(test_file, checkpointPath = checkpoint_file)
+
+        with open(test_file, "w") as f:
+            f.write("8/2/25, 18:32 - TestPerson: This is a great test.\n8/2/25, 18:33 - TestPerson: What a terrible day\n"
+                    "but actually fine\n8/3/25, 09:00 - TestPerson: ok\n")
+        result = analyze_export(test_file, checkpointPath = checkpoint_file)
+        expected = analyze_export(test_file)
+        checkpoint = Checkpoint.load(checkpoint_file)
+
+        os.remove(test_file)
+        os.remove(checkpoint_file)
+
+        self.assertEqual(result, expected, "The continuation of a checkpointed message was not analyzed with it.")
+        self.assertEqual(checkpoint.message_count, 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+from sentinalysis.classifier import SystemLineClassifier, WordAutomaton
+from sentinalysis.config import FILTERS_REGEX
+from sentinalysis.validation import data_validation
+import unittest
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class TestClassifier(unittest.TestCase):
+    """
+    Checks that templates only match whole words, and that overlapping templates are all found.
+    """
+    def test_automaton_matches_whole_words(self):
+        automaton = WordAutomaton([("left", "membership"), ("was added", "membership"), ("changed this group's icon", "settings")])
+
+        self.assertEqual(automaton.search("Alice left".split()), "membership")
+        self.assertEqual(automaton.search("Bob was was added".split()), "membership")
+        self.assertEqual(automaton.search("Carol changed this group's icon".split()), "settings")
+        self.assertIsNone(automaton.search("the cleft leftovers".split()), "A template matched part of a word.")
+        self.assertIsNone(automaton.search("changed this group's name".split()), "An incomplete template matched.")
+
+    """
+    Checks that user messages which merely contain words of system templates are kept.
+    """
+    def test_user_messages_with_template_words_are_kept(self):
+        classifier = SystemLineClassifier()
+        lines = [
+            "8/1/25, 15:23 - TestPerson: I added you to the list and left early",
+            "8/1/25, 15:24 - TestPerson: They removed the old sign",
+            "8/1/25, 15:25 - TestPerson: It changed to blue",
+            "and then I left",
+        ]
+
+        for line in lines:
+            self.assertFalse(classifier.is_system_line(line), f"User message classified as system message: {line}")
+        self.assertEqual(sum(classifier.counts.values()), 0)
+
+    """
+    Checks that system messages are dropped and counted by category.
+    """
+    def test_system_lines_are_counted_by_category(self):
+        classifier = SystemLineClassifier()
+        lines = [
+            "9/17/22, 18:54 - Person 1 created group \"group-name\"",
+            "9/17/22, 18:54 - You were added",
+            "9/17/22, 18:55 - Person 1 changed this group's icon",
+            "9/17/22, 18:56 - Person 2: <Media omitted>",
+            "9/17/22, 18:57 - Person 2: This message was deleted",
+            "9/17/22, 18:58 - Person 1 changed the subject from \"a: b\" to \"c\"",
+            "9/17/22, 18:59 - Something new happened",
+            "TestPerson changed the settings so only admins can edit the group settings",
+        ]
+
+        for line in lines:
+            self.assertTrue(classifier.is_system_line(line), f"System message not classified: {line}")
+        self.assertEqual(classifier.counts, {"membership": 2, "settings": 3, "media": 1, "deleted": 1, "unknown": 1})
+
+    """
+    Checks that data_validation() only keeps more messages than the FILTERS_REGEX alternation did, and that the removed lines are counted.
+    """
+    def test_validation_only_recovers_false_drops(self):
+        classifier = SystemLineClassifier()
+        validated_file = data_validation(SNIPPET_PATH, os.getcwd(), classifier)
+        with open(validated_file, 'r', encoding = "utf-8") as f:
+            validated = f.read().splitlines()
+        os.remove(validated_file)
+
+        with open(SNIPPET_PATH, 'r', encoding = "utf-8") as f:
+            regex_dropped = [line for line in f if FILTERS_REGEX.search(line)]
+
+        recovered = [line for line in validated if FILTERS_REGEX.search(line)]
+        self.assertEqual(recovered, ["6/23/23, 16:19 - Person 2: I wanna see you wearing the ones on bottom left 👁️"])
+        self.assertEqual(sum(classifier.counts.values()), len(regex_dropped) - len(recovered))
+
+if __name__ == "__main__":
+    unittest.main()
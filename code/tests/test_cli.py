@@ -0,0 +1,106 @@
+from sentinalysis.vader_engine import load_vader_lexicon, parse_vader_lexicon, SnapshotSentimentIntensityAnalyzer
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from sentinalysis.cli import main
+from sentinalysis import utils
+from unittest.mock import patch
+from contextlib import redirect_stdout
+import io
+import subprocess
+import unittest
+import shutil
+import json
+import sys
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+# Generous budget for importing sentinalysis.cli, importing nltk alone takes several times longer
+IMPORT_BUDGET_US = 250000
+
+"""
+Runs Python with -X importtime and returns the cumulative import time of every module, in microseconds.
+
+Args:
+  code (str): The code to run.
+
+Returns:
+  dict[str, int]: The cumulative import time of every imported module.
+"""
+def get_import_times(code: str) -> dict[str, int]:
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output = True, text = True, check = True,
+                             cwd = os.path.join(os.path.dirname(__file__), ".."))
+    times = {}
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, module = line.split("|")
+            times[module.strip()] = int(cumulative)
+
+    return times
+
+class TestCli(unittest.TestCase):
+    """
+    Creates a directory for the snapshot and outputs of the tests.
+    """
+    def setUp(self):
+        self.output_dir = "sentinalysis-cli-test"
+        os.makedirs(self.output_dir, exist_ok = True)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors = True)
+        utils.get_snapshot_path.cache_clear()
+
+    """
+    Checks that importing the command line interface and printing its help never imports nltk, matplotlib or pandas,
+    and that the import stays within its time budget.
+    """
+    def test_cli_imports_no_heavy_modules(self):
+        times = get_import_times("import sys; sys.argv = ['sentinalysis', '--help']\n"
+                                 "from sentinalysis.cli import main\n"
+                                 "try:\n  main()\nexcept SystemExit:\n  pass")
+
+        for module in ("nltk", "matplotlib", "pandas"):
+            self.assertNotIn(module, times, f"{module} is imported by the command line interface.")
+        self.assertLess(times["sentinalysis.cli"], IMPORT_BUDGET_US, "Importing the command line interface is too slow.")
+
+    """
+    Checks that the lexicon snapshot is written on the first load, holds the same lexicon as nltk's text file,
+    and that the analyzer built from it returns the same scores as nltk's.
+    """
+    def test_lexicon_snapshot_matches_lexicon(self):
+        utils.get_snapshot_path.cache_clear()
+        with patch("sentinalysis.utils.SNAPSHOT_DIR", self.output_dir):
+            parsed = load_vader_lexicon()
+            self.assertTrue(os.path.exists(utils.get_snapshot_path()), "The snapshot was not written.")
+            snapshot = load_vader_lexicon()
+
+        self.assertEqual(parsed, parse_vader_lexicon(), "The parsed lexicon differs from nltk's.")
+        self.assertEqual(snapshot, parsed, "The snapshot differs from the parsed lexicon.")
+
+        expected, analyzer = SentimentIntensityAnalyzer(), SnapshotSentimentIntensityAnalyzer(snapshot)
+        with open(SNIPPET_PATH, "r", encoding = "utf-8") as f:
+            for line in f.readlines()[:200]:
+                self.assertEqual(analyzer.polarity_scores(line), expected.polarity_scores(line), f"The scores of {line!r} differ.")
+
+    """
+    Checks that validating, converting and analyzing from the command line gives a result for every member of the chat.
+    """
+    def test_validate_convert_analyze(self):
+        self.assertEqual(main(["validate", SNIPPET_PATH, "-o", self.output_dir, "--binary"]), 0)
+        validated_file = os.path.join(self.output_dir, "validated-data-snippet.txt")
+
+        # Converted files are written to the working directory, and their path is printed
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(main(["convert", validated_file, "--to", "csv"]), 0)
+        csv_file = output.getvalue().strip()
+        shutil.move(csv_file, self.output_dir)
+
+        result_file = os.path.join(self.output_dir, "result.json")
+        self.assertEqual(main(["analyze", os.path.join(self.output_dir, os.path.basename(csv_file)), "-o", result_file]), 0)
+
+        with open(result_file, "r") as f:
+            members = json.load(f)["members"]
+        self.assertEqual(set(members), {"Person 1", "Person 2", "Person 3"}, "The result is missing members.")
+
+if __name__ == "__main__":
+    unittest.main()
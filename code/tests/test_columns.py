@@ -0,0 +1,88 @@
+from sentinalysis.converters import convert_txt_to_columns
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from sentinalysis.readers import iter_records, get_shards
+from sentinalysis.columns import ChatColumns, write_meta
+from unittest import mock
+import unittest
+import shutil
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class TestColumns(unittest.TestCase):
+    """
+    Checks that the columns directory holds the same messages as the validated file, with dictionary-encoded senders.
+    """
+    def test_columns_match_validated_file(self):
+        validated_file = data_validation(SNIPPET_PATH, os.getcwd())
+        columns_path = convert_txt_to_columns(validated_file)
+
+        expected = list(iter_records(validated_file))
+        actual = list(iter_records(columns_path))
+        expected_minutes = list(iter_records(validated_file, minutes = True))
+        actual_minutes = list(iter_records(columns_path, minutes = True))
+        shards = get_shards(columns_path, 3)
+
+        with ChatColumns(columns_path) as chat:
+            senders = chat.senders
+            sharded = [record for start, end in shards for record in chat.iter_records(start, end)]
+
+        os.remove(validated_file)
+        shutil.rmtree(columns_path)
+
+        self.assertEqual(actual, expected, "The columns hold different messages than the validated file.")
+        self.assertEqual(actual_minutes, expected_minutes, "The columns hold different timestamps than the validated file.")
+        self.assertEqual(sharded, expected, "Reading the columns in row ranges returned different messages.")
+        self.assertEqual(senders, list(dict.fromkeys(sender for _, sender, _ in expected)), "Senders are not numbered in order of appearance.")
+
+    """
+    Checks that analyzing the columns gives the result of the validated file, and that the saved scores are reused by the next analysis.
+    """
+    def test_sentiment_analysis_saves_and_reuses_scores(self):
+        validated_file = data_validation(SNIPPET_PATH, os.getcwd())
+        columns_path = convert_txt_to_columns(validated_file)
+        expected = sentiment_analysis(validated_file)
+        os.remove(validated_file)
+
+        first_run = sentiment_analysis(columns_path)
+        with ChatColumns(columns_path) as chat:
+            self.assertIsNotNone(chat.get_scores(), "The scores were not saved in the columns directory.")
+
+        with mock.patch("sentinalysis.sentiment.analyze_records") as analyze_records:
+            second_run = sentiment_analysis(columns_path)
+            columnar_run = sentiment_analysis(columns_path, columnar = True)
+        analyze_records.assert_not_called()
+
+        parallel_run = sentiment_analysis(columns_path, workers = 2, columnar = True)
+
+        shutil.rmtree(columns_path)
+
+        self.assertEqual(first_run, expected, "Analyzing the columns returned different scores.")
+        self.assertEqual(second_run, expected, "The saved scores returned a different result.")
+        self.assertEqual(columnar_run.to_dict(), expected, "The saved scores returned a different columnar result.")
+        self.assertEqual(parallel_run.to_dict(), expected, "Analyzing the columns in workers mode returned different scores.")
+
+    """
+    Checks that scores computed with another version of the VADER lexicon are ignored.
+    """
+    def test_scores_of_other_lexicon_are_ignored(self):
+        file_name = "sentinalysis-columns-lexicon.txt"
+        with open(file_name, 'w', encoding = "utf-8") as f:
+            f.write("8/1/25, 15:23 - TestPerson: This is great.\n")
+
+        columns_path = convert_txt_to_columns(file_name)
+        os.remove(file_name)
+        sentiment_analysis(columns_path)
+
+        with ChatColumns(columns_path) as chat:
+            write_meta(columns_path, dict(chat.meta, score_lexicon_version = "another-lexicon"))
+
+        with ChatColumns(columns_path) as chat:
+            scores = chat.get_scores()
+        shutil.rmtree(columns_path)
+
+        self.assertIsNone(scores, "Scores of another lexicon version were used.")
+
+if __name__ == "__main__":
+    unittest.main()
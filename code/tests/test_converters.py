@@ -1,4 +1,5 @@
 from sentinalysis.converters import convert_txt_to_json, convert_txt_to_csv
+from sentinalysis.readers import iter_records, iter_csv_batches, CSV_ENGINES
 import pandas as pd
 import unittest
 import json
@@ -83,6 +84,28 @@ class TestConverters(unittest.TestCase):
         with self.assertRaises(FileNotFoundError):
             convert_txt_to_json(file_name2)
 
+    """
+    Checks that the NDJSON mode of convert_txt_to_json writes one object per line, with the same objects as the array mode.
+    """
+    def test_ndjson_conversion_writes_one_object_per_line(self):
+        file_name = "test-sentinalysis-ndjson-conversion.txt"
+
+        with open(file_name, "w") as f1:
+            f1.write("""7/23/25, 16:45 - TestPerson1: This is another test.\n8/23/25, 12:36 - TestPerson2: This test contains multiple messages, actually.""")
+        converted_json = convert_txt_to_json(file_name)
+        converted_jsonl = convert_txt_to_json(file_name, ndjson = True)
+        os.remove(file_name)
+
+        with open(converted_json, "r") as f2:
+            expected = json.load(f2)
+        with open(converted_jsonl, "r") as f3:
+            lines = f3.read().splitlines()
+        os.remove(converted_json)
+        os.remove(converted_jsonl)
+
+        self.assertTrue(converted_jsonl.endswith(".jsonl"), f"Returned path does not contain the '.jsonl' extension at the end: {converted_jsonl}")
+        self.assertEqual([json.loads(line) for line in lines], expected, "The NDJSON objects differ from the objects of the JSON array.")
+
     """
     Checks whether or not the header of the .csv file is the expected one.
     """
@@ -140,6 +163,23 @@ class TestConverters(unittest.TestCase):
         self.assertEqual(data.at[0, "Message"], "This, dear TestPerson2, is a test.")
         self.assertEqual(len(data.columns), 4)
 
+    """
+    Checks that messages with commas and quotes survive a round trip through the .csv file with every CSV engine.
+    """
+    def test_csv_round_trip_keeps_commas_and_quotes(self):
+        file_name = "test-sentinalysis-csv-round-trip.txt"
+
+        with open(file_name, "w") as f1:
+            f1.write("""7/24/25, 12:56 - Doe, Jane: This, dear TestPerson2, is a "test".\n7/24/25, 12:57 - TestPerson2: Plain message\n7/25/25, 08:00 - TestPerson2: \"\"\n""")
+        converted_csv = convert_txt_to_csv(file_name)
+        expected = list(iter_records(file_name))
+        os.remove(file_name)
+
+        for engine in CSV_ENGINES:
+            actual = [record for batch in iter_csv_batches(converted_csv, engine = engine) for record in batch]
+            self.assertEqual(actual, expected, f"The {engine} engine read different messages than the .txt file holds.")
+        os.remove(converted_csv)
+
     """
     Checks whether the returned path is absolute and has the .csv file suffix.
     """
@@ -0,0 +1,93 @@
+from sentinalysis.instrumentation import instrument, record_stage, current_stage
+from sentinalysis.classifier import SystemLineClassifier
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from sentinalysis.converters import convert_txt_to_csv
+import unittest
+import pstats
+import shutil
+import json
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    Creates a directory for the outputs of the tests.
+    """
+    def setUp(self):
+        self.output_dir = "sentinalysis-instrumentation-test"
+        os.makedirs(self.output_dir, exist_ok = True)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors = True)
+
+    """
+    Checks that nothing is measured outside of instrument().
+    """
+    def test_stages_are_ignored_without_instrumentation(self):
+        with record_stage("validation") as stage:
+            lines = ["a", "b"]
+            self.assertIs(stage.track(lines), lines, "Lines are tracked without instrumentation.")
+            stage.add(2)
+            self.assertIs(current_stage(), stage)
+
+        with instrument() as metrics:
+            pass
+        self.assertEqual(metrics.stages, {})
+
+    """
+    Checks the lines, filtered lines and cache lookups recorded for validating and analyzing the example chat,
+    and that the callback and the JSON file receive them.
+    """
+    def test_stages_of_an_analysis(self):
+        reported = []
+        jsonPath = os.path.join(self.output_dir, "metrics.json")
+        classifier = SystemLineClassifier()
+
+        with instrument(callback = reported.append, jsonPath = jsonPath) as metrics:
+            validated_file = data_validation(SNIPPET_PATH, self.output_dir, classifier)
+            result = sentiment_analysis(validated_file)
+
+        with open(SNIPPET_PATH, "r", encoding = "utf-8") as f1, open(validated_file, "r", encoding = "utf-8") as f2:
+            export_lines, messages = sum(1 for _ in f1), sum(1 for _ in f2)
+        stages = metrics.to_dict()["stages"]
+
+        self.assertEqual(list(stages), ["validation", "sentiment", "parsing", "scoring"])
+        self.assertEqual(stages["validation"]["lines"], export_lines, "Validation did not count the lines of the export.")
+        self.assertEqual(stages["validation"]["filtered"], dict(classifier.counts), "The filtered lines differ from the ones of the classifier.")
+        self.assertEqual(stages["sentiment"]["lines"], messages)
+        self.assertEqual(sum(len(scores) for scores in result.values()), messages)
+        self.assertEqual(stages["scoring"]["lines"], messages)
+
+        memo = stages["scoring"]["caches"]["memo"]
+        self.assertEqual(memo["hits"] + memo["misses"], messages, "Every message should be looked up in the memo once.")
+        self.assertGreater(memo["hit_rate"], 0)
+
+        self.assertEqual([stage["name"] for stage in reported], ["validation", "sentiment"], "Only top-level stages are reported.")
+        with open(jsonPath, "r") as f:
+            self.assertEqual(json.load(f)["stages"].keys(), stages.keys())
+
+    """
+    Checks that every top-level stage is profiled and traced when asked to.
+    """
+    def test_profile_and_memory_tracing(self):
+        profileDir = os.path.abspath(os.path.join(self.output_dir, "profiles"))
+        validated_file = data_validation(SNIPPET_PATH, self.output_dir)
+        cwd = os.getcwd()
+
+        os.chdir(self.output_dir)
+        try:
+            with instrument(profileDir = profileDir, trace_memory = True) as metrics:
+                convert_txt_to_csv(validated_file)
+        finally:
+            os.chdir(cwd)
+
+        stage = metrics.stages["convert-csv"]
+        self.assertGreater(stage.lines, 0)
+        self.assertIsNotNone(stage.traced_peak_mb, "The memory of the stage was not traced.")
+        stats = pstats.Stats(os.path.join(profileDir, "convert-csv.prof"))
+        self.assertTrue(any(function == "get_fields" for _, _, function in stats.stats), "The stage was not profiled.")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+from sentinalysis.interactions import InteractionSink, interaction_analysis, to_dense, save_interactions
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from sentinalysis.readers import iter_records
+from sentinalysis.plotting import get_interaction_heatmap
+import numpy as np
+import unittest
+import shutil
+import csv
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class TestInteractions(unittest.TestCase):
+    """
+    Validates the example chat.
+    """
+    def setUp(self):
+        self.output_dir = "sentinalysis-interactions-test"
+        os.makedirs(self.output_dir, exist_ok = True)
+        self.validated_file = data_validation(SNIPPET_PATH, self.output_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors = True)
+
+    """
+    Checks the replies of a small conversation: runs of one member, a gap that breaks the conversation, and a quick answer.
+    """
+    def test_replies_within_gap(self):
+        sink = InteractionSink(max_gap = 10)
+        sink.open({})
+        messages = [(0, "A", 0.5), (2, "B", 0.2), (3, "B", 0.4), (30, "A", -0.5), (31, "C", 1.0), (35, "A", 0.1), (50, "B", 0.0)]
+        sink.write([(minute, name, "") for minute, name, _ in messages], [score for _, _, score in messages])
+        interactions = sink.close()
+
+        self.assertEqual(interactions["members"], ["A", "B", "C"])
+        edges = {(interactions["members"][source], interactions["members"][target]): (count, mean) for source, target, count, mean in
+                 zip(interactions["source"], interactions["target"], interactions["count"], interactions["mean"])}
+        # A's message at 30 comes 27 minutes after B's last one, and B's at 50 15 minutes after A's
+        self.assertEqual(set(edges), {("B", "A"), ("C", "A"), ("A", "C")})
+        self.assertEqual(edges[("B", "A")][0], 2)
+        self.assertAlmostEqual(edges[("B", "A")][1], 0.3)
+        self.assertEqual(sink.totals(), {"A": 0.1, "B": 0.6000000000000001, "C": 1.0})
+
+    """
+    Checks the graph of the example chat against a scan of every earlier message, and its CSV file and heatmaps.
+    """
+    def test_matches_full_scan(self):
+        interactions = interaction_analysis(self.validated_file, max_gap = 5)
+
+        records = list(iter_records(self.validated_file, minutes = True))
+        result = sentiment_analysis(self.validated_file, columnar = True)
+        offsets = {name: 0 for name in result}
+        members = interactions["members"]
+        counts, sums = np.zeros((len(members), len(members)), dtype = np.int64), np.zeros((len(members), len(members)))
+        for i, (minute, name, _) in enumerate(records):
+            score = result.scores(name)[offsets[name]]
+            offsets[name] += 1
+            previous = next((records[j] for j in range(i - 1, -1, -1) if records[j][1] != name), None)
+            if previous is not None and minute - previous[0] <= 5:
+                counts[members.index(name), members.index(previous[1])] += 1
+                sums[members.index(name), members.index(previous[1])] += score
+
+        dense_counts, dense_means = to_dense(interactions)
+        self.assertTrue(np.array_equal(dense_counts, counts))
+        np.testing.assert_allclose(dense_means[counts > 0], (sums / np.maximum(counts, 1))[counts > 0])
+        self.assertTrue(np.isnan(dense_means[counts == 0]).all())
+
+        outputPath = save_interactions(interactions, os.path.join(self.output_dir, "interactions.csv"))
+        with open(outputPath, "r", encoding = "utf-8", newline = "") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(sum(int(row["Count"]) for row in rows), counts.sum())
+
+        for value in ("count", "mean"):
+            self.assertTrue(os.path.exists(get_interaction_heatmap(interactions, self.output_dir, value)))
+        with self.assertRaises(ValueError):
+            get_interaction_heatmap(interactions, self.output_dir, "sum")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+from sentinalysis.converters import convert_txt_to_json, convert_txt_to_csv
+from sentinalysis.readers import get_shards, iter_records
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+import unittest
+import json
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class TestParallel(unittest.TestCase):
+    """
+    Checks that every shard starts right after a newline character and that the shards cover the whole file.
+    """
+    def test_shards_start_and_end_on_message_boundaries(self):
+        file_name = "sentinalysis-shards.txt"
+
+        with open(file_name, "w") as f1:
+            for idx in range(100):
+                f1.write(f"8/1/25, 14:{idx % 60:02d} - TestPerson{idx % 3}: This is test number {idx}.\n")
+
+        shards = get_shards(file_name, 7)
+        with open(file_name, "rb") as f2:
+            data = f2.read()
+        os.remove(file_name)
+
+        self.assertEqual(shards[0][0], 0, "The first shard does not start at the beginning of the file.")
+        self.assertEqual(shards[-1][1], len(data), "The last shard does not end at the end of the file.")
+
+        for (_, end), (start, _) in zip(shards, shards[1:]):
+            self.assertEqual(end, start, "There is a gap or an overlap between two shards.")
+            self.assertEqual(data[start - 1:start], b"\n", "A shard does not start on a message boundary.")
+
+    """
+    Checks that reading the file shard by shard returns the same messages as reading it in one go.
+    """
+    def test_shards_contain_every_message_once(self):
+        file_name = "sentinalysis-shards-records.txt"
+
+        with open(file_name, "w") as f1:
+            for idx in range(50):
+                f1.write(f"8/1/25, 14:{idx:02d} - TestPerson: Message {idx}, with a comma.\n")
+        converted_csv = convert_txt_to_csv(file_name)
+        converted_json = convert_txt_to_json(file_name)
+        converted_jsonl = convert_txt_to_json(file_name, ndjson = True)
+
+        for path in (file_name, converted_csv, converted_json, converted_jsonl):
+            expected = list(iter_records(path))
+            actual = [record for start, end in get_shards(path, 4) for record in iter_records(path, start, end)]
+            self.assertEqual(actual, expected, f"Sharded reading of {path} differs from a serial read.")
+
+        os.remove(file_name)
+        os.remove(converted_csv)
+        os.remove(converted_json)
+        os.remove(converted_jsonl)
+
+    """
+    Checks that an indented .json array, whose objects span several lines, is read with the ijson fallback in workers mode too.
+    """
+    def test_indented_json_array_is_read_as_a_whole(self):
+        file_name = "sentinalysis-indented.json"
+
+        with open(file_name, "w") as f1:
+            json.dump([{"date": "8/1/25", "message": f"Message {idx}", "time": "14:00", "username": "TestPerson"} for idx in range(20)], f1, indent = 2)
+
+        size = os.path.getsize(file_name)
+        shards = get_shards(file_name, 4)
+        records = list(iter_records(file_name))
+        serial_result = sentiment_analysis(file_name)
+        parallel_result = sentiment_analysis(file_name, workers = 2)
+        os.remove(file_name)
+
+        self.assertEqual(shards, [(0, size)], "An indented array was split into several shards.")
+        self.assertEqual(len(records), 20, "The messages of the indented array were not read.")
+        self.assertEqual(parallel_result, serial_result, "The workers mode result of an indented array differs from the serial one.")
+
+    """
+    Checks that the parallel mode returns exactly the same running totals as the serial mode.
+    """
+    def test_parallel_result_is_identical_to_serial_result(self):
+        validated_file = data_validation(SNIPPET_PATH, os.getcwd())
+
+        serial_result = sentiment_analysis(validated_file)
+        parallel_result = sentiment_analysis(validated_file, workers = 3)
+        os.remove(validated_file)
+
+        self.assertEqual(list(parallel_result), list(serial_result), "The members are different or in a different order.")
+        for member in serial_result:
+            self.assertEqual(parallel_result[member], serial_result[member], f"The sentiment scores of {member} differ.")
+
+if __name__ == "__main__":
+    unittest.main()
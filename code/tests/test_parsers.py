@@ -1,4 +1,5 @@
-from sentinalysis.parsers import get_txt, get_csv, get_json
+from sentinalysis.parsers import get_txt, get_csv, get_json, parse_header
+from sentinalysis.converters import get_fields
 import unittest
 import datetime
 import json
@@ -44,6 +45,21 @@ class TestParsers(unittest.TestCase):
 
         self.assertEqual(result_tuple[2], "Here is the test: Check how the extra colon is handled.", "An extra colon in the message was not handled by the get_txt() function.")
 
+    """
+    Checks that a colon inside the sender's name does not end the name, and that the header spans locate the values in the line.
+    """
+    def test_parse_header_with_colon_in_name_txt(self):
+        typical_line = """7/23/25, 9:05 - Test:Person: Here is the test: colons everywhere.\n"""
+        match = parse_header(typical_line)
+
+        self.assertEqual(match["sender"], "Test:Person", "A colon in the username ended the username.")
+        self.assertEqual(match["body"], "Here is the test: colons everywhere.", "Actual message different than expected.")
+        self.assertEqual(typical_line[slice(*match.span("time"))], "9:05", "The single digit hour was improperly handled.")
+        self.assertEqual(get_fields(typical_line), ["7/23/25", "9:05", "Test:Person", "Here is the test: colons everywhere."])
+
+        with self.assertRaises(ValueError):
+            parse_header("A continuation without a timestamp")
+
     """
     Checks that the get_csv() function behaves as expected by providing some typical input.
     """
@@ -85,6 +101,16 @@ class TestParsers(unittest.TestCase):
 
         self.assertEqual(result_tuple[2], "Here is the test: Check how the extra colon is handled.", "An extra colon in the message was not handled by the get_csv() function.")
 
+    """
+    Checks that the fields csv.writer quotes, because they contain commas or quotes, are unquoted by get_csv().
+    """
+    def test_quoted_fields_are_unquoted_csv(self):
+        quoted_line = """7/23/25,16:45,"Doe, Jane","She said ""hi, there"" to me."\n"""
+        result_tuple = get_csv(quoted_line)
+
+        self.assertEqual(result_tuple[1], "Doe, Jane", "A quoted username was not unquoted.")
+        self.assertEqual(result_tuple[2], 'She said "hi, there" to me.', "A quoted message was not unquoted.")
+
     """
     Checks that the get_json() function behaves as expected by providing some typical input.
     """
@@ -0,0 +1,44 @@
+from sentinalysis.converters import convert_txt_to_json, convert_txt_to_csv
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from sentinalysis.pipeline import analyze_export
+import unittest
+import filecmp
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class TestPipeline(unittest.TestCase):
+    """
+    Checks that the streaming pipeline returns the same result as validating, then analyzing, and writes no files by default.
+    """
+    def test_streaming_result_matches_staged_result(self):
+        files_before = set(os.listdir(os.getcwd()))
+        streamed_result = analyze_export(SNIPPET_PATH)
+        files_after = set(os.listdir(os.getcwd()))
+
+        validated_file = data_validation(SNIPPET_PATH, os.getcwd())
+        staged_result = sentiment_analysis(validated_file)
+        os.remove(validated_file)
+
+        self.assertEqual(files_after, files_before, "The streaming pipeline wrote files that were not asked for.")
+        self.assertEqual(streamed_result, staged_result, "The streaming pipeline returned different sentiment scores.")
+
+    """
+    Checks that the intermediate files written on request are identical to the ones of the staged functions.
+    """
+    def test_intermediate_files_match_staged_files(self):
+        validated_file = data_validation(SNIPPET_PATH, os.getcwd())
+        json_file = convert_txt_to_json(validated_file)
+        csv_file = convert_txt_to_csv(validated_file)
+
+        streamed_files = ["sentinalysis-pipeline.txt", "sentinalysis-pipeline.json", "sentinalysis-pipeline.csv"]
+        analyze_export(SNIPPET_PATH, *streamed_files)
+
+        for staged, streamed in zip([validated_file, json_file, csv_file], streamed_files):
+            self.assertTrue(filecmp.cmp(staged, streamed, shallow = False), f"{streamed} differs from {staged}.")
+            os.remove(staged)
+            os.remove(streamed)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+from sentinalysis.downsampling import minmax_downsample, lttb_downsample
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from sentinalysis.plotting import get_charts
+import numpy as np
+import unittest
+import shutil
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class TestPlotting(unittest.TestCase):
+    """
+    Checks that min/max downsampling keeps the first and last point and the extremes of the series, in their original order.
+    """
+    def test_minmax_downsampling_keeps_extremes(self):
+        rng = np.random.default_rng(0)
+        x = np.sort(rng.integers(18000, 19000, 100_000)).astype("datetime64[D]")
+        y = np.cumsum(rng.normal(0, 0.5, 100_000))
+
+        small_x, small_y = minmax_downsample(x, y, 100)
+
+        self.assertLessEqual(len(small_y), 202, "More than two points per bucket were kept.")
+        self.assertEqual((small_x[0], small_y[0], small_x[-1], small_y[-1]), (x[0], y[0], x[-1], y[-1]), "The first or last point was dropped.")
+        self.assertEqual((small_y.min(), small_y.max()), (y.min(), y.max()), "The extremes of the series were dropped.")
+        self.assertTrue(np.all(np.diff(small_x.astype(np.int64)) >= 0), "The points are not in their original order.")
+
+    """
+    Checks that LTTB keeps exactly the requested number of points, and that short series are returned as they are.
+    """
+    def test_lttb_downsampling_keeps_threshold_points(self):
+        x = np.arange(10_000, dtype = np.float64)
+        y = np.sin(x / 100)
+
+        small_x, small_y = lttb_downsample(x, y, 500)
+        self.assertEqual(len(small_x), 500)
+        self.assertEqual((small_x[0], small_x[-1]), (0, 9_999), "The first or last point was dropped.")
+        self.assertTrue(np.all(np.diff(small_x) > 0), "The points are not in their original order.")
+        self.assertAlmostEqual(small_y.max(), 1, places = 3, msg = "The peaks of the series were flattened.")
+
+        short_x, short_y = lttb_downsample(x[:100], y[:100], 500)
+        self.assertTrue(np.array_equal(short_x, x[:100]) and np.array_equal(short_y, y[:100]), "A short series was changed.")
+
+    """
+    Checks that rendering in a process pool with downsampling creates one chart per member, both for dictionaries and columnar results.
+    """
+    def test_parallel_downsampled_charts(self):
+        validated_file = data_validation(SNIPPET_PATH, os.getcwd())
+        output_dir = "sentinalysis-charts"
+
+        for result in (sentiment_analysis(validated_file), sentiment_analysis(validated_file, columnar = True)):
+            get_charts(result, output_dir, workers = 2, downsample = "lttb", max_points = 50)
+            charts = sorted(os.listdir(os.path.join(output_dir, "sentiment_chart_images")))
+            shutil.rmtree(output_dir)
+
+            self.assertEqual(charts, sorted(f"{member}-sentiment.png" for member in result), "The charts do not match the members.")
+        os.remove(validated_file)
+
+        with self.assertRaises(ValueError):
+            get_charts({}, output_dir, downsample = "every-other-point")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from sentinalysis.results import ColumnarSentiment
+from datetime import date
+import numpy as np
+import unittest
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class TestResults(unittest.TestCase):
+    """
+    Checks that the cumulative scores are the running totals of the raw scores and that the dates are kept.
+    """
+    def test_cumulative_scores_and_dates(self):
+        result = ColumnarSentiment()
+        result.append("Stef", 0.5, date(2025, 8, 1))
+        result.append("NotStef", 0.25, date(2025, 8, 1))
+        result.extend("Stef", [-0.25, 1.0], [date(2025, 8, 2), date(2025, 8, 3)])
+
+        self.assertEqual(result.cumulative("Stef").tolist(), [0.5, 0.25, 1.25])
+        self.assertEqual(result.dates("Stef").dtype, np.dtype("datetime64[D]"))
+        self.assertEqual(result.dates("Stef")[-1], np.datetime64("2025-08-03"))
+        self.assertEqual(result["Stef"], [(0.5, date(2025, 8, 1)), (0.25, date(2025, 8, 2)), (1.25, date(2025, 8, 3))], "The dictionary view is different than expected.")
+        self.assertEqual(list(result), ["Stef", "NotStef"], "The members are not in the order of their first message.")
+
+    """
+    Checks that unknown members raise a KeyError and unsupported dtypes a ValueError.
+    """
+    def test_invalid_access(self):
+        result = ColumnarSentiment(dtype = "float32")
+        with self.assertRaises(KeyError):
+            result["Stef"]
+
+        with self.assertRaises(ValueError):
+            ColumnarSentiment(dtype = "int64")
+
+    """
+    Checks that the columnar result matches the dictionary result, in serial and in parallel mode, while taking less memory.
+    """
+    def test_columnar_result_matches_dictionary_result(self):
+        validated_file = data_validation(SNIPPET_PATH, os.getcwd())
+
+        dict_result = sentiment_analysis(validated_file)
+        columnar_result = sentiment_analysis(validated_file, columnar = True)
+        parallel_result = sentiment_analysis(validated_file, workers = 2, columnar = True)
+        os.remove(validated_file)
+
+        self.assertIsInstance(columnar_result, ColumnarSentiment)
+        self.assertEqual(columnar_result.to_dict(), dict(dict_result), "The columnar result differs from the dictionary result.")
+        self.assertEqual(parallel_result.to_dict(), dict(dict_result), "The parallel columnar result differs from the dictionary result.")
+
+        message_count = sum(len(scores) for scores in dict_result.values())
+        self.assertEqual(columnar_result.nbytes, message_count * 12)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+from sentinalysis.rolling import RollingSink, RollingStatistics, rolling_statistics
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from sentinalysis.plotting import get_rolling_charts
+import numpy as np
+import unittest
+import shutil
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+"""
+Computes the rolling statistics of a member the slow way, from the whole series at every message.
+"""
+def get_expected_statistics(days: np.ndarray, scores: np.ndarray, window: int, span: int, time_window: int) -> dict:
+    expected = {"mean": [], "variance": [], "window_mean": [], "rate": [], "ewma": []}
+    ewma = scores[0]
+    for i, score in enumerate(scores):
+        last = scores[max(0, i + 1 - window):i + 1]
+        timed = scores[:i + 1][days[:i + 1] > days[i] - time_window]
+        ewma = score if i == 0 else ewma + 2 / (span + 1) * (score - ewma)
+        expected["mean"].append(last.mean())
+        expected["variance"].append(last.var())
+        expected["window_mean"].append(timed.mean())
+        expected["rate"].append(len(timed) / time_window)
+        expected["ewma"].append(ewma)
+    return expected
+
+class TestRolling(unittest.TestCase):
+    """
+    Validates the example chat and analyzes it with the default result as the reference.
+    """
+    def setUp(self):
+        self.output_dir = "sentinalysis-rolling-test"
+        os.makedirs(self.output_dir, exist_ok = True)
+        self.validated_file = data_validation(SNIPPET_PATH, self.output_dir)
+        self.expected = sentiment_analysis(self.validated_file, columnar = True)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors = True)
+
+    """
+    Checks that the statistics computed while scoring are the ones computed from the whole series, next to the same cumulative scores.
+    """
+    def test_sink_matches_full_series(self):
+        statistics = sentiment_analysis(self.validated_file, sink = RollingSink(window = 5, days = 3, span = 4))
+
+        self.assertEqual(list(statistics), list(self.expected))
+        for name in self.expected:
+            days, scores = self.expected.dates(name).astype(np.int64), self.expected.scores(name)
+            self.assertTrue(np.array_equal(statistics[name]["date"], self.expected.dates(name)))
+            self.assertTrue(np.array_equal(statistics[name]["cumulative"], self.expected.cumulative(name)), f"The cumulative scores of {name} differ.")
+
+            for column, values in get_expected_statistics(days, scores, 5, 4, 3).items():
+                np.testing.assert_allclose(statistics[name][column], values, atol = 1e-12, err_msg = f"{column} of {name}")
+
+    """
+    Checks that the statistics of an already scored result, columnar or not, are the ones of a sink.
+    """
+    def test_statistics_of_scored_results(self):
+        streamed = sentiment_analysis(self.validated_file, sink = RollingSink())
+        for result in (self.expected, sentiment_analysis(self.validated_file)):
+            statistics = rolling_statistics(result)
+            for name in streamed:
+                self.assertTrue(np.array_equal(statistics[name]["date"], streamed[name]["date"]))
+                for column, values in streamed[name].items():
+                    if column == "date":
+                        continue
+                    np.testing.assert_allclose(statistics[name][column], values, atol = 1e-12, err_msg = f"{column} of {name}")
+
+    """
+    Checks that the sliding mean and variance stay accurate over a long series, and that the charts are rendered.
+    """
+    def test_long_series_and_charts(self):
+        scores = np.random.default_rng(0).uniform(-1, 1, 200000)
+        statistics = RollingStatistics(window = 100)
+        for i, score in enumerate(scores):
+            mean, variance, _, _, _ = statistics.update(i // 1000, float(score))
+
+        self.assertAlmostEqual(mean, scores[-100:].mean(), places = 12)
+        self.assertAlmostEqual(variance, scores[-100:].var(), places = 12)
+
+        with self.assertRaises(ValueError):
+            RollingSink(window = 0)
+        with self.assertRaises(ValueError):
+            get_rolling_charts(self.expected, self.output_dir, columns = ["median"])
+
+        get_rolling_charts(self.expected, self.output_dir)
+        images = os.listdir(os.path.join(self.output_dir, "sentiment_rolling_images"))
+        self.assertEqual(sorted(images), sorted(f"{name}-rolling.png" for name in self.expected))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+from sentinalysis.scorers import Scorer, VaderScorer, BatchVaderScorer, HashedLinearScorer, SCORERS, register_scorer, get_scorer, get_scorer_class, score_messages
+from sentinalysis.vader_engine import get_compound_scores
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from sentinalysis.readers import iter_records
+from sentinalysis.batch import batch_analysis
+import numpy as np
+import unittest
+import shutil
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class LengthScorer(Scorer):
+    name = "length"
+    batch_size = 3
+    thread_safe = True
+    version = "length-1"
+
+    def __init__(self):
+        self.batches = []
+
+    def score_batch(self, messages):
+        self.batches.append(len(messages))
+        return np.array([min(len(msg) / 100, 1.0) for msg in messages])
+
+class TestScorers(unittest.TestCase):
+    """
+    Validates the example chat.
+    """
+    def setUp(self):
+        self.output_dir = "sentinalysis-scorers-test"
+        os.makedirs(self.output_dir, exist_ok = True)
+        self.validated_file = data_validation(SNIPPET_PATH, self.output_dir)
+        self.messages = [msg for _, _, msg in iter_records(self.validated_file)]
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors = True)
+        SCORERS.pop("length", None)
+
+    """
+    Checks the registry, the batch size a scorer declares, and the parallel modes of a scorer that cannot run in processes.
+    """
+    def test_registry(self):
+        self.assertIs(get_scorer_class("nltk"), VaderScorer)
+        self.assertIs(get_scorer_class("batch"), BatchVaderScorer)
+        self.assertIs(get_scorer_class("linear:model.joblib"), HashedLinearScorer)
+        for engine in ("vader", "", None):
+            with self.assertRaises(ValueError):
+                get_scorer_class(engine)
+
+        # An engine without the model it needs, or with an argument its backend does not take, is refused by name
+        for engine in ("linear", "linear:", "nltk:x", "batch:model.joblib"):
+            with self.assertRaisesRegex(ValueError, f"The {engine.partition(':')[0]} engine"):
+                get_scorer(engine)
+
+        # A backend without score_batch() fails when it is created, not in the middle of an analysis
+        with self.assertRaises(TypeError):
+            type("IncompleteScorer", (Scorer,), {"name": "incomplete"})()
+
+        np.testing.assert_allclose(get_scorer("batch").score_batch(self.messages), get_scorer("nltk").score_batch(self.messages), atol = 1e-12)
+
+        register_scorer(LengthScorer)
+        scorer = get_scorer("length")
+        self.assertEqual(list(get_compound_scores(scorer, self.messages[:10])), [min(len(msg) / 100, 1.0) for msg in self.messages[:10]])
+        self.assertEqual(scorer.batches, [3, 3, 3, 1])
+        self.assertEqual(score_messages(scorer, self.messages[:7]).shape, (7,))
+
+        result = sentiment_analysis(self.validated_file, columnar = True, engine = "length")
+        self.assertAlmostEqual(sum(result.totals().values()), sum(min(len(msg) / 100, 1.0) for msg in self.messages))
+        with self.assertRaises(ValueError):
+            sentiment_analysis(self.validated_file, workers = 2, engine = "length")
+
+        manifest = batch_analysis([SNIPPET_PATH], os.path.join(self.output_dir, "batch"), workers = 2, engine = "length")
+        self.assertEqual(manifest["summary"]["failed"], 0)
+        self.assertEqual(manifest["summary"]["messages"], len(self.messages))
+
+    """
+    Trains a linear model on the example chat, saves and loads it, and checks that it approximates VADER in an analysis.
+    """
+    def test_linear_scorer(self):
+        modelPath = os.path.join(self.output_dir, "linear.joblib")
+        targets = get_scorer("batch").score_batch(self.messages)
+        trained = HashedLinearScorer(n_features = 1 << 14).fit(self.messages, targets, epochs = 20)
+        trained.save(modelPath)
+
+        loaded = get_scorer(f"linear:{modelPath}")
+        self.assertEqual(loaded.version, trained.version)
+        self.assertNotEqual(loaded.version, HashedLinearScorer(n_features = 1 << 14).version)
+        scores = loaded.score_batch(self.messages)
+        np.testing.assert_allclose(scores, trained.score_batch(self.messages))
+        self.assertGreater(np.corrcoef(scores, targets)[0, 1], 0.9)
+
+        result = sentiment_analysis(self.validated_file, columnar = True, engine = f"linear:{modelPath}")
+        self.assertAlmostEqual(sum(result.totals().values()), scores.sum())
+        with self.assertRaises(ValueError):
+            HashedLinearScorer(n_features = 1000)
+
+    """
+    Checks that the score cache keeps the scores of every backend apart, so a linear analysis never reads VADER scores.
+    """
+    def test_cache_versions(self):
+        cachePath = os.path.join(self.output_dir, "scores.sqlite")
+        modelPath = HashedLinearScorer(n_features = 1 << 12).fit(self.messages[:50], epochs = 1).save(os.path.join(self.output_dir, "linear.joblib"))
+        expected = sentiment_analysis(self.validated_file, columnar = True, engine = f"linear:{modelPath}")
+
+        vader = sentiment_analysis(self.validated_file, cachePath = cachePath, columnar = True)
+        linear = sentiment_analysis(self.validated_file, cachePath = cachePath, columnar = True, engine = f"linear:{modelPath}")
+        cached_vader = sentiment_analysis(self.validated_file, cachePath = cachePath, columnar = True)
+        for name in expected:
+            np.testing.assert_allclose(linear.scores(name), expected.scores(name))
+            np.testing.assert_allclose(cached_vader.scores(name), vader.scores(name))
+
+if __name__ == "__main__":
+    unittest.main()
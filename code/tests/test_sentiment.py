@@ -118,7 +118,7 @@ class TestSentiment(unittest.TestCase):
         with open(test_file_json, 'w') as f3:
             f3.write("""[{"date":"8/2/25","message":"This is a test.","time":"18:32","username":"TestPerson"}]""")
 
-        with patch("sentinalysis.sentiment.SentimentIntensityAnalyzer", return_value = mocked_analyzer):
+        with patch("sentinalysis.vader_engine.SnapshotSentimentIntensityAnalyzer", return_value = mocked_analyzer):
             from sentinalysis.sentiment import sentiment_analysis
 
             dict_txt = sentiment_analysis(test_file_txt)
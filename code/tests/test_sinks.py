@@ -0,0 +1,119 @@
+from sentinalysis.sinks import Sink, BucketSink, FileSink, CallbackSink, MultiSink, DictSink
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from sentinalysis.converters import convert_txt_to_columns
+from sentinalysis.aggregation import aggregate_sentiment
+import numpy as np
+import unittest
+import shutil
+import csv
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class TestSinks(unittest.TestCase):
+    """
+    Validates the example chat and analyzes it with the default result as the reference.
+    """
+    def setUp(self):
+        self.output_dir = "sentinalysis-sinks-test"
+        os.makedirs(self.output_dir, exist_ok = True)
+        self.validated_file = data_validation(SNIPPET_PATH, self.output_dir)
+        self.expected = sentiment_analysis(self.validated_file, columnar = True)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors = True)
+
+    """
+    Checks that buckets aggregated while streaming are the ones aggregated from the full result, for every bucket size.
+    """
+    def test_bucket_sink_matches_aggregation(self):
+        for freq in ("D", "W", "M"):
+            streamed = sentiment_analysis(self.validated_file, sink = BucketSink(freq))
+            expected = aggregate_sentiment(self.expected, freq)
+
+            self.assertEqual(list(streamed), list(expected), f"The members of the {freq} buckets differ.")
+            for name in expected:
+                self.assertTrue(np.array_equal(streamed[name]["date"], expected[name]["date"]), f"The {freq} buckets of {name} differ.")
+                self.assertTrue(np.array_equal(streamed[name]["count"], expected[name]["count"]))
+                for column in ("open", "high", "low", "close", "mean"):
+                    np.testing.assert_allclose(streamed[name][column], expected[name][column], err_msg = f"{column} of {name} ({freq})")
+
+    """
+    Checks that a message dated before the previous one, e.g. from a phone whose clock was off, is aggregated like aggregate_sentiment() does,
+    without overwriting the candlestick of the bucket it falls in.
+    """
+    def test_bucket_sink_out_of_order_message(self):
+        unordered_file = os.path.join(self.output_dir, "unordered.txt")
+        with open(unordered_file, "w", encoding = "utf-8") as f:
+            f.write("8/2/25, 18:32 - TestPerson: This is a great test.\n8/2/25, 18:40 - TestPerson: What a wonderful day.\n"
+                    "8/3/25, 09:00 - TestPerson: This is a terrible test.\n8/2/25, 23:59 - TestPerson: I hate this awful bug.\n"
+                    "8/4/25, 10:00 - TestPerson: ok, good\n")
+
+        expected = sentiment_analysis(unordered_file, columnar = True)
+        for freq in ("D", "W"):
+            streamed = sentiment_analysis(unordered_file, sink = BucketSink(freq))["TestPerson"]
+            aggregated = aggregate_sentiment(expected, freq)["TestPerson"]
+
+            self.assertTrue(np.array_equal(streamed["date"], aggregated["date"]), f"The {freq} buckets differ.")
+            self.assertTrue(np.array_equal(streamed["count"], aggregated["count"]))
+            for column in ("open", "high", "low", "close", "mean"):
+                np.testing.assert_allclose(streamed[column], aggregated[column], err_msg = f"{column} ({freq})")
+
+    """
+    Checks that several sinks receive every message, the file with the same running totals as the default result.
+    """
+    def test_file_and_callback_sinks(self):
+        outputPath = os.path.join(self.output_dir, "scores.csv")
+        batches = []
+        dictionary, filePath, _ = sentiment_analysis(self.validated_file, sink = MultiSink([DictSink(), FileSink(outputPath), CallbackSink(lambda batch, scores: batches.append(len(batch)))]))
+
+        with open(filePath, "r", encoding = "utf-8", newline = "") as f:
+            rows = list(csv.DictReader(f))
+
+        messages = sum(len(self.expected.scores(name)) for name in self.expected)
+        self.assertEqual(len(rows), messages)
+        self.assertEqual(sum(batches), messages, "The callback did not receive every message.")
+        for name in self.expected:
+            cumulative = [float(row["Cumulative"]) for row in rows if row["Username"] == name]
+            np.testing.assert_allclose(cumulative, self.expected.cumulative(name))
+            self.assertEqual([score for score, _ in dictionary[name]], self.expected.cumulative(name).tolist())
+
+    """
+    Checks that an analysis that fails on a malformed line closes the file of its sink and leaves no truncated file behind.
+    """
+    def test_failed_analysis_removes_file(self):
+        malformed_file = os.path.join(self.output_dir, "malformed.txt")
+        outputPath = os.path.join(self.output_dir, "scores.csv")
+        with open(malformed_file, "w", encoding = "utf-8") as f:
+            f.write("8/2/25, 18:32 - TestPerson: This is a great test.\nnot a message\n")
+
+        with self.assertRaises(ValueError):
+            sentiment_analysis(malformed_file, sink = MultiSink([FileSink(outputPath), BucketSink()]))
+        self.assertFalse(os.path.exists(outputPath), "The partial file of a failed analysis was kept.")
+
+        # A sink without write() fails when it is created, before any message is scored
+        with self.assertRaises(TypeError):
+            type("IncompleteSink", (Sink,), {})()
+
+    """
+    Checks that the saved scores of a columns directory are streamed to a sink, and that sinks are refused in workers mode.
+    """
+    def test_columns_and_workers(self):
+        cwd = os.getcwd()
+        os.chdir(self.output_dir)
+        try:
+            columnsPath = convert_txt_to_columns(self.validated_file)
+        finally:
+            os.chdir(cwd)
+
+        sentiment_analysis(columnsPath)
+        streamed = sentiment_analysis(columnsPath, sink = BucketSink("W"))
+        self.assertEqual({name: int(candlesticks["count"].sum()) for name, candlesticks in streamed.items()},
+                         {name: len(self.expected.scores(name)) for name in self.expected})
+
+        with self.assertRaises(ValueError):
+            sentiment_analysis(self.validated_file, workers = 2, sink = BucketSink())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+from sentinalysis.store import MessageStore, BASELINE_QUERY
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from sentinalysis.readers import iter_records
+from sentinalysis.scorers import HashedLinearScorer
+from sentinalysis.plotting import get_charts
+import numpy as np
+import unittest
+import shutil
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class TestStore(unittest.TestCase):
+    """
+    Validates the example chat and ingests it into a new store.
+    """
+    def setUp(self):
+        self.output_dir = "sentinalysis-store-test"
+        os.makedirs(self.output_dir, exist_ok = True)
+        self.validated_file = data_validation(SNIPPET_PATH, self.output_dir)
+        self.store = MessageStore(os.path.join(self.output_dir, "chat.db"))
+        self.count = self.store.ingest(self.validated_file)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.output_dir, ignore_errors = True)
+
+    """
+    Checks that the whole store gives the same result as analyzing the file.
+    """
+    def test_store_matches_sentiment_analysis(self):
+        expected = sentiment_analysis(self.validated_file, columnar = True)
+        result = self.store.sentiment()
+
+        self.assertEqual(self.count, len(self.store))
+        self.assertEqual(list(result), list(expected), "The members differ.")
+        for name in expected:
+            np.testing.assert_allclose(result.cumulative(name), expected.cumulative(name))
+            self.assertTrue(np.array_equal(result.dates(name), expected.dates(name)), f"The dates of {name} differ.")
+
+    """
+    Checks that a range query only returns the messages of the range, with running totals that continue from the messages before it,
+    and that the aggregates of the range match its series.
+    """
+    def test_range_queries(self):
+        full = self.store.series("Person 2")
+        start, end = "2023-06-27", "2023-07-08"
+        ranged = self.store.series("Person 2", start, end)
+
+        in_range = (full["timestamp"] >= np.datetime64(start)) & (full["timestamp"] < np.datetime64(end))
+        self.assertGreater(in_range.sum(), 0, "The range of the test is empty.")
+        self.assertTrue(np.array_equal(ranged["timestamp"], full["timestamp"][in_range]))
+        self.assertEqual(ranged["baseline"], full["cumulative"][np.argmax(in_range) - 1])
+
+        result = self.store.sentiment(start, end, ["Person 2"])
+        np.testing.assert_allclose(result.cumulative("Person 2"), ranged["cumulative"])
+
+        aggregate = self.store.aggregate(start, end)["Person 2"]
+        self.assertEqual(aggregate["count"], in_range.sum())
+        self.assertAlmostEqual(aggregate["sum"], ranged["score"].sum())
+        self.assertEqual((aggregate["min"], aggregate["max"]), (ranged["score"].min(), ranged["score"].max()))
+
+        candlesticks = self.store.candlesticks("Person 2", "W", start, end)
+        self.assertEqual(candlesticks["count"].sum(), in_range.sum())
+        self.assertAlmostEqual(candlesticks["close"][-1], ranged["cumulative"][-1])
+
+    """
+    Checks that messages added later continue the running totals of the messages already stored.
+    """
+    def test_added_messages_continue_the_running_totals(self):
+        records = list(iter_records(self.validated_file, minutes = True))
+        with MessageStore(os.path.join(self.output_dir, "parts.db")) as store:
+            scores = self.store.series("Person 1")["score"]
+            person_1 = iter(scores)
+            scored = [(timestamp, name, msg, next(person_1) if name == "Person 1" else 0.0) for timestamp, name, msg in records]
+
+            store.add_messages(scored[:100])
+            store.add_messages(scored[100:])
+            np.testing.assert_allclose(store.series("Person 1")["cumulative"], np.cumsum(scores))
+
+    """
+    Checks that ingesting the same export again adds nothing, that a longer export only adds its appended messages,
+    and that scores of another backend are refused.
+    """
+    def test_ingest_is_incremental(self):
+        expected = self.store.sentiment()
+        self.assertEqual(self.store.ingest(self.validated_file), 0)
+        self.assertEqual(len(self.store), self.count)
+        for name in expected:
+            np.testing.assert_allclose(self.store.sentiment().cumulative(name), expected.cumulative(name))
+
+        with open(self.validated_file, "r", encoding = "utf-8") as f:
+            lines = f.readlines()
+        old_export = os.path.join(self.output_dir, "old.txt")
+        with open(old_export, "w", encoding = "utf-8") as f:
+            f.write("".join(lines[:300]).rstrip("\n"))
+
+        with MessageStore(os.path.join(self.output_dir, "parts.db")) as store:
+            first = store.ingest(old_export)
+            self.assertEqual(first + store.ingest(self.validated_file), self.count)
+            for name in expected:
+                np.testing.assert_allclose(store.sentiment().cumulative(name), expected.cumulative(name))
+
+        modelPath = HashedLinearScorer(n_features = 1 << 8).save(os.path.join(self.output_dir, "linear.joblib"))
+        with self.assertRaises(ValueError):
+            self.store.ingest(self.validated_file, engine = f"linear:{modelPath}")
+        with self.assertRaises(ValueError):
+            self.store.ingest(SNIPPET_PATH)
+
+    """
+    Checks that the running total before a range is the one of the last message before it in chat order,
+    even when the timestamps of a member are not in order.
+    """
+    def test_baseline_follows_chat_order(self):
+        with MessageStore(os.path.join(self.output_dir, "unordered.db")) as store:
+            store.add_messages([(10, "A", "a", 1.0), (5, "A", "b", 2.0), (20, "A", "c", 4.0)])
+            series = store.series("A", start = np.datetime64(15, "m"))
+
+            self.assertEqual(series["baseline"], 3.0)
+            np.testing.assert_allclose(series["cumulative"], [7.0])
+
+            # The baseline is read from an index in chat order, without sorting the messages before the range
+            store.connection.execute("ANALYZE")
+            plan = store.connection.execute(f"EXPLAIN QUERY PLAN {BASELINE_QUERY}", (1, 15)).fetchall()
+            self.assertFalse(any("TEMP B-TREE" in row[-1] for row in plan), f"The baseline query sorts: {plan}")
+
+    """
+    Checks that charts are rendered straight from a store.
+    """
+    def test_charts_from_store(self):
+        get_charts(self.store, self.output_dir)
+
+        charts = os.listdir(os.path.join(self.output_dir, "sentiment_chart_images"))
+        self.assertEqual(sorted(charts), sorted(f"{name}-sentiment.png" for name in self.store.members()))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+from sentinalysis.synthetic import generate_export, LOCALES
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from benchmarks.suite import run_suite, save_baseline, load_baseline, compare_with_baseline
+import unittest
+import shutil
+import os
+
+class TestSynthetic(unittest.TestCase):
+    """
+    Creates a directory for the generated exports.
+    """
+    def setUp(self):
+        self.output_dir = "sentinalysis-synthetic-test"
+        os.makedirs(self.output_dir, exist_ok = True)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors = True)
+
+    """
+    Checks that the same arguments always write the same export, and that another seed writes another one.
+    """
+    def test_generator_is_deterministic(self):
+        paths = [os.path.join(self.output_dir, f"chat{idx}.txt") for idx in range(3)]
+        counts = [generate_export(path, 5000, seed = seed, distinct_messages = 500) for path, seed in zip(paths, (1, 1, 2))]
+
+        with open(paths[0], "rb") as f1, open(paths[1], "rb") as f2, open(paths[2], "rb") as f3:
+            first, second, other = f1.read(), f2.read(), f3.read()
+
+        self.assertEqual(first, second, "The same seed wrote different exports.")
+        self.assertNotEqual(first, other, "Different seeds wrote the same export.")
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(first.count(b"\n"), 5000, "The export does not have the requested number of lines.")
+
+    """
+    Checks that validation keeps exactly the generated user messages in every locale, and that every one of them is analyzed.
+    """
+    def test_validation_keeps_every_message(self):
+        for locale in LOCALES:
+            exportPath = os.path.join(self.output_dir, f"chat-{locale}.txt")
+            counts = generate_export(exportPath, 3000, members = 3, multiline_ratio = 0.1, system_ratio = 0.05, locale = locale, distinct_messages = 200)
+
+            for binary in (False, True):
+                validated_file = data_validation(exportPath, self.output_dir, binary = binary)
+                with open(validated_file, "r", encoding = "utf-8") as f:
+                    self.assertEqual(sum(1 for _ in f), counts["messages"], f"Validation of the {locale} export kept other lines.")
+
+            result = sentiment_analysis(validated_file, columnar = True)
+            self.assertEqual(set(result), {"Person 1", "Person 2", "Person 3"})
+            self.assertEqual(sum(len(result.scores(name)) for name in result), counts["messages"], f"Messages of the {locale} export were not analyzed.")
+
+    """
+    Checks that the benchmark suite measures its stages, and that a run compares with its own baseline without regressions.
+    """
+    def test_benchmark_suite_runs(self):
+        report = run_suite(2000, ["validation", "parser-txt"], os.path.join(self.output_dir, "work"))
+
+        self.assertEqual(list(report["stages"]), ["validation", "parser-txt"])
+        for result in report["stages"].values():
+            self.assertGreater(result["seconds"], 0)
+            self.assertGreater(result["peak_rss_mb"], 0)
+
+        baseline = load_baseline(save_baseline(report, "test", self.output_dir))
+        comparison = compare_with_baseline(report, baseline)
+        self.assertFalse(any(ratios["regressed"] for ratios in comparison.values()), "A run regressed against itself.")
+
+        baseline["config"]["lines"] = 1000
+        with self.assertRaises(ValueError):
+            compare_with_baseline(report, baseline)
+
+if __name__ == "__main__":
+    unittest.main()
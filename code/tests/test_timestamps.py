@@ -0,0 +1,83 @@
+from sentinalysis.timestamps import TimestampParser, TimestampFormat, detect_format, detect_date_order, minutes_to_datetime64
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from sentinalysis.readers import iter_records, get_timestamp_parser
+from sentinalysis.parsers import get_txt
+import numpy as np
+import unittest
+import datetime
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+class TestTimestamps(unittest.TestCase):
+    """
+    Checks that the date order is detected from fields above 12, from a leading 4-digit year, and otherwise from the chronological order.
+    """
+    def test_detect_date_order(self):
+        self.assertEqual(detect_date_order(["1/2/23", "17/2/23"]), "DMY")
+        self.assertEqual(detect_date_order(["1/2/23", "2/17/23"]), "MDY")
+        self.assertEqual(detect_date_order(["2023-02-01", "2023-02-17"]), "YMD")
+        self.assertEqual(detect_date_order(["1/2/23", "2/2/23", "1/3/23"]), "DMY", "Only D/M/Y keeps the sample chronological.")
+        self.assertEqual(detect_date_order(["1/2/23", "2/1/23", "3/2/23"]), "MDY", "Only M/D/Y keeps the sample chronological.")
+        self.assertEqual(detect_date_order(["1/2/23"]), "MDY", "Slashed dates should default to M/D/Y.")
+        self.assertEqual(detect_date_order(["01.02.23"]), "DMY", "Dotted dates should default to D.M.Y.")
+
+    """
+    Checks the detection of the example chat and of an iOS export with 4-digit years and a 12h clock.
+    """
+    def test_detect_format(self):
+        with open(SNIPPET_PATH, 'r', encoding = "utf-8") as f:
+            self.assertEqual(detect_format(f), TimestampFormat("MDY", "android", False, False))
+
+        ios_lines = [
+            "[17.09.2022, 6:54:12 PM] Person 1: Hello",
+            "a continuation line",
+            "‎[18.09.2022, 9:01:00 AM] Person 2: Hi: there",
+        ]
+        self.assertEqual(detect_format(ios_lines), TimestampFormat("DMY", "ios", True, True))
+
+    """
+    Checks minute timestamps, including the 12 AM and 12 PM edge cases, and that parsed dates are memoized.
+    """
+    def test_parser_minutes_and_memoization(self):
+        parser = TimestampParser("DMY")
+
+        self.assertEqual(parser.get_minutes("01.01.1970", "00:05"), 5)
+        self.assertEqual(parser.get_minutes("02.01.1970", "12:05 AM"), 1440 + 5)
+        self.assertEqual(parser.get_minutes("02.01.1970", "12:05 PM"), 1440 + 12 * 60 + 5)
+        self.assertEqual(parser.get_minutes("02.01.1970", "6:54:59 p.m."), 1440 + 18 * 60 + 54, "Seconds should be dropped.")
+        self.assertIs(parser.get_date("17/09/22"), parser.get_date("17/09/22"), "The parsed date was not memoized.")
+
+        expected = np.array(["1970-01-01T00:05", "1970-01-02T12:05"], dtype = "datetime64[m]")
+        np.testing.assert_array_equal(minutes_to_datetime64([5, 1440 + 725]), expected)
+
+        with self.assertRaises(ValueError):
+            TimestampParser("DYM")
+
+    """
+    Checks that a D/M/Y chat is analyzed with the correct dates, and that records can hold minute timestamps.
+    """
+    def test_day_first_chat(self):
+        file_name = "sentinalysis-day-first.txt"
+        with open(file_name, 'w', encoding = "utf-8") as f:
+            f.write("3/9/22, 18:54 - TestPerson: Good morning\n"
+                    "13/9/22, 9:05 - TestPerson: This is great\n"
+                    "1/10/22, 21:26 - TestPerson: Bad news\n")
+
+        validated_file = data_validation(file_name, os.getcwd())
+        result = sentiment_analysis(validated_file)
+        minutes = [timestamp for timestamp, _, _ in iter_records(validated_file, minutes = True)]
+        parser = get_timestamp_parser(validated_file)
+
+        os.remove(file_name)
+        os.remove(validated_file)
+
+        dates = [timestamp for _, timestamp in result["TestPerson"]]
+        self.assertEqual(dates, [datetime.date(2022, 9, 3), datetime.date(2022, 9, 13), datetime.date(2022, 10, 1)])
+        self.assertEqual(minutes, sorted(minutes), "The minute timestamps are not in chronological order.")
+        self.assertEqual(str(minutes_to_datetime64(minutes)[1]), "2022-09-13T09:05")
+        self.assertEqual(get_txt("1/10/22, 21:26 - TestPerson: Bad news", parser)[0], datetime.date(2022, 10, 1))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+from nltk.sentiment.vader import SentimentIntensityAnalyzer, SentiText, VaderConstants
+from sentinalysis.vader_engine import VaderBatchScorer, tokenize
+from sentinalysis.sentiment import sentiment_analysis
+from sentinalysis.validation import data_validation
+from sentinalysis.readers import iter_records
+import numpy as np
+import unittest
+import random
+import os
+
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
+# Sentences that go through every special case of VADER: boosters, negations, capitalization, "but", "least", idioms and punctuation
+SPECIAL_CASES = [
+    "VADER is smart, handsome, and funny.",
+    "VADER is VERY SMART, handsome, and FUNNY!!!",
+    "VADER is not smart, handsome, nor funny.",
+    "The book was kind of good.",
+    "At least it isn't a horrible book.",
+    "Not the least bit happy about it",
+    "Today SUX!",
+    "Today only kinda sux! But I'll get by, lol",
+    "Make sure you :) or :D today!",
+    "Catch utf-8 emoji such as 💘 and 💋 and 😁",
+    "Not bad at all",
+    "It was never so good",
+    "This movie is the bomb",
+    "yeah right, that was great???",
+    "He really cut the mustard, kiss of death for them",
+    "I don't love it. I don't hate it either!?!",
+    "good good good GOOD",
+    "",
+    "=(",
+    "!!!",
+]
+
+class TestVaderEngine(unittest.TestCase):
+    """
+    Checks that the tokenizer returns the same words and emoticons as nltk's SentiText.
+    """
+    def test_tokenizer_matches_nltk(self):
+        for sentence in SPECIAL_CASES + ["'quoted' words, and... trailing!? punctuation -dash -- ok"]:
+            expected = SentiText(sentence, VaderConstants.PUNC_LIST, VaderConstants.REGEX_REMOVE_PUNCTUATION).words_and_emoticons
+            self.assertEqual(tokenize(sentence), expected, f"Different tokens for: {sentence}")
+
+    """
+    Checks that the batch scorer returns exactly nltk's compound scores on the special cases and on the example chat.
+    """
+    def test_compound_scores_match_nltk(self):
+        validated_file = data_validation(SNIPPET_PATH, os.getcwd())
+        msgs = SPECIAL_CASES + [msg for _, _, msg in iter_records(validated_file)]
+        os.remove(validated_file)
+
+        analyzer = SentimentIntensityAnalyzer()
+        expected = np.array([analyzer.polarity_scores(msg)["compound"] for msg in msgs])
+        actual = VaderBatchScorer(analyzer.lexicon).score_batch(msgs)
+
+        np.testing.assert_allclose(actual, expected, rtol = 0, atol = 1e-12)
+
+    """
+    Checks the batch scorer against nltk on randomly built messages that mix lexicon words, boosters, negations, caps and punctuation.
+    """
+    def test_compound_scores_match_nltk_on_random_messages(self):
+        analyzer = SentimentIntensityAnalyzer()
+        rng = random.Random(42)
+
+        vocabulary = list(analyzer.lexicon)[::25] + list(VaderConstants.BOOSTER_DICT) + list(VaderConstants.NEGATE) + \
+                     ["kind", "of", "but", "least", "at", "very", "never", "so", "this", "the", "bomb", "yeah", "right", ":)"]
+        punctuation = ["", "", "", "!", "?", "!!", "?!?", ".", ",", "'", "..."]
+
+        msgs = []
+        for _ in range(2000):
+            words = []
+            for _ in range(rng.randint(0, 12)):
+                word = rng.choice(vocabulary)
+                if rng.random() < 0.15:
+                    word = word.upper()
+                words.append(rng.choice(punctuation) + word if rng.random() < 0.1 else word + rng.choice(punctuation))
+            msgs.append(" ".join(words))
+
+        expected = np.array([analyzer.polarity_scores(msg)["compound"] for msg in msgs])
+        actual = VaderBatchScorer(analyzer.lexicon).score_batch(msgs)
+
+        np.testing.assert_allclose(actual, expected, rtol = 0, atol = 1e-12)
+
+    """
+    Checks that sentiment_analysis() returns the same result with the batch engine, and rejects unknown engines.
+    """
+    def test_batch_engine_in_sentiment_analysis(self):
+        validated_file = data_validation(SNIPPET_PATH, os.getcwd())
+
+        nltk_result = sentiment_analysis(validated_file)
+        batch_result = sentiment_analysis(validated_file, engine = "batch")
+
+        with self.assertRaises(ValueError):
+            sentiment_analysis(validated_file, engine = "unknown")
+        os.remove(validated_file)
+
+        self.assertEqual(batch_result, nltk_result, "The batch engine returned different sentiment scores.")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,12 @@
-from sentinalysis.validation import data_validation
+from sentinalysis.validation import data_validation, iter_validated_bytes, iter_mmap_chunks
+from sentinalysis.classifier import SystemLineClassifier
 import unittest
 import fnmatch
 import filecmp
 import os
 
+SNIPPET_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "data-snippet.txt")
+
 class TestValidation(unittest.TestCase):
     """
     Checks if the input file contains admin messages after validation process.
@@ -139,5 +142,40 @@ class TestValidation(unittest.TestCase):
         with self.assertRaises(FileNotFoundError):
             data_validation(file_name2, os.getcwd())
 
+    """
+    Checks that the binary mode writes exactly the same file as the text mode and counts the same admin messages,
+    with Windows line endings, a long pasted multi-line message, system messages and no trailing newline.
+    """
+    def test_binary_validation_matches_text_validation(self):
+        file_name = "sentinalysis-binary-validation.txt"
+
+        with open(SNIPPET_PATH, 'r', encoding = "utf-8") as f1:
+            snippet = f1.read()
+
+        with open(file_name, 'w', encoding = "utf-8", newline = "") as f2:
+            f2.write(snippet.replace("\n", "\r\n") + "\r\n")
+            f2.write("8/1/25, 15:23 - TestPerson: Pasted\n" + "".join(f"line {i}\n" for i in range(2000)))
+            f2.write("8/1/25, 15:24 - TestPerson: <Media omitted>\n8/1/25, 15:25 - NewPerson: This is a test.\nLast line")
+
+        text_classifier, binary_classifier = SystemLineClassifier(), SystemLineClassifier(binary = True)
+        os.makedirs("sentinalysis-text", exist_ok = True)
+        text_file = data_validation(file_name, "sentinalysis-text", text_classifier)
+        binary_file = data_validation(file_name, os.getcwd(), binary_classifier, binary = True)
+
+        with open(binary_file, "rb") as f3:
+            binary_data = f3.read()
+        with open(file_name, "rb") as f4:
+            chunked_data = b"".join(iter_validated_bytes(iter_mmap_chunks(f4, chunk_size = 64)))
+
+        same_file = filecmp.cmp(text_file, binary_file, shallow = False)
+        os.remove(file_name)
+        os.remove(text_file)
+        os.remove(binary_file)
+        os.rmdir("sentinalysis-text")
+
+        self.assertTrue(same_file, "The binary validation wrote a different file than the text validation.")
+        self.assertEqual(chunked_data, binary_data, "Small chunks returned a different result.")
+        self.assertEqual(binary_classifier.counts, text_classifier.counts, "The binary validation counted different admin messages.")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file